@@ -0,0 +1,103 @@
+from flask import Blueprint, jsonify, request
+from ..services.analytics_service import AnalyticsService
+
+# 数据分析接口
+analytics_bp = Blueprint('analytics', __name__)
+
+analytics_service = AnalyticsService()
+
+@analytics_bp.route('/analytics/overview', methods=['GET'])
+def get_analytics_overview():
+    """
+    获取数据分析概览
+    
+    请求方式：GET
+    请求参数：
+    - period: 可选，字符串，统计周期：day/week/month/year，默认month
+    - start_date: 可选，日期字符串，开始日期
+    - end_date: 可选，日期字符串，结束日期
+    
+    返回：
+    {
+        "success": true,
+        "data": {
+            "total_contents": 1000,
+            "contents_by_type": {
+                "article": 500,
+                "product": 300,
+                "blog": 200
+            },
+            "contents_by_language": {
+                "zh": 600,
+                "en": 400
+            },
+            "generation_trend": [{
+                "date": "2024-01-01",
+                "count": 10
+            }],
+            "average_scores": {
+                "seo": 85,
+                "readability": 90
+            }
+        }
+    }
+    """
+    try:
+        period = request.args.get('period', 'month')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        overview = analytics_service.get_overview(period, start_date, end_date)
+        return jsonify({
+            'success': True,
+            'data': overview
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@analytics_bp.route('/analytics/keywords', methods=['GET'])
+def get_keywords_analytics():
+    """
+    获取关键词分析
+    
+    请求方式：GET
+    请求参数：
+    - period: 可选，字符串，统计周期：day/week/month/year，默认month
+    - limit: 可选，整数，返回数量，默认10
+    
+    返回：
+    {
+        "success": true,
+        "data": {
+            "top_keywords": [{
+                "keyword": "关键词1",
+                "count": 100,
+                "average_score": 85
+            }],
+            "keyword_trends": [{
+                "date": "2024-01-01",
+                "keywords": {
+                    "关键词1": 10,
+                    "关键词2": 8
+                }
+            }]
+        }
+    }
+    """
+    try:
+        period = request.args.get('period', 'month')
+        limit = int(request.args.get('limit', 10))
+        
+        analytics = analytics_service.get_keywords_analytics(period, limit)
+        return jsonify({
+            'success': True,
+            'data': analytics
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,744 @@
+from flask import Blueprint, Response, jsonify, request
+from ..services.generation_errors import (
+    GenerationFailedError,
+    GenerationCancelledError,
+    ModelNotReadyError,
+    MODEL_LOADING
+)
+from ..services.cancellation import (
+    CancelToken,
+    cancellation_stats,
+    socket_disconnect_checker,
+    CANCEL_DEADLINE
+)
+from ..services.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BATCH
+)
+from ..services.content_validator import ContentValidator
+from ..services.batch_job_service import BatchJobService
+from ..services.batch_scheduler import MicroBatchScheduler, SchedulerQueueFullError
+from ..services.generation_cache import GenerationCache
+from ..services.semantic_cache import SemanticCache
+from ..services.inference_client import InferenceClient, InferenceUnavailableError, parse_address
+from ..models.content import Content
+from ..utils.batch_job_store import BatchJobStore
+from ..utils.config import Config
+from ..config.prompts import SEO_PROMPTS
+import json
+
+# 生成相关接口，只在generation角色中注册
+# 未配置INFERENCE_SERVERS时在本进程内加载模型（导入torch/transformers）
+generation_bp = Blueprint('generation', __name__)
+
+config = Config()
+
+if config.INFERENCE_SERVERS:
+    # 模型由独立的推理进程持有（python -m backend.inference_worker），
+    # 客户端同时承担生成器和调度器的接口，微批合并在推理进程中进行
+    seo_generator = InferenceClient(
+        [parse_address(address) for address in config.INFERENCE_SERVERS],
+        config.INFERENCE_AUTHKEY,
+        timeout=config.INFERENCE_TIMEOUT
+    )
+    generation_scheduler = seo_generator
+else:
+    from ..services.model_pool import create_model_pool
+
+    # 按语言路由的模型池，模型延迟加载：create_app在后台预加载PRELOAD_LANGUAGES，
+    # 其他语言在首次请求时加载
+    seo_generator = create_model_pool(
+        config,
+        use_prefix_cache=config.USE_PREFIX_CACHE,
+        profile=config.INFERENCE_PROFILE,
+        num_threads=config.TORCH_NUM_THREADS or None,
+        num_interop_threads=config.TORCH_INTEROP_THREADS or None,
+        compile_model=config.TORCH_COMPILE,
+        draft_model_name=config.DRAFT_MODEL_NAME or None,
+        draft_model_dir=config.DRAFT_MODEL_DIR or None
+    )
+    generation_scheduler = MicroBatchScheduler(
+        seo_generator,
+        max_wait_ms=config.SCHEDULER_MAX_WAIT_MS,
+        max_batch_size=config.SCHEDULER_MAX_BATCH_SIZE,
+        max_queue_size=config.SCHEDULER_MAX_QUEUE_SIZE
+    )
+content_validator = ContentValidator()
+
+# 准入控制：在线请求和批量任务分别限制并发和排队数量，
+# 在线请求排队时批量任务让出空位，队列已满时快速返回429
+admission_controller = AdmissionController([
+    (PRIORITY_INTERACTIVE, config.ADMISSION_INTERACTIVE_CONCURRENCY, config.ADMISSION_INTERACTIVE_QUEUE),
+    (PRIORITY_BATCH, config.ADMISSION_BATCH_CONCURRENCY, config.ADMISSION_BATCH_QUEUE)
+])
+
+generation_cache = GenerationCache(
+    max_size=config.GENERATION_CACHE_SIZE,
+    ttl_seconds=config.GENERATION_CACHE_TTL,
+    persist_path=config.GENERATION_CACHE_PATH if config.GENERATION_CACHE_PERSIST else None
+)
+semantic_cache = SemanticCache(
+    threshold=config.SEMANTIC_CACHE_THRESHOLD,
+    max_entries=config.SEMANTIC_CACHE_SIZE,
+    ttl_seconds=config.GENERATION_CACHE_TTL
+) if config.SEMANTIC_CACHE_ENABLED else None
+batch_job_service = BatchJobService(
+    seo_generator,
+    content_validator,
+    max_workers=config.BATCH_WORKERS,
+    chunk_size=config.BATCH_CHUNK_SIZE,
+    admission=admission_controller,
+    job_store=BatchJobStore(config.BATCH_JOB_DB_PATH)
+)
+
+def _model_not_ready_response(error, language=None):
+    """模型未就绪时的503响应，加载中时附带Retry-After"""
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'model': seo_generator.status(language=language)
+    })
+    response.status_code = 503
+    if error.state == MODEL_LOADING:
+        response.headers['Retry-After'] = str(config.MODEL_RETRY_AFTER)
+    return response
+
+def _score_candidate(candidate):
+    """使用ContentValidator的SEO总分为候选结果评分"""
+    return content_validator.validate(candidate)['seo_score']['total_score']
+
+def _parse_language(data):
+    """请求的语言，未指定时使用DEFAULT_LANGUAGE"""
+    language = data.get('language') or config.DEFAULT_LANGUAGE
+    if language not in SEO_PROMPTS:
+        raise ValueError(f"不支持的语言: {language}，可选: {', '.join(SEO_PROMPTS)}")
+    return language
+
+def _parse_cancel_token(data, watch_disconnect=False):
+    """
+    根据请求的timeout_ms（默认及上限为GENERATION_TIMEOUT_MS）创建取消标记
+
+    watch_disconnect为True时同时检测客户端是否断开（需要服务器在environ中提供客户端套接字，
+    gunicorn和werkzeug开发服务器都会提供）。
+    """
+    timeout_ms = config.GENERATION_TIMEOUT_MS or None
+    if data.get('timeout_ms') is not None:
+        timeout_ms = int(data['timeout_ms'])
+        if timeout_ms < 1:
+            raise ValueError('timeout_ms必须大于0')
+        if config.GENERATION_TIMEOUT_MS:
+            timeout_ms = min(timeout_ms, config.GENERATION_TIMEOUT_MS)
+
+    is_disconnected = None
+    if watch_disconnect and config.CANCEL_ON_DISCONNECT:
+        client_socket = request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+        if client_socket is not None:
+            is_disconnected = socket_disconnect_checker(client_socket)
+    return CancelToken(timeout_ms, is_disconnected)
+
+def _parse_priority(data):
+    """请求的优先级类别，默认interactive；后台调用方可指定batch，不占用在线请求的并发"""
+    priority = data.get('priority') or PRIORITY_INTERACTIVE
+    if priority not in admission_controller.priorities:
+        raise ValueError(f"不支持的优先级: {priority}，可选: {', '.join(admission_controller.priorities)}")
+    return priority
+
+def _rejected_response(error):
+    """准入队列已满时的429响应，附带当前排队数量和建议的重试间隔"""
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'priority': error.priority,
+        'queue_depth': error.queue_depth
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    response.headers['X-Queue-Depth'] = str(error.queue_depth)
+    return response
+
+def _cancelled_response(error):
+    """生成被取消时的响应：超时返回504，客户端断开返回499（客户端已不会读取）"""
+    return jsonify({
+        'success': False,
+        'error': str(error),
+        'cancelled': error.reason
+    }), 504 if error.reason == CANCEL_DEADLINE else 499
+
+def _parse_generation_options(data):
+    """从请求体中解析生成参数"""
+    options = {}
+    if data.get('max_new_tokens') is not None:
+        max_new_tokens = int(data['max_new_tokens'])
+        if max_new_tokens < 1:
+            raise ValueError('max_new_tokens必须大于0')
+        options['max_new_tokens'] = min(max_new_tokens, config.MAX_TOKENS)
+    if data.get('stop_on_json_close') is not None:
+        options['stop_on_json_close'] = bool(data['stop_on_json_close'])
+    if data.get('constrained', config.CONSTRAINED_DECODING):
+        options['constrained'] = True
+    if data.get('greedy', config.GREEDY_DECODING):
+        options['greedy'] = True
+    if data.get('num_return_sequences') is not None:
+        num_return_sequences = int(data['num_return_sequences'])
+        if not 1 <= num_return_sequences <= config.MAX_RETURN_SEQUENCES:
+            raise ValueError(f'num_return_sequences必须在1到{config.MAX_RETURN_SEQUENCES}之间')
+        options['num_return_sequences'] = num_return_sequences
+    if options.get('greedy') and options.get('num_return_sequences', 1) > 1:
+        raise ValueError('greedy时num_return_sequences只能为1（贪心解码的候选完全相同）')
+    selection = data.get('selection', 'first')
+    if selection not in ('first', 'best'):
+        raise ValueError('selection必须为first或best')
+    if selection == 'best':
+        options['scorer'] = _score_candidate
+    return options
+
+def _parse_results_page(args):
+    """解析批量任务结果的分页参数：offset >= 0，1 <= limit <= BATCH_RESULTS_MAX_LIMIT"""
+    try:
+        offset = int(args.get('offset', 0))
+        limit = int(args.get('limit', 100))
+    except ValueError:
+        raise ValueError('offset和limit必须为整数')
+    if offset < 0:
+        raise ValueError('offset不能小于0')
+    if not 1 <= limit <= config.BATCH_RESULTS_MAX_LIMIT:
+        raise ValueError(f'limit必须在1到{config.BATCH_RESULTS_MAX_LIMIT}之间')
+    return offset, limit
+
+def _cache_options(data, generation_options):
+    """缓存键使用的生成参数（评分函数以selection表示）"""
+    options = {k: v for k, v in generation_options.items() if k != 'scorer'}
+    options['selection'] = data.get('selection', 'first')
+    return options
+
+def _lookup_cache(business_type, language, cache_options, bypass_cache=False):
+    """
+    查询生成结果缓存，精确匹配未命中时查找相近的业务类型
+
+    Returns:
+        tuple: (缓存的内容或None, 缓存键, 近似匹配上下文, 近似匹配信息)
+    """
+    cache_key = generation_cache.make_key(business_type, language, cache_options)
+    semantic_context = json.dumps([language, cache_options], ensure_ascii=False, sort_keys=True)
+    if bypass_cache:
+        return None, cache_key, semantic_context, None
+
+    generated_content = generation_cache.get(cache_key)
+    cache_match = None
+    if generated_content is None and semantic_cache is not None:
+        cache_match = semantic_cache.lookup(business_type, semantic_context)
+        if cache_match:
+            generated_content = cache_match.pop('value')
+            # 保留原结果的生成时间，近似命中不会延长结果的有效期
+            generation_cache.set(cache_key, generated_content, created_at=cache_match.pop('created_at'))
+    return generated_content, cache_key, semantic_context, cache_match
+
+def _store_cache(business_type, generated_content, cache_key, semantic_context):
+    """缓存新生成的结果"""
+    generation_cache.set(cache_key, generated_content)
+    if semantic_cache is not None:
+        semantic_cache.add(business_type, generated_content, semantic_context)
+
+def _save_content(business_type, generated_content):
+    """保存生成的内容，返回内容ID"""
+    content = Content(
+        title=generated_content['title'],
+        meta_description=generated_content['metaDescription'],
+        keywords=generated_content['keywords'],
+        business_type=business_type
+    )
+    return content.save()
+
+def _sse(event, data):
+    """格式化一条Server-Sent Events消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@generation_bp.route('/generate', methods=['POST'])
+def generate_content():
+    """
+    生成SEO内容的API端点
+    
+    请求方式：POST
+    请求体：
+    {
+        "business_type": "string",     # 必填，业务类型描述
+        "language": "string",          # 可选，语言（en/zh），决定使用的模型和提示词，默认DEFAULT_LANGUAGE
+        "max_new_tokens": 256,         # 可选，新生成token上限（不超过MAX_TOKENS）
+        "stop_on_json_close": true,    # 可选，JSON对象闭合后立即停止生成，默认true
+        "constrained": false,          # 可选，按输出结构约束解码，默认取CONSTRAINED_DECODING
+        "greedy": false,               # 可选，贪心解码，默认取GREEDY_DECODING
+        "num_return_sequences": 1,     # 可选，同一次生成中解码的候选数量（不超过MAX_RETURN_SEQUENCES）
+        "selection": "first",          # 可选，first: 第一个可解析的候选；best: ContentValidator得分最高的候选
+        "debug": false,                # 可选，返回候选明细及解析状态（不使用缓存）
+        "bypass_cache": false,         # 可选，跳过生成结果缓存
+        "timeout_ms": 30000,           # 可选，截止时间（毫秒），默认及上限为GENERATION_TIMEOUT_MS
+        "priority": "interactive"      # 可选，优先级类别（interactive/batch），默认interactive
+    }
+    
+    解码方式由greedy决定，与请求是否和其他请求合并成批无关：
+    - greedy为false（默认）：按GENERATION_PARAMS的temperature/top_p采样，bypass_cache重新生成会得到不同结果；
+    - greedy为true：贪心解码，忽略temperature/top_p，相同输入得到相同输出（bypass_cache不会得到新结果），
+      num_return_sequences只能为1。配置了草稿模型（DRAFT_MODEL_NAME）时，单独成批的greedy请求使用辅助解码加速，结果不变。
+    
+    超过截止时间返回504，客户端断开连接时停止解码（返回499）。
+    未命中缓存的请求需经过准入控制，所属类别的队列已满时返回429（附带Retry-After和X-Queue-Depth）。
+    
+    返回：
+    {
+        "success": true,
+        "data": {
+            "title": "SEO优化的标题",
+            "metaDescription": "Meta描述",
+            "keywords": ["关键词1", "关键词2"]
+        },
+        "validation": {
+            "keyword_density": {...},
+            "readability": {...},
+            "seo_score": {...}
+        },
+        "cached": false
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or 'business_type' not in data:
+            return jsonify({
+                'success': False,
+                'error': '缺少必要的business_type参数'
+            }), 400
+            
+        business_type = data['business_type']
+        language = _parse_language(data)
+        generation_options = _parse_generation_options(data)
+        # 语言参与调度器的分组，同一语言的请求合并成批
+        generation_options['language'] = language
+        cancel_token = _parse_cancel_token(data, watch_disconnect=True)
+        priority = _parse_priority(data)
+        debug = bool(data.get('debug', False))
+        bypass_cache = debug or bool(data.get('bypass_cache', False))
+        
+        # 先查缓存，键只包含影响生成结果的参数
+        cache_options = _cache_options(data, generation_options)
+        generated_content, cache_key, semantic_context, cache_match = _lookup_cache(
+            business_type, language, cache_options, bypass_cache
+        )
+        cached = generated_content is not None
+        candidates = None
+        
+        if not cached:
+            # 模型未就绪时立即返回503，而不是在队列中等待
+            seo_generator.start_background_load(language=language)
+            seo_generator.ensure_ready(language=language)
+            
+            # 生成SEO内容（准入后由微批调度器与其他并发请求合并执行）
+            with admission_controller.acquire(priority, cancel_token):
+                generated_content = generation_scheduler.generate_seo(
+                    business_type,
+                    return_candidates=debug,
+                    cancel_token=cancel_token,
+                    **generation_options
+                )
+            if debug:
+                generated_content, candidates = generated_content
+            _store_cache(business_type, generated_content, cache_key, semantic_context)
+        
+        # 验证内容
+        validation_result = content_validator.validate(generated_content)
+        
+        # 创建并保存内容
+        content_id = _save_content(business_type, generated_content)
+        
+        response = {
+            'success': True,
+            'data': generated_content,
+            'validation': validation_result,
+            'content_id': content_id,
+            'cached': cached
+        }
+        if cache_match:
+            response['cache_match'] = cache_match
+        if debug:
+            response['candidates'] = candidates
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except AdmissionRejectedError as e:
+        return _rejected_response(e)
+    except SchedulerQueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except (InferenceUnavailableError, ConnectionError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except TimeoutError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 504
+    except ModelNotReadyError as e:
+        return _model_not_ready_response(e, language)
+    except GenerationCancelledError as e:
+        return _cancelled_response(e)
+    except GenerationFailedError as e:
+        response = {
+            'success': False,
+            'error': str(e)
+        }
+        if data.get('debug'):
+            response['candidates'] = e.candidates
+        return jsonify(response), 500
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@generation_bp.route('/generate/stream', methods=['POST'])
+def generate_content_stream():
+    """
+    流式生成SEO内容（Server-Sent Events）
+    
+    请求方式：POST
+    请求体：
+    {
+        "business_type": "string",     # 必填，业务类型描述
+        "language": "string",          # 可选，语言（en/zh），默认DEFAULT_LANGUAGE
+        "max_new_tokens": 256,         # 可选，新生成token上限（不超过MAX_TOKENS）
+        "constrained": false,          # 可选，按输出结构约束解码，默认取CONSTRAINED_DECODING
+        "greedy": false,               # 可选，贪心解码，默认取GREEDY_DECODING（含义同/api/generate）
+        "bypass_cache": false,         # 可选，跳过生成结果缓存
+        "timeout_ms": 30000,           # 可选，截止时间（毫秒），默认及上限为GENERATION_TIMEOUT_MS
+        "priority": "interactive"      # 可选，优先级类别（interactive/batch），默认interactive
+    }
+    
+    返回：text/event-stream，依次包含以下事件
+    - start: {"business_type": "...", "language": "en", "cached": false}，立即发送
+    - token: {"text": "..."}，新生成的文本（命中缓存时没有）
+    - field: {"name": "title", "value": "..."}，某个字段生成完毕时立即发送
+    - result: {"data": {...}, "content_id": 1, "cached": false}，规范化后的完整结果
+    - validation: ContentValidator的验证结果
+    - done: {}
+    出错时发送 error: {"error": "...", "cancelled": 取消原因或null} 并结束。模型未就绪时与/api/generate一样直接返回503，
+    准入队列已满时返回429。准入排队在发送start事件之前完成，流结束时释放并发名额。
+    客户端断开连接后不再发送事件，解码随即停止。
+    """
+    ticket = None
+    try:
+        data = request.get_json()
+        if not data or 'business_type' not in data:
+            return jsonify({
+                'success': False,
+                'error': '缺少必要的business_type参数'
+            }), 400
+
+        business_type = data['business_type']
+        language = _parse_language(data)
+        generation_options = _parse_generation_options(data)
+        # 流式输出只支持单个候选
+        stream_options = {
+            key: generation_options[key]
+            for key in ('max_new_tokens', 'constrained', 'greedy')
+            if key in generation_options
+        }
+        stream_options['language'] = language
+        # 断开由事件发送失败检测（响应迭代器被关闭），不需要窥探套接字
+        cancel_token = _parse_cancel_token(data)
+        priority = _parse_priority(data)
+
+        # 与/api/generate默认参数下的请求共用缓存
+        generated_content, cache_key, semantic_context, _ = _lookup_cache(
+            business_type, language, dict(stream_options, selection='first'), bool(data.get('bypass_cache', False))
+        )
+        cached = generated_content is not None
+        if not cached:
+            seo_generator.start_background_load(language=language)
+            seo_generator.ensure_ready(language=language)
+            ticket = admission_controller.acquire(priority, cancel_token)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except (InferenceUnavailableError, ConnectionError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except ModelNotReadyError as e:
+        return _model_not_ready_response(e, language)
+    except AdmissionRejectedError as e:
+        return _rejected_response(e)
+    except GenerationCancelledError as e:
+        return _cancelled_response(e)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    def _events(generated_content):
+        yield _sse('start', {'business_type': business_type, 'language': language, 'cached': cached})
+        try:
+            if cached:
+                for name in ('title', 'metaDescription', 'keywords'):
+                    yield _sse('field', {'name': name, 'value': generated_content[name]})
+            else:
+                result = None
+                for event in seo_generator.generate_seo_stream(business_type, cancel_token=cancel_token,
+                                                               **stream_options):
+                    if event['type'] == 'token':
+                        yield _sse('token', {'text': event['text']})
+                    elif event['type'] == 'field':
+                        yield _sse('field', {'name': event['name'], 'value': event['value']})
+                    else:
+                        result = event
+                if not result['success']:
+                    yield _sse('error', {'error': f"SEO生成失败: {result['error']}", 'cancelled': None})
+                    return
+                generated_content = result['data']
+                _store_cache(business_type, generated_content, cache_key, semantic_context)
+
+            content_id = _save_content(business_type, generated_content)
+            yield _sse('result', {'data': generated_content, 'content_id': content_id, 'cached': cached})
+            yield _sse('validation', content_validator.validate(generated_content))
+            yield _sse('done', {})
+        except GenerationCancelledError as e:
+            yield _sse('error', {'error': str(e), 'cancelled': e.reason})
+        except Exception as e:
+            yield _sse('error', {'error': str(e), 'cancelled': None})
+
+    response = Response(
+        _events(generated_content),
+        mimetype='text/event-stream',
+        # 禁止代理缓冲，事件生成后立即送达客户端
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    if ticket is not None:
+        # 响应关闭时释放（包括客户端在流开始前断开、迭代器从未启动的情况）
+        response.call_on_close(ticket.release)
+    return response
+
+@generation_bp.route('/batch/generate', methods=['POST'])
+def submit_batch_generation():
+    """
+    提交批量生成任务（异步执行）
+    
+    请求方式：POST
+    请求体：
+    {
+        "keywords_list": ["string"],  # 必填，业务类型列表
+        "language": "string"          # 可选，语言（en/zh），默认DEFAULT_LANGUAGE
+    }
+    
+    返回（202）：
+    {
+        "success": true,
+        "job": {
+            "job_id": "xxx",
+            "status": "queued",
+            "progress": {"total": 100, "processed": 0, ...}
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        business_types = data.get('keywords_list') if data else None
+        if not business_types or not isinstance(business_types, list):
+            return jsonify({
+                'success': False,
+                'error': '缺少必要的keywords_list参数'
+            }), 400
+
+        business_types = [str(b).strip() for b in business_types if str(b).strip()]
+        if len(business_types) > config.BATCH_MAX_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'单个任务最多支持{config.BATCH_MAX_ITEMS}个业务类型'
+            }), 400
+
+        job = batch_job_service.submit(business_types, language=_parse_language(data))
+        return jsonify({
+            'success': True,
+            'job': job
+        }), 202
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@generation_bp.route('/batch/jobs/<job_id>', methods=['GET', 'DELETE'])
+def manage_batch_job(job_id):
+    """
+    查询或取消批量生成任务
+    
+    请求方式：
+    - GET: 获取任务状态和进度
+    - DELETE: 取消任务（未开始的部分将被跳过）
+    
+    返回：
+    {
+        "success": true,
+        "job": {
+            "job_id": "xxx",
+            "status": "running",
+            "progress": {
+                "total": 100,
+                "processed": 40,
+                "succeeded": 38,
+                "failed": 2,
+                "percent": 40.0
+            }
+        }
+    }
+    """
+    try:
+        if request.method == 'DELETE':
+            job = batch_job_service.cancel(job_id)
+        else:
+            job = batch_job_service.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': '任务不存在'
+            }), 404
+        return jsonify({
+            'success': True,
+            'job': job
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@generation_bp.route('/batch/jobs/<job_id>/results', methods=['GET'])
+def get_batch_job_results(job_id):
+    """
+    获取批量任务的（部分）结果
+    
+    请求方式：GET
+    请求参数：
+    - offset: 可选，非负整数，起始位置，默认0
+    - limit: 可选，整数，返回数量，默认100，范围1到BATCH_RESULTS_MAX_LIMIT（默认1000）
+    参数无效时返回400
+    
+    返回：
+    {
+        "success": true,
+        "status": "running",
+        "results": [{
+            "business_type": "xxx",
+            "success": true,
+            "content": {...},
+            "validation": {...},
+            "content_id": 1
+        }],
+        "next_offset": 100
+    }
+    """
+    try:
+        offset, limit = _parse_results_page(request.args)
+
+        page = batch_job_service.get_results(job_id, offset, limit)
+        if page is None:
+            return jsonify({
+                'success': False,
+                'error': '任务不存在'
+            }), 404
+        return jsonify({
+            'success': True,
+            **page
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@generation_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    获取生成服务运行指标
+    
+    请求方式：GET
+    
+    返回：
+    {
+        "success": true,
+        "data": {
+            "scheduler": {
+                "max_wait_ms": 20,
+                "max_batch_size": 8,
+                "queue_depth": 0,
+                "avg_batch_size": 3.5,
+                ...
+            },
+            "cache": {
+                "size": 120,
+                "hits": 300,
+                "misses": 120,
+                "hit_rate": 0.7143,
+                ...
+            },
+            "semantic_cache": {
+                "threshold": 0.8,
+                "size": 120,
+                "hit_rate": 0.25,
+                ...
+            },
+            "cancellation": {
+                "total": 3,
+                "by_reason": {"deadline": 2, "disconnected": 1},
+                "by_stage": {"queued": 1, "decoding": 2}
+            },
+            "admission": {
+                "interactive": {
+                    "max_concurrency": 8,
+                    "running": 2,
+                    "queue_depth": 0,
+                    "rejected": 0,
+                    "p99_wait_ms": 12.5,
+                    ...
+                },
+                "batch": {...}
+            }
+        }
+    }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'scheduler': generation_scheduler.stats(),
+                'cache': generation_cache.stats(),
+                'semantic_cache': semantic_cache.stats() if semantic_cache is not None else None,
+                'cancellation': cancellation_stats.stats(),
+                'admission': admission_controller.stats()
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,78 @@
+from flask import Blueprint, jsonify, current_app
+from ..services.generation_errors import MODEL_LOADING
+from ..utils.config import Config
+import time
+
+# 存活/就绪检查，所有角色都会注册
+health_bp = Blueprint('health', __name__)
+
+STARTED_AT = time.monotonic()
+
+config = Config()
+
+@health_bp.route('/health', methods=['GET'])
+def health_check():
+    """
+    存活检查（不依赖模型）
+    
+    请求方式：GET
+    
+    返回：
+    {
+        "success": true,
+        "status": "ok",
+        "roles": ["crud", "analytics", "generation"],
+        "startup_seconds": 0.42,
+        "uptime_seconds": 12.5
+    }
+    """
+    return jsonify({
+        'success': True,
+        'status': 'ok',
+        'roles': current_app.config.get('ROLES', []),
+        'startup_seconds': current_app.config.get('STARTUP_SECONDS'),
+        'uptime_seconds': round(time.monotonic() - STARTED_AT, 3)
+    })
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    就绪检查：模型已加载且预热完成时返回200，否则返回503
+    未启用generation角色的实例不依赖模型，始终就绪
+    
+    请求方式：GET
+    
+    返回：
+    {
+        "success": true,
+        "ready": true,
+        "model": {
+            "model_name": "meta-llama/Llama-3.2-3B-Instruct",
+            "state": "ready",
+            "load_time_seconds": 35.2,
+            "warmup_time_seconds": 1.8,
+            "error": null
+        }
+    }
+    """
+    if 'generation' not in current_app.config.get('ROLES', []):
+        return jsonify({
+            'success': True,
+            'ready': True,
+            'model': None
+        })
+
+    # generation角色已在create_app中导入，这里不会再触发模型依赖的加载
+    from .generation_routes import seo_generator
+
+    status = seo_generator.status()
+    response = jsonify({
+        'success': status['ready'],
+        'ready': status['ready'],
+        'model': status
+    })
+    if not status['ready']:
+        response.status_code = 503
+        if status['state'] == MODEL_LOADING:
+            response.headers['Retry-After'] = str(config.MODEL_RETRY_AFTER)
+    return response
@@ -1,82 +1,10 @@
-from flask import Blueprint, jsonify, request, send_file
-from ..services.seo_generator import SEOGenerator
-from ..services.content_validator import ContentValidator
-from ..services.analytics_service import AnalyticsService
+from flask import Blueprint, jsonify, request
 from ..models.content import Content
-import io
+from ..utils.db import db
 
-# 创建蓝图
+# 内容管理接口
 api_bp = Blueprint('api', __name__)
 
-seo_generator = SEOGenerator()
-content_validator = ContentValidator()
-analytics_service = AnalyticsService()
-
-@api_bp.route('/generate', methods=['POST'])
-def generate_content():
-    """
-    生成SEO内容的API端点
-    
-    请求方式：POST
-    请求体：
-    {
-        "business_type": "string",  # 必填，业务类型描述
-        "language": "string"        # 可选，语言选择 (默认为 "en")
-    }
-    
-    返回：
-    {
-        "success": true,
-        "data": {
-            "title": "SEO优化的标题",
-            "metaDescription": "Meta描述",
-            "keywords": ["关键词1", "关键词2"]
-        },
-        "validation": {
-            "keyword_density": {...},
-            "readability": {...},
-            "seo_score": {...}
-        }
-    }
-    """
-    try:
-        data = request.get_json()
-        if not data or 'business_type' not in data:
-            return jsonify({
-                'success': False,
-                'error': '缺少必要的business_type参数'
-            }), 400
-            
-        business_type = data['business_type']
-        
-        # 生成SEO内容
-        generated_content = seo_generator.generate_seo(business_type)
-        
-        # 验证内容
-        validation_result = content_validator.validate(generated_content)
-        
-        # 创建并保存内容
-        content = Content(
-            title=generated_content['title'],
-            meta_description=generated_content['metaDescription'],
-            keywords=generated_content['keywords'],
-            business_type=business_type
-        )
-        content_id = content.save()
-        
-        return jsonify({
-            'success': True,
-            'data': generated_content,
-            'validation': validation_result,
-            'content_id': content_id
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
 @api_bp.route('/contents', methods=['GET'])
 def get_contents():
     """
@@ -86,6 +14,11 @@ def get_contents():
     请求参数：
     - limit: 可选，整数，每页数量，默认10
     - skip: 可选，整数，跳过数量，默认0
+    - cursor: 可选，字符串，上一次响应中的next_cursor或prev_cursor；传入时忽略skip
+    - business_type: 可选，字符串，只返回该业务类型的内容
+    
+    内容按创建时间倒序排列。翻阅大量内容时应使用cursor：定位不随页数增加而变慢，
+    翻页期间新增的内容也不会造成重复或遗漏。
     
     返回：
     {
@@ -99,22 +32,36 @@ def get_contents():
             "created_at": "2024-01-01 00:00:00"
         }],
         "total": 100,
-        "page": 1,
-        "total_pages": 10
+        "next_cursor": "xxx",    # 更旧的一页，没有时为null
+        "prev_cursor": null,     # 更新的一页，没有时为null
+        "page": 1,               # 仅skip分页时返回
+        "total_pages": 10        # 仅skip分页时返回
     }
     """
     try:
         limit = int(request.args.get('limit', 10))
         skip = int(request.args.get('skip', 0))
+        cursor = request.args.get('cursor')
+        business_type = request.args.get('business_type')
         
-        contents, total = Content.get_list(limit, skip)
-        return jsonify({
+        try:
+            page = Content.get_page(limit, skip, cursor=cursor, business_type=business_type)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        result = {
             'success': True,
-            'contents': contents,
-            'total': total,
-            'page': skip // limit + 1,
-            'total_pages': (total + limit - 1) // limit
-        })
+            'contents': [content.to_dict() for content in page['contents']],
+            'total': page['total'],
+            'next_cursor': page['next_cursor'],
+            'prev_cursor': page['prev_cursor']
+        }
+        if not cursor:
+            result['page'] = skip // limit + 1
+            result['total_pages'] = (page['total'] + limit - 1) // limit
+        return jsonify(result)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -258,95 +205,33 @@ def search_contents():
             'error': f'搜索内容失败: {str(e)}'
         }), 500
 
-@api_bp.route('/analytics/overview', methods=['GET'])
-def get_analytics_overview():
+@api_bp.route('/storage/stats', methods=['GET'])
+def get_storage_stats():
     """
-    获取数据分析概览
+    获取存储统计
     
     请求方式：GET
-    请求参数：
-    - period: 可选，字符串，统计周期：day/week/month/year，默认month
-    - start_date: 可选，日期字符串，开始日期
-    - end_date: 可选，日期字符串，结束日期
     
-    返回：
+    返回（TinyDB延迟写入时）：
     {
         "success": true,
         "data": {
-            "total_contents": 1000,
-            "contents_by_type": {
-                "article": 500,
-                "product": 300,
-                "blog": 200
-            },
-            "contents_by_language": {
-                "zh": 600,
-                "en": 400
-            },
-            "generation_trend": [{
-                "date": "2024-01-01",
-                "count": 10
-            }],
-            "average_scores": {
-                "seo": 85,
-                "readability": 90
-            }
+            "backend": "tinydb",
+            "write_behind": true,
+            "pending_writes": 3,
+            "flushes": 120,
+            "writes_per_flush": 6.5,
+            "avg_flush_ms": 4.2,
+            "flush_errors": 0,
+            "last_flush_error": null,
+            ...
         }
     }
     """
     try:
-        period = request.args.get('period', 'month')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        overview = analytics_service.get_overview(period, start_date, end_date)
-        return jsonify({
-            'success': True,
-            'data': overview
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@api_bp.route('/analytics/keywords', methods=['GET'])
-def get_keywords_analytics():
-    """
-    获取关键词分析
-    
-    请求方式：GET
-    请求参数：
-    - period: 可选，字符串，统计周期：day/week/month/year，默认month
-    - limit: 可选，整数，返回数量，默认10
-    
-    返回：
-    {
-        "success": true,
-        "data": {
-            "top_keywords": [{
-                "keyword": "关键词1",
-                "count": 100,
-                "average_score": 85
-            }],
-            "keyword_trends": [{
-                "date": "2024-01-01",
-                "keywords": {
-                    "关键词1": 10,
-                    "关键词2": 8
-                }
-            }]
-        }
-    }
-    """
-    try:
-        period = request.args.get('period', 'month')
-        limit = int(request.args.get('limit', 10))
-        
-        analytics = analytics_service.get_keywords_analytics(period, limit)
         return jsonify({
             'success': True,
-            'data': analytics
+            'data': db.stats()
         })
     except Exception as e:
         return jsonify({
@@ -1,14 +1,59 @@
 from flask import Flask
 from flask_cors import CORS
-from .api.routes import api_bp
+from importlib import import_module
+import time
+from .utils.config import Config
+from .api.health_routes import health_bp
+
+# 角色 -> (蓝图所在模块, 蓝图名)
+# 模块在create_app中按需导入，未启用generation角色的进程不会加载torch/transformers/textrazor/jieba
+ROLE_BLUEPRINTS = {
+    'crud': ('.api.routes', 'api_bp'),
+    'analytics': ('.api.analytics_routes', 'analytics_bp'),
+    'generation': ('.api.generation_routes', 'generation_bp'),
+}
+
+def create_app(roles=None, load_model=False):
+    """
+    创建Flask应用
+    
+    Args:
+        roles (list): 启用的服务角色（crud/analytics/generation），默认取APP_ROLES配置
+        load_model (bool): 返回前同步加载并预热模型（预fork部署时在父进程中调用），
+            默认按MODEL_PRELOAD在后台线程中加载
+        
+    Returns:
+        Flask: 应用实例，app.config['STARTUP_SECONDS']为导入蓝图及初始化耗时
+    """
+    started_at = time.perf_counter()
+    config = Config()
+    if roles is None:
+        roles = config.APP_ROLES
+    roles = list(dict.fromkeys(roles))
+    unknown = [role for role in roles if role not in ROLE_BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"未知的服务角色: {', '.join(unknown)}")
 
-def create_app():
     app = Flask(__name__)
     CORS(app)  # 启用跨域支持
+    app.config['ROLES'] = roles
     
     # 注册蓝图
-    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(health_bp, url_prefix='/api')
+    for role in roles:
+        module_name, blueprint_name = ROLE_BLUEPRINTS[role]
+        module = import_module(module_name, __package__)
+        app.register_blueprint(getattr(module, blueprint_name), url_prefix='/api')
+    
+    if 'generation' in roles:
+        from .api.generation_routes import seo_generator
+        if load_model and not config.INFERENCE_SERVERS:
+            seo_generator.load()
+        elif config.MODEL_PRELOAD:
+            # 模型在后台加载，不阻塞服务启动
+            seo_generator.start_background_load()
     
+    app.config['STARTUP_SECONDS'] = round(time.perf_counter() - started_at, 3)
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+"""
+推理配置档
+
+- default：原有行为，float16 + device_map='auto'（有GPU时放在GPU上）
+- cpu-fp32：CPU上的float32推理，兼容性最好
+- cpu-bf16：CPU上的bfloat16推理，需要CPU支持AVX512-BF16/AMX才有加速
+- cpu-int8-dynamic：float32加载后对所有Linear层做动态int8量化（权重int8，激活按批动态量化）
+"""
+
+INFERENCE_PROFILES = {
+    "default": {
+        "torch_dtype": "float16",
+        "device": "auto",
+        "quantization": None
+    },
+    "cpu-fp32": {
+        "torch_dtype": "float32",
+        "device": "cpu",
+        "quantization": None
+    },
+    "cpu-bf16": {
+        "torch_dtype": "bfloat16",
+        "device": "cpu",
+        "quantization": None
+    },
+    "cpu-int8-dynamic": {
+        "torch_dtype": "float32",
+        "device": "cpu",
+        "quantization": "dynamic-int8"
+    }
+}
@@ -1,6 +1,7 @@
 """
 提示词配置文件
 """
+import json
 
 # SEO生成相关提示词
 SEO_SYSTEM_PROMPT = '''You are an SEO optimization expert. Follow these steps to generate SEO information:
@@ -36,13 +37,94 @@ SEO_ASSISTANT_EXAMPLE = '''{
     "keywords": ["electronics store", "gadgets online", "tech deals", "buy electronics", "electronic devices"]
 }'''
 
+# 少样本示例对应的业务类型（与SEO_ASSISTANT_EXAMPLE配套）
+SEO_EXAMPLE_BUSINESS_TYPE = "an e-commerce website that sells electronics and gadgets"
+
+# 提示词开头的引导语
+SEO_PROMPT_PREAMBLE = "Let's think about this step by step:\n\n"
+
+# 中文提示词（少样本示例由Config.SEO_STRUCT中的zh示例生成）
+SEO_SYSTEM_PROMPT_ZH = '''你是一名SEO优化专家。请按以下步骤生成SEO信息：
+
+1. 仔细分析需求
+2. 撰写有吸引力的标题（不超过60个字符）
+3. 撰写引人点击的Meta描述（不超过160个字符）
+4. 选择相关的关键词（5-10个）
+5. 以单个JSON对象格式输出
+6. 只返回JSON对象，不要输出其他文字
+
+注意：不要包含任何解释，只输出JSON对象。'''
+
+SEO_USER_PROMPT_TEMPLATE_ZH = '''为{business_type}生成SEO优化的JSON对象。
+
+格式要求：
+{{
+    "title": "...",
+    "metaDescription": "...",
+    "keywords": [...]
+}}
+
+逐步思考：
+1. 这个业务适合什么样的SEO标题？
+2. 什么样的Meta描述能带来点击？
+3. 用户会搜索哪些关键词？
+
+现在只生成JSON对象。'''
+
+SEO_EXAMPLE_BUSINESS_TYPE_ZH = "无线耳机评测与导购网站"
+
+SEO_PROMPT_PREAMBLE_ZH = "让我们一步一步思考：\n\n"
+
+# 各语言的提示词配置，未提供assistant_example时由build_prompt_set根据SEO示例生成
+SEO_PROMPTS = {
+    "en": {
+        "system": SEO_SYSTEM_PROMPT,
+        "user_template": SEO_USER_PROMPT_TEMPLATE,
+        "assistant_example": SEO_ASSISTANT_EXAMPLE,
+        "example_business_type": SEO_EXAMPLE_BUSINESS_TYPE,
+        "preamble": SEO_PROMPT_PREAMBLE
+    },
+    "zh": {
+        "system": SEO_SYSTEM_PROMPT_ZH,
+        "user_template": SEO_USER_PROMPT_TEMPLATE_ZH,
+        "example_business_type": SEO_EXAMPLE_BUSINESS_TYPE_ZH,
+        "preamble": SEO_PROMPT_PREAMBLE_ZH
+    }
+}
+
+
+def build_prompt_set(language, seo_example=None):
+    """
+    获取指定语言的提示词配置
+
+    Args:
+        language (str): 语言，需在SEO_PROMPTS中
+        seo_example (dict): SEO示例（Config.SEO_STRUCT中的格式），
+            提示词配置没有assistant_example时用于生成少样本示例
+
+    Returns:
+        dict: system、user_template、assistant_example、example_business_type、preamble
+    """
+    if language not in SEO_PROMPTS:
+        raise ValueError(f"不支持的语言: {language}")
+    prompts = dict(SEO_PROMPTS[language])
+    if 'assistant_example' not in prompts:
+        if not seo_example:
+            raise ValueError(f"语言{language}缺少SEO示例")
+        prompts['assistant_example'] = json.dumps({
+            "title": seo_example["title"],
+            "metaDescription": seo_example["meta_description"],
+            "keywords": seo_example["keywords"]
+        }, ensure_ascii=False, indent=4)
+    return prompts
+
 # 生成参数配置
 GENERATION_PARAMS = {
     "temperature": 0.7,
     "top_p": 0.95,
     "repetition_penalty": 1.2,
     "no_repeat_ngram_size": 3,
-    "max_length": 500
+    "max_new_tokens": 256
 }
 
 # 字段验证配置
@@ -51,6 +133,7 @@ VALIDATION_PARAMS = {
     "meta_description_max_length": 160,
     "min_keywords": 5,
     "max_keywords": 10,
+    "keyword_max_length": 50,
     "default_keywords": [
         "online shopping",
         "best deals",
@@ -0,0 +1,109 @@
+import argparse
+import logging
+import multiprocessing
+import os
+from .utils.config import Config
+from .services.inference_client import format_address, require_authkey
+
+
+def split_cores(cores, replicas, cores_per_replica=None):
+    """
+    将可用CPU核心划分为互不相交的核心组
+
+    Args:
+        cores (iterable): 可用核心编号
+        replicas (int): 副本数量
+        cores_per_replica (int): 每个副本的核心数，默认平均分配
+
+    Returns:
+        list: 每个副本的核心列表
+    """
+    cores = sorted(cores)
+    if cores_per_replica is None:
+        cores_per_replica = max(1, len(cores) // replicas)
+    if cores_per_replica * replicas > len(cores):
+        raise ValueError(f"可用CPU核心不足: {replicas}个副本 x {cores_per_replica}核 > {len(cores)}核")
+    return [cores[i * cores_per_replica:(i + 1) * cores_per_replica] for i in range(replicas)]
+
+
+def _run_replica(address, authkey, cpu_cores, model_name, model_dir):
+    # 在子进程中才导入torch/transformers，父进程只负责启动和监控
+    from .services.inference_server import run_replica
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(processName)s] %(levelname)s %(message)s')
+    config = Config()
+    run_replica(
+        address,
+        authkey,
+        cpu_cores=cpu_cores,
+        max_wait_ms=config.SCHEDULER_MAX_WAIT_MS,
+        max_batch_size=config.SCHEDULER_MAX_BATCH_SIZE,
+        max_queue_size=config.SCHEDULER_MAX_QUEUE_SIZE,
+        model_name=model_name,
+        model_dir=model_dir,
+        use_prefix_cache=config.USE_PREFIX_CACHE,
+        profile=config.INFERENCE_PROFILE,
+        # 绑定核心时计算线程数已按核心数设置，TORCH_NUM_THREADS只在不绑定时生效
+        num_threads=None if cpu_cores else (config.TORCH_NUM_THREADS or None),
+        num_interop_threads=config.TORCH_INTEROP_THREADS or None,
+        compile_model=config.TORCH_COMPILE,
+        draft_model_name=config.DRAFT_MODEL_NAME or None,
+        draft_model_dir=config.DRAFT_MODEL_DIR or None
+    )
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description='启动独立的推理服务进程（每个副本持有一份模型）')
+    parser.add_argument('--replicas', type=int, default=config.INFERENCE_REPLICAS, help='副本数量')
+    parser.add_argument('--host', default=config.INFERENCE_HOST, help='监听地址')
+    parser.add_argument('--base-port', type=int, default=config.INFERENCE_BASE_PORT, help='第一个副本的端口，后续副本依次加1')
+    parser.add_argument('--socket-dir', help='改用Unix套接字，在该目录下创建seo-inference-<n>.sock')
+    parser.add_argument('--cores-per-replica', type=int, help='每个副本绑定的CPU核心数，默认平均分配')
+    parser.add_argument('--no-pin', action='store_true', help='不绑定CPU核心')
+    parser.add_argument('--model-name', default=config.MODEL_NAME, help='模型名称')
+    parser.add_argument('--model-dir', default=config.MODEL_DIR or None, help='本地模型快照目录（python -m backend.prepare_model生成）')
+    args = parser.parse_args()
+
+    try:
+        authkey = require_authkey(config.INFERENCE_AUTHKEY)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.no_pin or not hasattr(os, 'sched_getaffinity'):
+        core_sets = [None] * args.replicas
+    else:
+        core_sets = split_cores(os.sched_getaffinity(0), args.replicas, args.cores_per_replica)
+
+    if args.socket_dir:
+        os.makedirs(args.socket_dir, exist_ok=True)
+        addresses = [os.path.join(args.socket_dir, f'seo-inference-{i}.sock') for i in range(args.replicas)]
+    else:
+        addresses = [(args.host, args.base_port + i) for i in range(args.replicas)]
+
+    # spawn：副本进程不继承父进程状态，各自初始化torch线程池
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for index, (address, cores) in enumerate(zip(addresses, core_sets)):
+        process = context.Process(
+            target=_run_replica,
+            args=(address, authkey, cores, args.model_name, args.model_dir),
+            name=f'inference-replica-{index}'
+        )
+        process.start()
+        processes.append(process)
+        print(f"副本{index}: pid={process.pid} 地址={format_address(address)} CPU核心={cores or '不绑定'}")
+
+    print(f"INFERENCE_SERVERS={','.join(format_address(a) for a in addresses)}")
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == '__main__':
+    main()
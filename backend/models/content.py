@@ -1,5 +1,6 @@
 from datetime import datetime
 from ..utils.db import db
+from ..utils.content_query import CURSOR_NEXT, CURSOR_PREV, decode_cursor, encode_cursor
 
 class ContentModel:
     def __init__(self):
@@ -166,13 +167,42 @@ class Content:
         return None
         
     @staticmethod
-    def get_list(limit=10, skip=0, sort_by='created_at', order='desc'):
-        """获取内容列表，支持排序"""
-        contents_data = db.get_contents(limit, skip)
-        contents = [Content.from_db_dict(c) for c in contents_data]
+    def get_list(limit=10, skip=0, sort_by='created_at', order='desc', business_type=None):
+        """获取内容列表，支持排序和按业务类型筛选"""
+        page = db.get_contents(limit, skip, sort_by, order, business_type=business_type)
+        contents = [Content.from_db_dict(c) for c in page['items']]
         contents = [c for c in contents if c is not None]  # 过滤掉无效内容
-        total = db.get_contents_count()  # 获取总数
-        return contents, total
+        return contents, page['total']
+
+    @staticmethod
+    def get_page(limit=10, skip=0, cursor=None, business_type=None):
+        """
+        按创建时间倒序获取一页内容，并返回前后页的游标
+
+        传入cursor时使用游标分页（不受skip影响，也不会因新增内容而重复或遗漏），
+        否则按skip分页；两种方式返回的next_cursor/prev_cursor都可用于继续翻页。
+        cursor无效时抛出ValueError。
+        """
+        if cursor:
+            direction, key = decode_cursor(cursor)
+            if direction == CURSOR_NEXT:
+                page = db.get_contents_keyset(limit, after=key, business_type=business_type)
+            else:
+                page = db.get_contents_keyset(limit, before=key, business_type=business_type)
+            has_newer, has_older = page['has_newer'], page['has_older']
+        else:
+            page = db.get_contents(limit, skip, business_type=business_type)
+            has_newer = skip > 0
+            has_older = skip + len(page['items']) < page['total']
+
+        items = [c for c in page['items'] if isinstance(c, dict)]
+        contents = [Content.from_db_dict(c) for c in items]
+        return {
+            'contents': contents,
+            'total': page['total'],
+            'next_cursor': encode_cursor(CURSOR_NEXT, items[-1]) if items and has_older else None,
+            'prev_cursor': encode_cursor(CURSOR_PREV, items[0]) if items and has_newer else None
+        }
         
     @staticmethod
     def from_db_dict(data):
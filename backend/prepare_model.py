@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from .utils.config import Config
+
+# 快照目录中记录来源模型等信息的文件
+MANIFEST_FILE = 'seo_snapshot.json'
+
+
+def _dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return round(total / 1024 / 1024, 1)
+
+
+def prepare_snapshot(model_name, output_dir, token=None, max_shard_size='2GB'):
+    """
+    下载模型并保存为本地快照（分词器 + safetensors格式的float16权重）
+
+    Args:
+        model_name (str): Hugging Face模型名称
+        output_dir (str): 快照目录
+        token (str): Hugging Face token，为空时使用本机登录的凭据
+        max_shard_size (str): 单个权重文件的最大大小
+
+    Returns:
+        dict: 快照信息
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    started_at = time.monotonic()
+    auth = token or True
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_auth_token=auth)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        torch_dtype=torch.float16,
+        low_cpu_mem_usage=True,
+        use_auth_token=auth
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)
+    model.save_pretrained(output_dir, safe_serialization=True, max_shard_size=max_shard_size)
+
+    manifest = {
+        'model_name': model_name,
+        'torch_dtype': 'float16',
+        'format': 'safetensors',
+        'created_at': datetime.now().isoformat(),
+        'prepare_seconds': round(time.monotonic() - started_at, 1),
+        'size_mb': _dir_size_mb(output_dir)
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main():
+    config = Config()
+    default_dir = config.MODEL_DIR or os.path.join('models', config.MODEL_NAME.split('/')[-1])
+
+    parser = argparse.ArgumentParser(description='将模型保存为本地快照，服务启动时从本地加载、不访问网络')
+    parser.add_argument('--model-name', default=config.MODEL_NAME, help='Hugging Face模型名称')
+    parser.add_argument('--output', default=default_dir, help='快照目录')
+    parser.add_argument('--max-shard-size', default='2GB', help='单个权重文件的最大大小')
+    args = parser.parse_args()
+
+    manifest = prepare_snapshot(args.model_name, args.output, config.HF_TOKEN, args.max_shard_size)
+    print(f"快照已保存到 {args.output}（{manifest['size_mb']} MB，耗时 {manifest['prepare_seconds']} 秒）")
+    print(f"启动服务时设置 MODEL_DIR={args.output}")
+
+
+if __name__ == '__main__':
+    main()
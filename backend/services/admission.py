@@ -0,0 +1,200 @@
+import math
+import threading
+import time
+from collections import deque
+from .cancellation import cancellation_stats, STAGE_QUEUED
+from .generation_errors import GenerationCancelledError
+
+# 优先级类别，按优先级从高到低
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BATCH = 'batch'
+
+
+class AdmissionRejectedError(Exception):
+    """准入队列已满，请求被拒绝"""
+
+    def __init__(self, message, priority, queue_depth, retry_after):
+        super().__init__(message)
+        self.priority = priority
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(math.ceil(percent / 100.0 * len(sorted_values))) - 1)
+    return sorted_values[max(0, index)]
+
+
+class _PriorityClass:
+    def __init__(self, name, max_concurrency, max_queue, wait_window=1000):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = deque()
+
+        # 统计数据
+        self.admitted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_service = 0.0
+        # 最近的排队时间，用于计算分位数
+        self.recent_waits = deque(maxlen=wait_window)
+
+
+class AdmissionTicket:
+    """准入凭证，生成结束后调用release（可重复调用）或用作上下文管理器"""
+
+    def __init__(self, controller, priority_class, wait_seconds):
+        self._controller = controller
+        self._class = priority_class
+        self.wait_seconds = wait_seconds
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        self._controller._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class AdmissionController:
+    """
+    生成请求的准入控制
+
+    每个优先级类别有独立的并发上限和有界等待队列：
+    - 未达并发上限且没有更早的同类请求排队时立即准入；
+    - 否则进入本类别的队列等待，队列已满时立即抛出AdmissionRejectedError（接口层返回429）；
+    - 高优先级类别有请求排队时，低优先级类别不再准入新请求，
+      交互式请求不会排在批量任务之后，批量任务只使用交互式请求留下的空闲。
+    排队期间检查请求的CancelToken，超过截止时间或客户端断开时退出队列。
+    """
+
+    def __init__(self, classes, poll_interval=0.25):
+        """
+        Args:
+            classes (list): 按优先级从高到低排列的(名称, 并发上限, 队列上限)
+            poll_interval (float): 排队时检查取消标记的间隔（秒）
+        """
+        self.poll_interval = poll_interval
+        self._classes = [_PriorityClass(name, max_concurrency, max_queue) for name, max_concurrency, max_queue in classes]
+        self._by_name = {c.name: c for c in self._classes}
+        self._cond = threading.Condition()
+
+    @property
+    def priorities(self):
+        return [c.name for c in self._classes]
+
+    def _can_run(self, priority_class):
+        """需持有锁"""
+        if priority_class.running >= priority_class.max_concurrency:
+            return False
+        for higher in self._classes:
+            if higher is priority_class:
+                return True
+            if higher.waiting:
+                return False
+        return True
+
+    def _retry_after(self, priority_class):
+        """按平均服务时间估算排到该请求所需的秒数（需持有锁）"""
+        if not priority_class.completed:
+            return 1
+        avg_service = priority_class.total_service / priority_class.completed
+        estimate = avg_service * (len(priority_class.waiting) + 1) / priority_class.max_concurrency
+        return max(1, int(math.ceil(estimate)))
+
+    def acquire(self, priority, cancel_token=None):
+        """
+        申请准入，必要时排队等待
+
+        Args:
+            priority (str): 优先级类别
+            cancel_token (CancelToken): 排队期间检查的取消标记
+
+        Returns:
+            AdmissionTicket: 准入凭证，生成结束后需要release
+        """
+        priority_class = self._by_name.get(priority)
+        if priority_class is None:
+            raise ValueError(f"未知的优先级: {priority}，可选: {', '.join(self.priorities)}")
+
+        enqueued_at = time.monotonic()
+        with self._cond:
+            if priority_class.waiting or not self._can_run(priority_class):
+                if len(priority_class.waiting) >= priority_class.max_queue:
+                    priority_class.rejected += 1
+                    raise AdmissionRejectedError(
+                        "生成请求过多，请稍后重试",
+                        priority,
+                        len(priority_class.waiting),
+                        self._retry_after(priority_class)
+                    )
+                waiter = object()
+                priority_class.waiting.append(waiter)
+                try:
+                    while priority_class.waiting[0] is not waiter or not self._can_run(priority_class):
+                        if cancel_token is not None and cancel_token.cancelled:
+                            priority_class.cancelled += 1
+                            cancellation_stats.record(cancel_token.reason, STAGE_QUEUED)
+                            raise GenerationCancelledError(cancel_token.message, cancel_token.reason)
+                        timeout = self.poll_interval if cancel_token is not None else None
+                        remaining = cancel_token.remaining() if cancel_token is not None else None
+                        if remaining is not None:
+                            timeout = min(timeout, remaining)
+                        self._cond.wait(timeout)
+                finally:
+                    priority_class.waiting.remove(waiter)
+                    # 队首变化可能使本类别或低优先级类别的请求可以准入
+                    self._cond.notify_all()
+
+            wait = time.monotonic() - enqueued_at
+            priority_class.running += 1
+            priority_class.admitted += 1
+            priority_class.total_wait += wait
+            priority_class.max_wait = max(priority_class.max_wait, wait)
+            priority_class.recent_waits.append(wait)
+        return AdmissionTicket(self, priority_class, wait)
+
+    def _release(self, ticket):
+        with self._cond:
+            if ticket._released:
+                return
+            ticket._released = True
+            priority_class = ticket._class
+            priority_class.running -= 1
+            priority_class.completed += 1
+            priority_class.total_service += time.monotonic() - ticket.admitted_at
+            self._cond.notify_all()
+
+    def stats(self):
+        """各优先级类别的并发、排队和排队时间统计"""
+        with self._cond:
+            result = {}
+            for c in self._classes:
+                waits = sorted(c.recent_waits)
+                result[c.name] = {
+                    'max_concurrency': c.max_concurrency,
+                    'max_queue': c.max_queue,
+                    'running': c.running,
+                    'queue_depth': len(c.waiting),
+                    'admitted': c.admitted,
+                    'rejected': c.rejected,
+                    'cancelled': c.cancelled,
+                    'avg_wait_ms': round(c.total_wait * 1000 / c.admitted, 2) if c.admitted else 0,
+                    'p50_wait_ms': round(_percentile(waits, 50) * 1000, 2),
+                    'p95_wait_ms': round(_percentile(waits, 95) * 1000, 2),
+                    'p99_wait_ms': round(_percentile(waits, 99) * 1000, 2),
+                    'max_wait_ms': round(c.max_wait * 1000, 2),
+                    'avg_service_ms': round(c.total_service * 1000 / c.completed, 2) if c.completed else 0
+                }
+            return result
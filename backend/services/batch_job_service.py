@@ -0,0 +1,167 @@
+import logging
+import time
+import uuid
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from ..models.content import Content
+from ..utils.batch_job_store import BatchJobStore
+from .admission import AdmissionRejectedError, PRIORITY_BATCH
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJobService:
+    """
+    批量生成任务服务
+
+    提交任务后立即返回任务ID，任务按块（chunk）拆分后交给后台线程池执行，
+    每个块调用一次SEOGenerator.generate_seo_batch，验证后通过Content.save_batch批量保存。
+    线程池规模独立配置，避免批量任务占满交互式/api/generate所需的计算资源；
+    配置了准入控制时，每个块以batch优先级申请准入，在线请求排队时让出空位。
+    任务状态和结果保存在BatchJobStore中，多worker部署时任一worker都能查询和取消任务；
+    任务只由提交它的worker执行，该worker退出时未完成的块不会再执行。
+    """
+
+    def __init__(self, seo_generator, content_validator, max_workers=1, chunk_size=8, max_finished_jobs=100,
+                 ready_timeout=600, admission=None, job_store=None):
+        self.seo_generator = seo_generator
+        self.admission = admission
+        self.content_validator = content_validator
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_finished_jobs = max_finished_jobs
+        self.ready_timeout = ready_timeout
+        self.job_store = job_store or BatchJobStore()
+        self._executor = None
+
+    def _get_executor(self):
+        """首次提交任务时才创建线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='batch-job'
+            )
+        return self._executor
+
+    def submit(self, business_types, language=None):
+        """
+        提交批量生成任务
+
+        Args:
+            business_types (list): 业务类型列表
+            language (str): 语言，决定使用的模型和提示词，为空时使用默认语言
+
+        Returns:
+            dict: 任务状态
+        """
+        business_types = list(business_types)
+        job_id = uuid.uuid4().hex
+        chunks = [
+            (start, business_types[start:start + self.chunk_size])
+            for start in range(0, len(business_types), self.chunk_size)
+        ]
+        job = self.job_store.create(
+            job_id, len(business_types), len(chunks), language=language, max_finished_jobs=self.max_finished_jobs
+        )
+
+        executor = self._get_executor()
+        for start, chunk in chunks:
+            executor.submit(self._run_chunk, job_id, language, start, chunk)
+
+        return job
+
+    def get_job(self, job_id):
+        """获取任务状态和进度，任务不存在时返回None"""
+        return self.job_store.get(job_id)
+
+    def get_results(self, job_id, offset=0, limit=100):
+        """
+        获取任务的部分结果
+
+        Args:
+            job_id (str): 任务ID
+            offset (int): 起始位置（按提交顺序）
+            limit (int): 返回数量
+
+        Returns:
+            dict: 已完成的结果列表及下一次查询的offset，任务不存在时返回None
+        """
+        return self.job_store.results(job_id, offset, limit)
+
+    def cancel(self, job_id):
+        """取消任务，尚未开始的块将被跳过"""
+        return self.job_store.cancel(job_id)
+
+    def _run_chunk(self, job_id, language, start, chunk):
+        """后台执行单个块：生成、验证、批量保存"""
+        try:
+            if self.job_store.start_chunk(job_id):
+                results = [{
+                    'business_type': business_type,
+                    'success': False,
+                    'content': None,
+                    'error': '任务已取消'
+                } for business_type in chunk]
+            else:
+                results = self._process_chunk(chunk, language)
+        except Exception as e:
+            results = [{
+                'business_type': business_type,
+                'success': False,
+                'content': None,
+                'error': str(e)
+            } for business_type in chunk]
+
+        try:
+            self.job_store.finish_chunk(job_id, start, results)
+        except Exception:
+            logger.exception("保存批量任务结果失败: job=%s offset=%d", job_id, start)
+
+    def _admit(self):
+        """以batch优先级申请准入，队列已满时按Retry-After等待后重试，而不是让块失败"""
+        if self.admission is None:
+            return nullcontext()
+        while True:
+            try:
+                return self.admission.acquire(PRIORITY_BATCH)
+            except AdmissionRejectedError as e:
+                time.sleep(e.retry_after)
+
+    def _process_chunk(self, chunk, language=None):
+        """生成并保存一个块，返回与chunk顺序一致的结果"""
+        # 模型仍在加载时等待加载结束，而不是让整个块直接失败
+        self.seo_generator.start_background_load(language=language)
+        self.seo_generator.wait_until_ready(self.ready_timeout, language=language)
+        with self._admit():
+            generated = self.seo_generator.generate_seo_batch(chunk, batch_size=len(chunk), language=language)
+
+        results = []
+        contents = []
+        for row in generated:
+            result = {
+                'business_type': row['business_type'],
+                'success': row['success'],
+                'content': row['data'],
+                'error': row['error']
+            }
+            if row['success']:
+                try:
+                    result['validation'] = self.content_validator.validate(row['data'])
+                    content = Content(
+                        title=row['data']['title'],
+                        meta_description=row['data']['metaDescription'],
+                        keywords=row['data']['keywords'],
+                        business_type=row['business_type']
+                    )
+                    contents.append((result, content))
+                except Exception as e:
+                    result['success'] = False
+                    result['error'] = f"内容验证失败: {str(e)}"
+            results.append(result)
+
+        if contents:
+            saved = Content.save_batch([content for _, content in contents])
+            for (result, _), content_id in zip(contents, saved['inserted_ids']):
+                result['content_id'] = content_id
+
+        return results
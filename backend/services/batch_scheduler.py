@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from .cancellation import cancellation_stats, STAGE_QUEUED
+from .generation_errors import GenerationFailedError, GenerationCancelledError
+
+
+class SchedulerQueueFullError(Exception):
+    """调度队列已满"""
+    pass
+
+
+class _PendingRequest:
+    def __init__(self, business_type, options, cancel_token=None):
+        self.business_type = business_type
+        self.options = options
+        # 取消标记不参与分组，同一批次的请求可以有各自的截止时间
+        self.cancel_token = cancel_token
+        self.key = tuple(sorted(options.items()))
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatchScheduler:
+    """
+    动态微批调度器
+
+    并发到达的单条生成请求先进入队列，调度线程以第一条请求的到达时间为起点，
+    最多等待max_wait_ms或凑满max_batch_size条相同生成参数的请求，
+    然后通过一次generate_seo_batch调用执行，并把每行结果交还给对应的等待方。
+    出队时已取消（超过截止时间或客户端已断开）的请求直接丢弃，不再占用生成资源。
+    """
+
+    def __init__(self, seo_generator, max_wait_ms=20, max_batch_size=8, max_queue_size=256):
+        self.seo_generator = seo_generator
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+        # 统计数据
+        self._batches = 0
+        self._requests = 0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._cancelled = 0
+
+    def _ensure_started(self):
+        """首次提交时启动调度线程（fork后在子进程中重新启动）"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='micro-batch-scheduler', daemon=True)
+        self._thread.start()
+
+    def submit(self, business_type, cancel_token=None, **options):
+        """
+        提交单条生成请求
+
+        Args:
+            business_type (str): 业务类型
+            cancel_token (CancelToken): 取消标记，出队前已取消的请求不会执行
+            **options: 传给generate_seo_batch的生成参数，只有参数相同的请求才会合并
+
+        Returns:
+            Future: 结果为generate_seo_batch返回的单行结果
+        """
+        request = _PendingRequest(business_type, options, cancel_token)
+        with self._cond:
+            self._ensure_started()
+            if len(self._pending) >= self.max_queue_size:
+                raise SchedulerQueueFullError("生成队列已满，请稍后重试")
+            self._pending.append(request)
+            self._cond.notify()
+        return request.future
+
+    def generate_seo(self, business_type, timeout=None, return_candidates=False, cancel_token=None, **options):
+        """与SEOGenerator.generate_seo相同的阻塞接口，最多等待到cancel_token的截止时间"""
+        future = self.submit(business_type, cancel_token=cancel_token, return_candidates=return_candidates, **options)
+        remaining = cancel_token.remaining() if cancel_token is not None else None
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            row = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise GenerationCancelledError(cancel_token.message, cancel_token.reason)
+            raise
+        if row.get('cancelled'):
+            raise GenerationCancelledError(row['error'], row['cancelled'])
+        if not row['success']:
+            raise GenerationFailedError(f"SEO生成失败: {row['error']}", row.get('candidates'))
+        if return_candidates:
+            return row['data'], row['candidates']
+        return row['data']
+
+    def _count_matching(self, key):
+        return sum(1 for r in self._pending if r.key == key)
+
+    def _take_batch(self):
+        """等待并取出下一批请求（需持有锁）"""
+        while not self._pending:
+            self._cond.wait()
+
+        first = self._pending[0]
+        deadline = first.enqueued_at + self.max_wait_ms / 1000.0
+        while self._count_matching(first.key) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        batch = []
+        remaining_requests = deque()
+        for request in self._pending:
+            if request.key == first.key and len(batch) < self.max_batch_size:
+                batch.append(request)
+            else:
+                remaining_requests.append(request)
+        self._pending = remaining_requests
+
+        live = []
+        for request in batch:
+            token = request.cancel_token
+            if token is not None and token.cancelled:
+                self._cancelled += 1
+                cancellation_stats.record(token.reason, STAGE_QUEUED)
+                request.future.set_exception(GenerationCancelledError(token.message, token.reason))
+            else:
+                live.append(request)
+        return live
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                continue
+
+            started_at = time.monotonic()
+            self._record_batch(batch, started_at)
+
+            options = dict(batch[0].key)
+            if any(r.cancel_token is not None for r in batch):
+                options['cancel_tokens'] = [r.cancel_token for r in batch]
+            try:
+                rows = self.seo_generator.generate_seo_batch(
+                    [r.business_type for r in batch],
+                    batch_size=len(batch),
+                    **options
+                )
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, row in zip(batch, rows):
+                request.future.set_result(row)
+
+    def _record_batch(self, batch, started_at):
+        with self._cond:
+            self._batches += 1
+            self._requests += len(batch)
+            self._last_batch_size = len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            for request in batch:
+                wait = started_at - request.enqueued_at
+                self._total_wait += wait
+                self._max_wait_seen = max(self._max_wait_seen, wait)
+
+    def stats(self):
+        """调度器配置与运行统计"""
+        with self._cond:
+            return {
+                'max_wait_ms': self.max_wait_ms,
+                'max_batch_size': self.max_batch_size,
+                'max_queue_size': self.max_queue_size,
+                'queue_depth': len(self._pending),
+                'batches': self._batches,
+                'requests': self._requests,
+                'avg_batch_size': round(self._requests / self._batches, 2) if self._batches else 0,
+                'last_batch_size': self._last_batch_size,
+                'max_batch_size_seen': self._max_batch_seen,
+                'cancelled_in_queue': self._cancelled,
+                'avg_queue_wait_ms': round(self._total_wait * 1000 / self._requests, 2) if self._requests else 0,
+                'max_queue_wait_ms': round(self._max_wait_seen * 1000, 2)
+            }
@@ -0,0 +1,110 @@
+import socket
+import threading
+import time
+
+# 取消原因
+CANCEL_DEADLINE = 'deadline'
+CANCEL_DISCONNECTED = 'disconnected'
+CANCEL_REQUESTED = 'cancelled'
+
+CANCEL_MESSAGES = {
+    CANCEL_DEADLINE: '生成超时',
+    CANCEL_DISCONNECTED: '客户端已断开连接',
+    CANCEL_REQUESTED: '生成已取消'
+}
+
+# 取消发生的阶段
+STAGE_QUEUED = 'queued'
+STAGE_DECODING = 'decoding'
+
+
+class CancelToken:
+    """
+    单个生成请求的取消标记
+
+    满足以下任一条件即视为已取消：显式调用cancel、超过截止时间、is_disconnected返回True。
+    解码过程中每一步都会检查（见CancellationStoppingCriteria），检查本身只是时间比较和一次非阻塞的套接字窥探。
+    """
+
+    def __init__(self, timeout_ms=None, is_disconnected=None):
+        self.deadline = time.monotonic() + timeout_ms / 1000.0 if timeout_ms else None
+        self.is_disconnected = is_disconnected
+        self.reason = None
+        self._lock = threading.Lock()
+
+    def cancel(self, reason=CANCEL_REQUESTED):
+        """取消请求，只记录第一次的原因"""
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+
+    @property
+    def cancelled(self):
+        if self.reason is None:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel(CANCEL_DEADLINE)
+            elif self.is_disconnected is not None and self.is_disconnected():
+                self.cancel(CANCEL_DISCONNECTED)
+        return self.reason is not None
+
+    @property
+    def message(self):
+        return CANCEL_MESSAGES.get(self.reason, CANCEL_MESSAGES[CANCEL_REQUESTED])
+
+    def remaining(self):
+        """距截止时间的秒数，没有截止时间时返回None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def remaining_ms(self):
+        remaining = self.remaining()
+        return None if remaining is None else max(1, int(remaining * 1000))
+
+
+def socket_disconnect_checker(sock):
+    """
+    返回检测对端是否已关闭连接的函数
+
+    只用MSG_PEEK窥探，不读取数据；套接字不支持（如TLS套接字）时视为未断开。
+    """
+    def _is_disconnected():
+        try:
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+        except (BlockingIOError, InterruptedError):
+            return False
+        except ConnectionError:
+            return True
+        except (OSError, ValueError):
+            return False
+    return _is_disconnected
+
+
+class CancellationStats:
+    """被取消的生成请求计数（按原因和阶段）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, reason, stage, count=1):
+        with self._lock:
+            key = (reason, stage)
+            self._counts[key] = self._counts.get(key, 0) + count
+
+    def stats(self):
+        with self._lock:
+            by_reason = {}
+            by_stage = {}
+            for (reason, stage), count in self._counts.items():
+                by_reason[reason] = by_reason.get(reason, 0) + count
+                by_stage[stage] = by_stage.get(stage, 0) + count
+            return {
+                'total': sum(self._counts.values()),
+                'by_reason': by_reason,
+                'by_stage': by_stage
+            }
+
+
+# 进程内共享的取消统计
+cancellation_stats = CancellationStats()
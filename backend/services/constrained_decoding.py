@@ -0,0 +1,229 @@
+from bisect import bisect_right
+
+import torch
+from transformers import LogitsProcessor
+from ..config.prompts import VALIDATION_PARAMS
+
+# 输出结构：字段名、类型、字符串最大长度
+SEO_JSON_FIELDS = (
+    ('title', 'string', VALIDATION_PARAMS['title_max_length']),
+    ('metaDescription', 'string', VALIDATION_PARAMS['meta_description_max_length']),
+    ('keywords', 'array', VALIDATION_PARAMS['keyword_max_length']),
+)
+
+WHITESPACE = ' \n\t\r'
+# 结构字符之间允许的最大连续空白数，避免模型陷入空白循环
+MAX_WHITESPACE_RUN = 8
+
+# 状态：(阶段, 字段序号, 字段名匹配位置/字符串长度, 关键词数量, 连续空白数)
+INITIAL_STATE = ('start', 0, 0, 0, 0)
+
+
+def _advance(state, ch, fields=SEO_JSON_FIELDS):
+    """输入一个字符，返回新状态；字符不合法时返回None"""
+    stage, field, pos, count, ws = state
+    name, kind, max_length = fields[field]
+
+    if stage in ('string', 'item'):
+        if ch == '"':
+            if pos == 0:
+                return None
+            if stage == 'string':
+                return ('after_value', field, 0, count, 0)
+            return ('after_item', field, 0, count + 1, 0)
+        if ch == '\\' or ord(ch) < 0x20 or pos >= max_length:
+            return None
+        return (stage, field, pos + 1, count, 0)
+
+    if stage == 'key':
+        if pos < len(name):
+            return ('key', field, pos + 1, count, 0) if ch == name[pos] else None
+        return ('colon', field, 0, count, 0) if ch == '"' else None
+
+    if stage == 'done':
+        return None
+
+    if ch in WHITESPACE:
+        return (stage, field, pos, count, ws + 1) if ws < MAX_WHITESPACE_RUN else None
+
+    if stage == 'start':
+        return ('before_key', field, 0, count, 0) if ch == '{' else None
+    if stage == 'before_key':
+        return ('key', field, 0, count, 0) if ch == '"' else None
+    if stage == 'colon':
+        return ('before_value', field, 0, count, 0) if ch == ':' else None
+    if stage == 'before_value':
+        if kind == 'string' and ch == '"':
+            return ('string', field, 0, count, 0)
+        if kind == 'array' and ch == '[':
+            return ('array_start', field, 0, 0, 0)
+        return None
+    if stage in ('array_start', 'before_item'):
+        return ('item', field, 0, count, 0) if ch == '"' else None
+    if stage == 'after_item':
+        if ch == ',' and count < VALIDATION_PARAMS['max_keywords']:
+            return ('before_item', field, 0, count, 0)
+        if ch == ']' and count >= VALIDATION_PARAMS['min_keywords']:
+            return ('after_value', field, 0, count, 0)
+        return None
+    if stage == 'after_value':
+        if ch == ',' and field < len(fields) - 1:
+            return ('before_key', field + 1, 0, 0, 0)
+        if ch == '}' and field == len(fields) - 1:
+            return ('done', field, 0, count, 0)
+        return None
+    return None
+
+
+def advance_text(state, text):
+    """输入一段文本，任一字符不合法时返回None"""
+    for ch in text:
+        state = _advance(state, ch)
+        if state is None:
+            return None
+    return state
+
+
+class ConstrainedVocabulary:
+    """
+    约束解码使用的词表索引（每个词表构建一次，由所有SeoJsonLogitsProcessor共享）
+
+    得分最高的候选token都不合法时，需要在整个词表中找出合法token。
+    逐个token检查的开销与词表大小成正比（Llama-3约128k），因此预先按以下方式分组：
+
+    - 字符串阶段：不含引号、反斜杠和控制字符的token只要长度不超过剩余长度就合法，
+      按长度排序后取前缀即可，只需逐个检查其余少量token
+    - 结构阶段：按去掉前导空白后的首字符分组，只检查首字符合法的分组
+
+    逐个检查的结果按状态缓存（状态只有几百种），同一状态只计算一次。
+    """
+
+    def __init__(self, vocab_texts, special_token_ids=()):
+        self.vocab_texts = vocab_texts
+        self.special_token_ids = set(special_token_ids)
+        plain = []
+        # 含引号、反斜杠或控制字符的token，字符串阶段需要逐个检查
+        self.other_ids = []
+        # 去掉前导空白后的首字符 -> token id列表（''为纯空白token）
+        self.ids_by_first_char = {}
+        for token_id, text in enumerate(vocab_texts):
+            if not text or token_id in self.special_token_ids:
+                continue
+            if all(ch not in '"\\' and ord(ch) >= 0x20 for ch in text):
+                plain.append((len(text), token_id))
+            else:
+                self.other_ids.append(token_id)
+            self.ids_by_first_char.setdefault(text.lstrip(WHITESPACE)[:1], []).append(token_id)
+        plain.sort()
+        self.plain_lengths = [length for length, _ in plain]
+        self.plain_ids = torch.tensor([token_id for _, token_id in plain], dtype=torch.long)
+        self._cache = {}
+
+    def is_allowed(self, state, token_id):
+        if token_id in self.special_token_ids or token_id >= len(self.vocab_texts):
+            return False
+        text = self.vocab_texts[token_id]
+        return bool(text) and advance_text(state, text) is not None
+
+    def _checked_ids(self, state):
+        """需要逐个检查的token中合法的部分（按状态缓存）"""
+        allowed = self._cache.get(state)
+        if allowed is None:
+            if state[0] in ('string', 'item'):
+                candidates = self.other_ids
+            else:
+                candidates = [
+                    token_id
+                    for ch, ids in self.ids_by_first_char.items()
+                    if not ch or _advance(state, ch) is not None
+                    for token_id in ids
+                ]
+            allowed = torch.tensor(
+                [token_id for token_id in candidates if advance_text(state, self.vocab_texts[token_id]) is not None],
+                dtype=torch.long
+            )
+            self._cache[state] = allowed
+        return allowed
+
+    def allowed_ids(self, state):
+        """状态下所有合法token的id（LongTensor）"""
+        stage, field, pos = state[:3]
+        allowed = self._checked_ids(state)
+        if stage in ('string', 'item'):
+            remaining = SEO_JSON_FIELDS[field][2] - pos
+            plain = self.plain_ids[:bisect_right(self.plain_lengths, remaining)]
+            allowed = torch.cat([plain, allowed])
+        return allowed
+
+
+class SeoJsonLogitsProcessor(LogitsProcessor):
+    """
+    按{title, metaDescription, keywords}结构约束解码
+
+    每一步只保留能使输出仍然符合结构的token，同时在解码过程中执行
+    VALIDATION_PARAMS中的标题/描述长度和关键词数量限制。
+    为控制开销，先检查得分最高的candidate_limit个token，
+    都不合法时再通过ConstrainedVocabulary取出所有合法token，保留其中得分最高的candidate_limit个。
+    """
+
+    def __init__(self, vocabulary, prompt_length, batch_size, eos_token_id, candidate_limit=64):
+        self.vocabulary = vocabulary
+        self.prompt_length = prompt_length
+        self.eos_token_id = eos_token_id
+        self.candidate_limit = candidate_limit
+        self.states = [INITIAL_STATE] * batch_size
+        self.processed = [0] * batch_size
+
+    def _update_state(self, row, generated):
+        state = self.states[row]
+        for position in range(self.processed[row], generated.shape[0]):
+            token_id = int(generated[position])
+            if state is None or state[0] == 'done':
+                break
+            state = advance_text(state, self.vocabulary.vocab_texts[token_id])
+        self.states[row] = state
+        self.processed[row] = generated.shape[0]
+
+    def _allowed_tokens(self, state, row_scores):
+        if state[0] == 'done':
+            return [self.eos_token_id]
+
+        limit = min(self.candidate_limit, row_scores.shape[0])
+        candidates = torch.topk(row_scores, limit).indices.tolist()
+        allowed = [t for t in candidates if self.vocabulary.is_allowed(state, t)]
+        if allowed:
+            return allowed
+
+        allowed_ids = self.vocabulary.allowed_ids(state)
+        allowed_ids = allowed_ids[allowed_ids < row_scores.shape[0]]
+        if allowed_ids.numel() == 0:
+            return []
+        limit = min(self.candidate_limit, allowed_ids.numel())
+        best = torch.topk(row_scores[allowed_ids.to(row_scores.device)], limit).indices.cpu()
+        return allowed_ids[best].tolist()
+
+    def __call__(self, input_ids, scores):
+        generated = input_ids[:, self.prompt_length:]
+        masked = torch.full_like(scores, float('-inf'))
+
+        for row in range(scores.shape[0]):
+            self._update_state(row, generated[row])
+            state = self.states[row]
+            if state is None:
+                # 状态异常（理论上不会出现）时不再约束该行
+                masked[row] = scores[row]
+                continue
+
+            allowed = self._allowed_tokens(state, scores[row])
+            if not allowed:
+                masked[row] = scores[row]
+                continue
+
+            index = torch.tensor(allowed, device=scores.device)
+            allowed_scores = scores[row, index]
+            if torch.isinf(allowed_scores).all():
+                # 合法token都被其他处理器屏蔽时，退化为在合法token中均匀采样
+                allowed_scores = torch.zeros_like(allowed_scores)
+            masked[row, index] = allowed_scores
+
+        return masked
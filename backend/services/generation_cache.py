@@ -0,0 +1,160 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class GenerationCache:
+    """
+    生成结果精确匹配缓存
+
+    以规范化后的业务类型、语言和生成参数为键，按LRU和TTL淘汰。
+    可选地持久化到JSON文件，写入经过节流并在进程退出时补写。
+    """
+
+    def __init__(self, max_size=1000, ttl_seconds=86400, persist_path=None, persist_interval=5.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self.persist_interval = persist_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._dirty = False
+        self._last_persist = 0.0
+
+        # 统计数据
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def normalize_business_type(business_type):
+        """大小写、首尾及连续空白规范化"""
+        return re.sub(r'\s+', ' ', str(business_type)).strip().lower()
+
+    def make_key(self, business_type, language='en', options=None):
+        """
+        构建缓存键
+
+        Args:
+            business_type (str): 业务类型
+            language (str): 语言
+            options (dict): 影响生成结果的参数（需可JSON序列化）
+
+        Returns:
+            str: 缓存键
+        """
+        return json.dumps(
+            [self.normalize_business_type(business_type), language, options or {}],
+            ensure_ascii=False,
+            sort_keys=True
+        )
+
+    def _is_expired(self, entry, now):
+        return self.ttl_seconds is not None and now - entry['created_at'] > self.ttl_seconds
+
+    def get(self, key):
+        """命中时返回缓存的生成结果，否则返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, now):
+                del self._entries[key]
+                self._expirations += 1
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry['value']
+
+    def set(self, key, value, created_at=None):
+        """
+        写入生成结果，超出容量时淘汰最久未使用的条目
+
+        Args:
+            created_at (float): 结果的生成时间（time.time()），TTL从该时间起算，默认为当前时间
+        """
+        with self._lock:
+            self._entries[key] = {'value': value, 'created_at': time.time() if created_at is None else created_at}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            self._dirty = True
+        self._maybe_persist()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.save()
+
+    def _load(self):
+        """从持久化文件加载未过期的条目"""
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        for key, entry in entries:
+            if not self._is_expired(entry, now):
+                self._entries[key] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _maybe_persist(self):
+        if self.persist_path and time.time() - self._last_persist >= self.persist_interval:
+            self.save()
+
+    def save(self):
+        """将缓存写入持久化文件（先写临时文件再替换）"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._entries.items())
+            self._dirty = False
+            self._last_persist = time.time()
+
+        with self._persist_lock:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+
+    def stats(self):
+        """缓存配置与命中统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'persist_path': self.persist_path,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
@@ -0,0 +1,84 @@
+from transformers import StoppingCriteria
+
+
+class JsonObjectStoppingCriteria(StoppingCriteria):
+    """
+    JSON对象闭合即停止
+
+    逐个读取新生成的token文本，跟踪花括号深度（忽略字符串内部的括号），
+    每行在第一个完整的JSON对象闭合后即视为完成，所有行完成时停止生成。
+    """
+
+    def __init__(self, tokenizer, prompt_length, batch_size, token_text_cache=None):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.token_text_cache = token_text_cache if token_text_cache is not None else {}
+        self.processed = [0] * batch_size
+        self.depth = [0] * batch_size
+        self.in_string = [False] * batch_size
+        self.escaped = [False] * batch_size
+        # 每行JSON闭合时已生成的token数，未闭合为None
+        self.end_positions = [None] * batch_size
+
+    def _token_text(self, token_id):
+        text = self.token_text_cache.get(token_id)
+        if text is None:
+            text = self.tokenizer.decode([token_id])
+            self.token_text_cache[token_id] = text
+        return text
+
+    def _feed(self, row, text):
+        """输入一段文本，返回JSON对象是否已闭合"""
+        for ch in text:
+            if self.in_string[row]:
+                if self.escaped[row]:
+                    self.escaped[row] = False
+                elif ch == '\\':
+                    self.escaped[row] = True
+                elif ch == '"':
+                    self.in_string[row] = False
+            elif ch == '"':
+                # 第一个左括号出现之前的引号不影响括号匹配
+                if self.depth[row] > 0:
+                    self.in_string[row] = True
+            elif ch == '{':
+                self.depth[row] += 1
+            elif ch == '}' and self.depth[row] > 0:
+                self.depth[row] -= 1
+                if self.depth[row] == 0:
+                    return True
+        return False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        generated = input_ids[:, self.prompt_length:]
+        for row in range(generated.shape[0]):
+            if self.end_positions[row] is not None:
+                continue
+            for position in range(self.processed[row], generated.shape[1]):
+                if self._feed(row, self._token_text(int(generated[row, position]))):
+                    self.end_positions[row] = position + 1
+                    break
+            self.processed[row] = generated.shape[1]
+        return all(end is not None for end in self.end_positions)
+
+
+class CancellationStoppingCriteria(StoppingCriteria):
+    """
+    取消检查
+
+    每个解码步检查各行的CancelToken（截止时间、客户端断开），
+    每行都已取消或已完成（JSON对象已闭合）时停止生成。需放在JsonObjectStoppingCriteria之后。
+    """
+
+    def __init__(self, cancel_tokens, json_criteria=None):
+        self.cancel_tokens = cancel_tokens
+        self.json_criteria = json_criteria
+
+    def __call__(self, input_ids, scores, **kwargs):
+        for row, token in enumerate(self.cancel_tokens):
+            if token is not None and token.cancelled:
+                continue
+            if self.json_criteria is not None and self.json_criteria.end_positions[row] is not None:
+                continue
+            return False
+        return True
@@ -0,0 +1,32 @@
+# 生成相关的异常和模型状态，不依赖torch/transformers，
+# 调度器和接口层导入时不会加载模型相关模块
+
+
+class GenerationFailedError(Exception):
+    """生成失败，candidates为调试模式下的候选结果明细"""
+
+    def __init__(self, message, candidates=None):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+class ModelNotReadyError(Exception):
+    """模型尚未加载完成（或加载失败）"""
+
+    def __init__(self, message, state=None):
+        super().__init__(message)
+        self.state = state
+
+
+class GenerationCancelledError(Exception):
+    """生成在完成前被取消，reason见cancellation模块的CANCEL_*"""
+
+    def __init__(self, message, reason=None):
+        super().__init__(message)
+        self.reason = reason
+
+
+MODEL_NOT_LOADED = 'not_loaded'
+MODEL_LOADING = 'loading'
+MODEL_READY = 'ready'
+MODEL_FAILED = 'failed'
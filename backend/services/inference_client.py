@@ -0,0 +1,419 @@
+import itertools
+import threading
+import time
+from multiprocessing.connection import Client
+from .batch_scheduler import SchedulerQueueFullError
+from .generation_errors import (
+    GenerationFailedError,
+    GenerationCancelledError,
+    ModelNotReadyError,
+    MODEL_NOT_LOADED,
+    MODEL_LOADING,
+    MODEL_READY,
+    MODEL_FAILED
+)
+
+
+class InferenceUnavailableError(Exception):
+    """没有可用的推理副本"""
+    pass
+
+
+def parse_address(text):
+    """'host:port'解析为TCP地址，其他（如/tmp/seo.sock）视为Unix套接字路径"""
+    text = text.strip()
+    host, sep, port = text.rpartition(':')
+    if sep and port.isdigit() and '/' not in text:
+        return (host or '127.0.0.1', int(port))
+    return text
+
+
+def require_authkey(authkey):
+    """
+    检查连接认证密钥
+
+    multiprocessing.connection在认证通过后会反序列化收到的数据，密钥不能为空或使用公开的默认值
+
+    Returns:
+        bytes: 密钥
+    """
+    if isinstance(authkey, str):
+        authkey = authkey.encode('utf-8')
+    if not authkey:
+        raise ValueError(
+            "未设置INFERENCE_AUTHKEY。推理服务和Web进程需要配置相同的随机密钥，"
+            "例如: export INFERENCE_AUTHKEY=$(python -c 'import secrets; print(secrets.token_hex(32))')"
+        )
+    return authkey
+
+
+def format_address(address):
+    return f"{address[0]}:{address[1]}" if isinstance(address, tuple) else address
+
+
+class _Replica:
+    def __init__(self, address):
+        self.address = address
+        self.idle = []
+        self.outstanding = 0
+        self.healthy = True
+        self.ready = False
+        self.state = MODEL_NOT_LOADED
+        # 已确认就绪的语言（副本的模型池按需加载各语言的模型）
+        self.ready_languages = set()
+        self.retry_at = 0.0
+
+        # 统计数据
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+
+class InferenceClient:
+    """
+    推理服务客户端
+
+    通过multiprocessing.connection连接一个或多个InferenceServer副本，
+    每个副本维护一个连接池，请求发往未完成请求数最少的健康副本（相同时轮询）。
+    提供与SEOGenerator/MicroBatchScheduler相同的接口，接口层和批量任务服务无需区分进程内或进程外推理。
+    连接失败的副本暂时摘除，retry_interval秒后再次尝试。
+    """
+
+    def __init__(self, addresses, authkey, timeout=120.0, retry_interval=5.0):
+        if not addresses:
+            raise ValueError("至少需要一个推理服务地址")
+        self.authkey = require_authkey(authkey)
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._replicas = [_Replica(address) for address in addresses]
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    def _select(self, exclude, require_ready):
+        """选择未完成请求数最少的可用副本，没有可用副本时返回None"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                r for r in self._replicas
+                if r not in exclude and (r.healthy or now >= r.retry_at) and (r.ready or not require_ready)
+            ]
+            if not candidates:
+                return None
+            offset = next(self._round_robin)
+            replica = min(
+                candidates,
+                key=lambda r: (r.outstanding, (self._replicas.index(r) - offset) % len(self._replicas))
+            )
+            replica.outstanding += 1
+            replica.requests += 1
+            return replica
+
+    def _connect(self, replica):
+        """取出副本的空闲连接，没有时新建（调用前需已计入outstanding）"""
+        with self._lock:
+            conn = replica.idle.pop() if replica.idle else None
+        if conn is not None:
+            return conn
+        try:
+            return Client(replica.address, authkey=self.authkey)
+        except Exception as e:
+            self._release(replica, None, failed=True)
+            raise ConnectionError(f"推理服务{format_address(replica.address)}连接失败: {str(e)}")
+
+    def _acquire_specific(self, replica):
+        with self._lock:
+            replica.outstanding += 1
+        return self._connect(replica)
+
+    def _release(self, replica, conn, failed=False, timed_out=False):
+        with self._lock:
+            replica.outstanding -= 1
+            if failed:
+                replica.errors += 1
+                replica.healthy = False
+                replica.ready = False
+                replica.ready_languages.clear()
+                replica.retry_at = time.monotonic() + self.retry_interval
+            elif timed_out:
+                replica.timeouts += 1
+            else:
+                replica.healthy = True
+                if conn is not None:
+                    replica.idle.append(conn)
+                return
+        if conn is not None:
+            # 超时或出错的连接上可能还有未读取的响应，直接关闭
+            conn.close()
+
+    def _call_replica(self, replica, conn, method, params, timeout):
+        try:
+            conn.send({'method': method, 'params': params})
+            responded = conn.poll(timeout)
+            response = conn.recv() if responded else None
+        except (EOFError, OSError) as e:
+            self._release(replica, conn, failed=True)
+            raise ConnectionError(f"推理服务{format_address(replica.address)}连接失败: {str(e)}")
+        if not responded:
+            self._release(replica, conn, timed_out=True)
+            raise TimeoutError(f"推理服务{format_address(replica.address)}响应超时（{timeout}秒）")
+        self._release(replica, conn)
+
+        if response['ok']:
+            return response['result']
+        raise self._remote_error(replica, response)
+
+    def _remote_error(self, replica, response):
+        """将服务端返回的错误转换为本地异常"""
+        if response['error_type'] == 'ModelNotReadyError':
+            with self._lock:
+                replica.ready = False
+                replica.ready_languages.clear()
+                replica.state = response['state']
+            return ModelNotReadyError(response['error'], response['state'])
+        if response['error_type'] == 'SchedulerQueueFullError':
+            return SchedulerQueueFullError(response['error'])
+        if response['error_type'] == 'GenerationCancelledError':
+            return GenerationCancelledError(response['error'], response.get('reason'))
+        return Exception(response['error'])
+
+    def _call(self, method, params, timeout=None, require_ready=True):
+        """
+        向一个副本发送请求
+
+        连接失败、副本未就绪或队列已满时换下一个副本重试；超时不重试。
+        """
+        timeout = self.timeout if timeout is None else timeout
+        tried = []
+        last_error = None
+        refreshed = False
+        while True:
+            replica = self._select(tried, require_ready)
+            if replica is None:
+                if last_error is not None:
+                    raise last_error
+                if refreshed:
+                    raise InferenceUnavailableError("没有可用的推理服务")
+                # 还没有已知就绪的副本：刷新一次状态，仍无就绪副本时由ensure_ready抛出
+                self.ensure_ready()
+                refreshed = True
+                continue
+            tried.append(replica)
+            try:
+                conn = self._connect(replica)
+                return self._call_replica(replica, conn, method, params, timeout)
+            except (ConnectionError, ModelNotReadyError, SchedulerQueueFullError) as e:
+                last_error = e
+
+    @staticmethod
+    def _remote_options(options):
+        """
+        评分函数无法跨进程传递，以selection=best表示（服务端使用ContentValidator评分）；
+        取消标记以剩余时间timeout_ms表示，由服务端在截止时间停止解码
+        """
+        options = dict(options)
+        if options.pop('scorer', None) is not None:
+            options['selection'] = 'best'
+        cancel_token = options.pop('cancel_token', None)
+        if cancel_token is not None and cancel_token.remaining_ms() is not None:
+            options['timeout_ms'] = cancel_token.remaining_ms()
+        return options
+
+    def _deadline_timeout(self, timeout, cancel_token):
+        """等待响应的时间：不超过取消标记的剩余时间（留出服务端返回取消结果的余量）"""
+        timeout = self.timeout if timeout is None else timeout
+        if cancel_token is not None and cancel_token.remaining() is not None:
+            timeout = min(timeout, cancel_token.remaining() + 1.0)
+        return timeout
+
+    def refresh(self, timeout=2.0, language=None):
+        """
+        查询所有副本的模型状态
+
+        副本的就绪标记跟随默认语言的模型；指定language时只查询该语言模型的状态。
+        """
+        statuses = []
+        for replica in self._replicas:
+            try:
+                conn = self._acquire_specific(replica)
+                status = self._call_replica(replica, conn, 'status', {'language': language}, timeout)
+            except Exception as e:
+                status = {'state': None, 'ready': False, 'error': str(e)}
+            with self._lock:
+                if language is None:
+                    replica.ready = bool(status.get('ready'))
+                    replica.state = status.get('state')
+                if status.get('ready') and status.get('language'):
+                    replica.ready_languages.add(status['language'])
+                elif language is not None:
+                    replica.ready_languages.discard(language)
+            statuses.append(dict(status, address=format_address(replica.address)))
+        return statuses
+
+    def start_background_load(self, warmup=True, language=None):
+        """
+        通知副本开始加载（副本进程启动时默认已在加载预加载语言的模型）
+
+        只通知尚未就绪（指定language时为该语言的模型尚未就绪）的副本。
+        """
+        for replica in self._replicas:
+            if replica.ready if language is None else language in replica.ready_languages:
+                continue
+            try:
+                conn = self._acquire_specific(replica)
+                self._call_replica(replica, conn, 'load', {'language': language}, 2.0)
+            except Exception:
+                pass
+
+    @property
+    def is_ready(self):
+        return any(r.ready for r in self._replicas)
+
+    def _language_ready(self, language):
+        if language is None:
+            return self.is_ready
+        return any(language in r.ready_languages for r in self._replicas)
+
+    def ensure_ready(self, language=None):
+        """没有就绪的副本（指定language时为该语言的模型）时抛出ModelNotReadyError"""
+        if self._language_ready(language):
+            return
+        states = [s['state'] for s in self.refresh(language=language)]
+        if MODEL_READY in states:
+            return
+        if MODEL_LOADING in states:
+            raise ModelNotReadyError("模型正在加载，请稍后重试", MODEL_LOADING)
+        if MODEL_FAILED in states:
+            raise ModelNotReadyError("模型加载失败", MODEL_FAILED)
+        raise InferenceUnavailableError("没有可用的推理服务")
+
+    def wait_until_ready(self, timeout=None, interval=1.0, language=None):
+        """轮询等待至少一个副本就绪（指定language时为该语言的模型），返回是否就绪"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._language_ready(language) or any(s['ready'] for s in self.refresh(language=language)):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def status(self, language=None):
+        """汇总各副本的模型状态"""
+        replicas = self.refresh(language=language)
+        states = [s['state'] for s in replicas]
+        for state in (MODEL_READY, MODEL_LOADING, MODEL_FAILED):
+            if state in states:
+                break
+        else:
+            state = MODEL_NOT_LOADED
+        return {
+            'state': state,
+            'ready': state == MODEL_READY,
+            'replicas': replicas
+        }
+
+    def generate_seo(self, business_type, timeout=None, return_candidates=False, cancel_token=None, **options):
+        """
+        与MicroBatchScheduler.generate_seo相同的阻塞接口，由服务端调度器合并成批
+
+        cancel_token的截止时间会传给服务端；客户端断开的检测不跨进程传递。
+        """
+        row = self._call('generate', {
+            'business_type': business_type,
+            'options': dict(
+                self._remote_options(dict(options, cancel_token=cancel_token)),
+                return_candidates=return_candidates
+            )
+        }, self._deadline_timeout(timeout, cancel_token))
+        if row.get('cancelled'):
+            raise GenerationCancelledError(row['error'], row['cancelled'])
+        if not row['success']:
+            raise GenerationFailedError(f"SEO生成失败: {row['error']}", row.get('candidates'))
+        if return_candidates:
+            return row['data'], row['candidates']
+        return row['data']
+
+    def generate_seo_batch(self, business_types, timeout=None, **options):
+        """与SEOGenerator.generate_seo_batch相同的接口，整批发往一个副本"""
+        return self._call('generate_batch', {
+            'business_types': list(business_types),
+            'options': self._remote_options(options)
+        }, timeout)
+
+    def generate_seo_stream(self, business_type, timeout=None, **options):
+        """
+        与SEOGenerator.generate_seo_stream相同的接口
+
+        选择一个就绪副本并在一个连接上接收全部事件，timeout为相邻两个事件之间的最长等待时间。
+        开始接收事件后不再切换副本；消费方提前结束时关闭该连接。
+        """
+        timeout = self._deadline_timeout(timeout, options.get('cancel_token'))
+        self.ensure_ready(options.get('language'))
+        replica = self._select([], require_ready=False)
+        if replica is None:
+            raise InferenceUnavailableError("没有可用的推理服务")
+        conn = self._connect(replica)
+        finished = False
+        try:
+            try:
+                conn.send({
+                    'method': 'generate_stream',
+                    'params': {'business_type': business_type, 'options': self._remote_options(options)}
+                })
+            except (EOFError, OSError) as e:
+                finished = True
+                self._release(replica, conn, failed=True)
+                raise ConnectionError(f"推理服务{format_address(replica.address)}连接失败: {str(e)}")
+
+            while True:
+                try:
+                    responded = conn.poll(timeout)
+                    message = conn.recv() if responded else None
+                except (EOFError, OSError) as e:
+                    finished = True
+                    self._release(replica, conn, failed=True)
+                    raise ConnectionError(f"推理服务{format_address(replica.address)}连接失败: {str(e)}")
+                if not responded:
+                    finished = True
+                    self._release(replica, conn, timed_out=True)
+                    raise TimeoutError(f"推理服务{format_address(replica.address)}响应超时（{timeout}秒）")
+                if 'event' in message:
+                    yield message['event']
+                    continue
+
+                finished = True
+                self._release(replica, conn)
+                if not message['ok']:
+                    raise self._remote_error(replica, message)
+                return
+        finally:
+            if not finished:
+                # 连接上还有未读取的事件，不能放回连接池
+                self._release(replica, None)
+                conn.close()
+
+    def stats(self, timeout=1.0):
+        """客户端统计及各副本的调度器统计"""
+        replicas = []
+        for replica in self._replicas:
+            remote = None
+            if replica.healthy:
+                try:
+                    conn = self._acquire_specific(replica)
+                    remote = self._call_replica(replica, conn, 'stats', {}, timeout)
+                except Exception:
+                    remote = None
+            with self._lock:
+                replicas.append({
+                    'address': format_address(replica.address),
+                    'healthy': replica.healthy,
+                    'ready': replica.ready,
+                    'outstanding': replica.outstanding,
+                    'requests': replica.requests,
+                    'errors': replica.errors,
+                    'timeouts': replica.timeouts,
+                    'server': remote
+                })
+        return {
+            'timeout_seconds': self.timeout,
+            'replicas': replicas
+        }
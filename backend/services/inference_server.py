@@ -0,0 +1,174 @@
+import os
+import threading
+from multiprocessing.connection import Listener
+import torch
+from .model_pool import create_model_pool
+from .batch_scheduler import MicroBatchScheduler
+from .cancellation import CancelToken, cancellation_stats
+from .generation_errors import ModelNotReadyError, GenerationCancelledError
+from .inference_client import require_authkey
+from ..utils.config import Config
+
+
+class InferenceServer:
+    """
+    独立进程中的推理服务
+
+    进程内持有唯一的ModelPool和MicroBatchScheduler，通过multiprocessing.connection
+    监听本地TCP端口或Unix套接字。每个客户端连接由一个线程处理，连接上的请求依次执行；
+    来自不同连接（不同Web进程）的单条生成请求在调度器中合并成批。
+
+    请求格式：{'method': str, 'params': dict}
+    响应格式：{'ok': True, 'result': ...} 或 {'ok': False, 'error_type': str, 'error': str, 'state': str}
+    流式生成（generate_stream）在最终响应之前逐条发送 {'ok': True, 'event': dict}
+    """
+
+    def __init__(self, address, authkey, seo_generator, scheduler):
+        self.address = address
+        self.authkey = require_authkey(authkey)
+        self.seo_generator = seo_generator
+        self.scheduler = scheduler
+        self._content_validator = None
+        self._validator_lock = threading.Lock()
+        self._listener = None
+
+    def _score_candidate(self, candidate):
+        """selection=best时使用的评分函数（首次使用时才创建ContentValidator）"""
+        with self._validator_lock:
+            if self._content_validator is None:
+                from .content_validator import ContentValidator
+                self._content_validator = ContentValidator()
+        return self._content_validator.validate(candidate)['seo_score']['total_score']
+
+    def _generation_options(self, options):
+        """
+        转换客户端的生成参数
+
+        selection表示评分方式，转换为scorer；timeout_ms为客户端剩余的等待时间，转换为CancelToken。
+
+        Returns:
+            tuple: (生成参数, CancelToken或None)
+        """
+        options = dict(options)
+        if options.pop('selection', 'first') == 'best':
+            options['scorer'] = self._score_candidate
+        timeout_ms = options.pop('timeout_ms', None)
+        return options, CancelToken(timeout_ms) if timeout_ms else None
+
+    def _dispatch(self, method, params):
+        if method == 'generate':
+            # 单条请求交给调度器与其他连接的并发请求合并
+            options, cancel_token = self._generation_options(params.get('options', {}))
+            future = self.scheduler.submit(params['business_type'], cancel_token=cancel_token, **options)
+            return future.result()
+        if method == 'generate_batch':
+            options, cancel_token = self._generation_options(params.get('options', {}))
+            self.seo_generator.ensure_ready(language=options.get('language'))
+            if cancel_token is not None:
+                options['cancel_tokens'] = [cancel_token] * len(params['business_types'])
+            return self.seo_generator.generate_seo_batch(params['business_types'], **options)
+        if method == 'status':
+            return self.seo_generator.status(language=params.get('language'))
+        if method == 'stats':
+            return {
+                'model': self.seo_generator.status(),
+                'scheduler': self.scheduler.stats(),
+                'cancellation': cancellation_stats.stats(),
+                'pid': os.getpid(),
+                'cpu_cores': sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None,
+                'torch_threads': torch.get_num_threads()
+            }
+        if method == 'load':
+            self.seo_generator.start_background_load(language=params.get('language'))
+            return self.seo_generator.status(language=params.get('language'))
+        raise ValueError(f"未知的请求方法: {method}")
+
+    def _stream(self, conn, params):
+        """流式生成，每个事件单独发送；客户端断开导致发送失败时停止解码"""
+        options, cancel_token = self._generation_options(params.get('options', {}))
+        self.seo_generator.ensure_ready(language=options.get('language'))
+        events = self.seo_generator.generate_seo_stream(params['business_type'], cancel_token=cancel_token, **options)
+        try:
+            for event in events:
+                conn.send({'ok': True, 'event': event})
+        finally:
+            events.close()
+
+    def _handle_connection(self, conn):
+        """处理单个客户端连接，直到对方关闭"""
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    if message.get('method') == 'generate_stream':
+                        self._stream(conn, message.get('params', {}))
+                        response = {'ok': True, 'result': None}
+                    else:
+                        response = {
+                            'ok': True,
+                            'result': self._dispatch(message.get('method'), message.get('params', {}))
+                        }
+                except Exception as e:
+                    response = {
+                        'ok': False,
+                        'error_type': type(e).__name__,
+                        'error': str(e),
+                        'state': e.state if isinstance(e, ModelNotReadyError) else None,
+                        'reason': e.reason if isinstance(e, GenerationCancelledError) else None
+                    }
+
+                try:
+                    conn.send(response)
+                except (EOFError, OSError):
+                    return
+
+    def serve_forever(self):
+        """监听并为每个连接启动一个处理线程"""
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            # 清理上次运行遗留的Unix套接字文件
+            os.unlink(self.address)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                # 认证失败或握手中断，不影响其他连接
+                continue
+            threading.Thread(
+                target=self._handle_connection,
+                args=(conn,),
+                name='inference-connection',
+                daemon=True
+            ).start()
+
+
+def run_replica(address, authkey, cpu_cores=None, max_wait_ms=20, max_batch_size=8, max_queue_size=256,
+                **generator_options):
+    """
+    推理副本进程入口：绑定CPU核心、后台加载模型并开始监听
+
+    Args:
+        address: 监听地址，(host, port)或Unix套接字路径
+        authkey (bytes): 连接认证密钥
+        cpu_cores (list): 绑定的CPU核心，为空时不绑定
+        **generator_options: 传给create_model_pool的参数（model_name、model_dir、profile等）
+    """
+    if cpu_cores:
+        os.sched_setaffinity(0, cpu_cores)
+        # 计算线程数与绑定的核心数一致，避免多个副本争抢同一组核心
+        torch.set_num_threads(len(cpu_cores))
+
+    seo_generator = create_model_pool(Config(), **generator_options)
+    scheduler = MicroBatchScheduler(
+        seo_generator,
+        max_wait_ms=max_wait_ms,
+        max_batch_size=max_batch_size,
+        max_queue_size=max_queue_size
+    )
+    seo_generator.start_background_load()
+
+    InferenceServer(address, authkey, seo_generator, scheduler).serve_forever()
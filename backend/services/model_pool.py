@@ -0,0 +1,285 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from .seo_generator import SEOGenerator
+from .generation_errors import MODEL_LOADING, MODEL_READY
+from ..config.prompts import SEO_PROMPTS, build_prompt_set
+
+logger = logging.getLogger(__name__)
+
+
+def _dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return round(total / 1024 / 1024, 1)
+
+
+class _PoolEntry:
+    """模型池中的一个模型，可服务多种语言"""
+
+    def __init__(self, key, generator, languages):
+        self.key = key
+        self.generator = generator
+        self.languages = languages
+        self.in_use = 0
+        self.last_used = None
+        # 上次加载后实测的内存占用，首次加载前按快照目录大小估算
+        self.memory_mb = None
+
+        # 统计数据
+        self.loads = 0
+        self.evictions = 0
+        self.requests = 0
+
+    @property
+    def resident(self):
+        return self.generator.state in (MODEL_LOADING, MODEL_READY)
+
+    def estimated_mb(self):
+        if self.memory_mb is None and self.generator.is_ready:
+            self.memory_mb = self.generator.memory_mb()
+        if self.memory_mb is not None:
+            return self.memory_mb
+        if self.generator.model_dir and os.path.isdir(self.generator.model_dir):
+            return _dir_size_mb(self.generator.model_dir)
+        return 0
+
+
+class ModelPool:
+    """
+    按语言路由的模型池
+
+    每种语言对应一个模型和一套提示词，使用同一模型的语言共享一个SEOGenerator（权重只加载一次，
+    前缀缓存按语言分别保存）。模型按需加载，常驻模型超出内存预算或数量上限时，
+    按最近最少使用的顺序卸载空闲（没有进行中请求）的模型。
+    提供与SEOGenerator相同的接口（generate_seo_batch等多一个language参数），
+    调度器按生成参数分组合并，同一语言的请求自然合并成批。
+    """
+
+    def __init__(self, language_models, default_language='en', memory_budget_mb=0, max_models=0,
+                 preload_languages=None, **generator_options):
+        """
+        Args:
+            language_models (dict): 语言 -> {'model_name', 'model_dir', 'prompts', 可选的其他SEOGenerator参数}
+            default_language (str): 未指定语言时使用的语言
+            memory_budget_mb (int): 常驻模型的内存预算（MB），0表示不限制
+            max_models (int): 常驻模型数量上限，0表示不限制
+            preload_languages (list): start_background_load/load默认加载的语言
+            **generator_options: 所有模型共用的SEOGenerator参数（profile、线程数等）
+        """
+        if default_language not in language_models:
+            raise ValueError(f"默认语言{default_language}没有配置模型")
+        unknown = [language for language in (preload_languages or []) if language not in language_models]
+        if unknown:
+            raise ValueError(f"预加载的语言没有配置模型: {', '.join(unknown)}")
+
+        self.default_language = default_language
+        self.memory_budget_mb = memory_budget_mb
+        self.max_models = max_models
+        self.preload_languages = preload_languages or [default_language]
+        self._lock = threading.Lock()
+        # 按最近使用顺序排列，最早使用的在前
+        self._entries = OrderedDict()
+        self._language_entries = {}
+
+        for language, spec in language_models.items():
+            spec = dict(spec)
+            prompts = spec.pop('prompts')
+            key = spec.get('model_dir') or spec['model_name']
+            entry = self._entries.get(key)
+            if entry is None:
+                generator = SEOGenerator(lazy=True, prompt_sets={language: prompts}, **dict(generator_options, **spec))
+                entry = self._entries[key] = _PoolEntry(key, generator, [])
+            else:
+                entry.generator.prompt_sets[language] = prompts
+            entry.languages.append(language)
+            self._language_entries[language] = entry
+
+    @property
+    def languages(self):
+        return list(self._language_entries)
+
+    def _entry(self, language):
+        language = language or self.default_language
+        entry = self._language_entries.get(language)
+        if entry is None:
+            raise ValueError(f"不支持的语言: {language}，可选: {', '.join(self._language_entries)}")
+        return entry
+
+    def _make_room(self, entry):
+        """加载entry之前按LRU卸载空闲模型，直到满足内存预算和数量上限（需持有锁）"""
+        needed_mb = entry.estimated_mb()
+        while True:
+            resident = [e for e in self._entries.values() if e.resident and e is not entry]
+            used_mb = sum(e.estimated_mb() for e in resident)
+            over_count = self.max_models and len(resident) + 1 > self.max_models
+            over_memory = self.memory_budget_mb and used_mb + needed_mb > self.memory_budget_mb
+            if not over_count and not over_memory:
+                return
+            idle = [e for e in resident if e.in_use == 0 and e.generator.is_ready]
+            if not idle:
+                logger.warning(
+                    "模型池超出限制但没有可卸载的空闲模型: 常驻%d个 %.1fMB，加载%s需要%.1fMB",
+                    len(resident), used_mb, entry.key, needed_mb
+                )
+                return
+            victim = idle[0]
+            victim.memory_mb = victim.estimated_mb()
+            victim.generator.unload()
+            victim.evictions += 1
+            logger.info("模型池卸载%s（%.1fMB），为%s腾出空间", victim.key, victim.memory_mb, entry.key)
+
+    def _acquire(self, entry):
+        """标记模型正在使用（使用中的模型不会被卸载），未加载时开始后台加载"""
+        with self._lock:
+            self._entries.move_to_end(entry.key)
+            entry.last_used = time.time()
+            entry.in_use += 1
+            entry.requests += 1
+            if entry.generator.state not in (MODEL_LOADING, MODEL_READY):
+                self._make_room(entry)
+                entry.loads += 1
+                entry.generator.start_background_load()
+
+    def _release(self, entry):
+        with self._lock:
+            entry.in_use -= 1
+
+    def start_background_load(self, warmup=True, language=None):
+        """后台加载指定语言的模型，未指定时加载preload_languages"""
+        languages = [language] if language else self.preload_languages
+        for language in languages:
+            entry = self._entry(language)
+            with self._lock:
+                if entry.generator.state in (MODEL_LOADING, MODEL_READY):
+                    continue
+                self._make_room(entry)
+                entry.loads += 1
+                entry.generator.start_background_load(warmup=warmup)
+
+    def load(self, warmup=True, language=None):
+        """同步加载指定语言的模型，未指定时加载preload_languages"""
+        languages = [language] if language else self.preload_languages
+        for language in languages:
+            entry = self._entry(language)
+            with self._lock:
+                if entry.generator.is_ready:
+                    continue
+                self._make_room(entry)
+                entry.loads += 1
+            entry.generator.load(warmup=warmup)
+
+    @property
+    def is_ready(self):
+        return self._entry(None).generator.is_ready
+
+    def ensure_ready(self, language=None):
+        """指定语言的模型未就绪时抛出ModelNotReadyError"""
+        self._entry(language).generator.ensure_ready()
+
+    def wait_until_ready(self, timeout=None, language=None):
+        """等待指定语言的模型加载结束，返回是否就绪"""
+        return self._entry(language).generator.wait_until_ready(timeout)
+
+    def generate_seo_batch(self, business_types, language=None, **options):
+        """
+        与SEOGenerator.generate_seo_batch相同的接口，按language路由到对应模型
+
+        模型已被卸载时重新开始加载，并抛出ModelNotReadyError。
+        """
+        entry = self._entry(language)
+        language = language or self.default_language
+        self._acquire(entry)
+        try:
+            return entry.generator.generate_seo_batch(business_types, language=language, **options)
+        finally:
+            self._release(entry)
+
+    def generate_seo_stream(self, business_type, language=None, **options):
+        """与SEOGenerator.generate_seo_stream相同的接口，流结束（或被关闭）前模型不会被卸载"""
+        entry = self._entry(language)
+        language = language or self.default_language
+        self._acquire(entry)
+        try:
+            yield from entry.generator.generate_seo_stream(business_type, language=language, **options)
+        finally:
+            self._release(entry)
+
+    def status(self, language=None):
+        """模型池状态，state/ready为指定语言（默认语言）模型的状态"""
+        entry = self._entry(language)
+        with self._lock:
+            models = []
+            for e in self._entries.values():
+                models.append(dict(
+                    e.generator.status(),
+                    languages=e.languages,
+                    memory_mb=e.estimated_mb() if e.resident else 0,
+                    in_use=e.in_use,
+                    last_used=e.last_used,
+                    loads=e.loads,
+                    evictions=e.evictions,
+                    requests=e.requests
+                ))
+            resident_mb = sum(e.estimated_mb() for e in self._entries.values() if e.resident)
+        state = entry.generator.state
+        return {
+            'state': state,
+            'ready': state == MODEL_READY,
+            'language': language or self.default_language,
+            'default_language': self.default_language,
+            'languages': {lang: e.key for lang, e in self._language_entries.items()},
+            'preload_languages': self.preload_languages,
+            'memory_budget_mb': self.memory_budget_mb,
+            'max_models': self.max_models,
+            'resident_mb': round(resident_mb, 1),
+            'models': models,
+            'error': entry.generator.load_error
+        }
+
+
+def create_model_pool(config, model_name=None, model_dir=None, draft_model_name=None, draft_model_dir=None,
+                      **generator_options):
+    """
+    根据配置创建模型池
+
+    支持的语言为SEO_PROMPTS中的语言，LANGUAGE_MODELS中未列出的语言使用默认模型（model_name/model_dir）。
+    草稿模型只用于默认模型。
+
+    Args:
+        config (Config): 配置
+        model_name (str): 默认模型名称，默认使用MODEL_NAME
+        model_dir (str): 默认模型的本地快照目录，默认使用MODEL_DIR
+        **generator_options: 所有模型共用的SEOGenerator参数
+    """
+    model_name = model_name or config.MODEL_NAME
+    model_dir = model_dir or config.MODEL_DIR or None
+    language_models = {}
+    for language in SEO_PROMPTS:
+        source = config.LANGUAGE_MODELS.get(language)
+        if source is None:
+            spec = {
+                'model_name': model_name,
+                'model_dir': model_dir,
+                'draft_model_name': draft_model_name,
+                'draft_model_dir': draft_model_dir
+            }
+        elif os.path.isdir(source):
+            spec = {'model_name': source, 'model_dir': source}
+        else:
+            spec = {'model_name': source, 'model_dir': None}
+        spec['prompts'] = build_prompt_set(language, config.SEO_STRUCT.get(language))
+        language_models[language] = spec
+
+    return ModelPool(
+        language_models,
+        default_language=config.DEFAULT_LANGUAGE,
+        memory_budget_mb=config.MODEL_POOL_MEMORY_MB,
+        max_models=config.MODEL_POOL_MAX_MODELS,
+        preload_languages=config.PRELOAD_LANGUAGES,
+        **generator_options
+    )
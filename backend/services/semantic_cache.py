@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+import zlib
+import numpy as np
+
+# 不影响业务含义的英文虚词
+STOP_WORDS = {'a', 'an', 'the', 'in', 'of', 'for', 'and', 'at', 'on', 'my', 'our', 'near', 'local'}
+
+
+class SemanticCache:
+    """
+    业务类型近似匹配缓存
+
+    对规范化后的业务类型提取字符n-gram，经哈希映射到固定维度后计算TF-IDF向量，
+    在同一上下文（语言和生成参数）的已缓存条目中查找余弦相似度最高的一条，
+    超过阈值即复用其生成结果。容量固定，超出时优先替换已过期的条目，其次淘汰最久未使用的条目。
+    条目写入超过ttl_seconds后不再参与匹配（与精确匹配缓存使用相同的TTL）。
+    """
+
+    def __init__(self, threshold=0.8, max_entries=2000, dimensions=2048, ngram_size=3, ttl_seconds=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.dimensions = dimensions
+        self.ngram_size = ngram_size
+        self._lock = threading.Lock()
+
+        self._counts = np.zeros((max_entries, dimensions), dtype=np.float32)
+        self._doc_freq = np.zeros(dimensions, dtype=np.float32)
+        self._contexts = np.full(max_entries, -1, dtype=np.int64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._created_at = np.zeros(max_entries, dtype=np.float64)
+        self._texts = [None] * max_entries
+        self._values = [None] * max_entries
+        self._context_ids = {}
+        self._size = 0
+        self._matrix = None
+
+        # 统计数据
+        self._lookups = 0
+        self._hits = 0
+        self._evictions = 0
+        self._expired_matches = 0
+
+    @staticmethod
+    def normalize(text):
+        """小写、去标点和常见虚词、去掉英文复数词尾"""
+        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
+        words = []
+        for word in text.split():
+            if word in STOP_WORDS:
+                continue
+            if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+                word = word[:-1]
+            words.append(word)
+        return ' '.join(words)
+
+    def _vectorize(self, text):
+        """字符n-gram词频向量（按词加边界空格，哈希到固定维度）"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in self.normalize(text).split(' '):
+            padded = f" {word} "
+            for i in range(max(1, len(padded) - self.ngram_size + 1)):
+                gram = padded[i:i + self.ngram_size]
+                vector[zlib.crc32(gram.encode('utf-8')) % self.dimensions] += 1
+        return vector
+
+    def _context_id(self, context):
+        if context not in self._context_ids:
+            self._context_ids[context] = len(self._context_ids)
+        return self._context_ids[context]
+
+    def _expired(self, now):
+        """已缓存条目是否过期的掩码"""
+        if self.ttl_seconds is None:
+            return np.zeros(self._size, dtype=bool)
+        return now - self._created_at[:self._size] > self.ttl_seconds
+
+    def _idf(self):
+        return np.log((1.0 + self._size) / (1.0 + self._doc_freq)) + 1.0
+
+    def _weighted_matrix(self):
+        """已缓存条目的归一化TF-IDF矩阵（写入后重新计算）"""
+        if self._matrix is None:
+            weighted = self._counts[:self._size] * self._idf()
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._matrix = weighted / norms
+        return self._matrix
+
+    def lookup(self, text, context=''):
+        """
+        查找最相似的已缓存条目
+
+        Args:
+            text (str): 业务类型
+            context (str): 上下文键，只在相同上下文的条目中查找
+
+        Returns:
+            dict: 命中时返回{'value', 'similarity', 'matched', 'created_at'}，否则返回None；
+                created_at为命中条目的写入时间（time.time()）
+        """
+        with self._lock:
+            self._lookups += 1
+            context_id = self._context_ids.get(context)
+            if context_id is None or self._size == 0:
+                return None
+
+            query = self._vectorize(text) * self._idf()
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return None
+
+            similarities = self._weighted_matrix() @ (query / norm)
+            similarities[self._contexts[:self._size] != context_id] = -1.0
+            expired = self._expired(time.time())
+            if expired.any():
+                if float(similarities[expired].max()) >= self.threshold:
+                    self._expired_matches += 1
+                similarities[expired] = -1.0
+            index = int(np.argmax(similarities))
+            similarity = float(similarities[index])
+            if similarity < self.threshold:
+                return None
+
+            self._hits += 1
+            self._last_used[index] = time.monotonic()
+            return {
+                'value': self._values[index],
+                'similarity': round(similarity, 4),
+                'matched': self._texts[index],
+                'created_at': float(self._created_at[index])
+            }
+
+    def add(self, text, value, context=''):
+        """写入一条生成结果，已有相同文本和上下文的条目时直接覆盖"""
+        normalized = self.normalize(text)
+        if not normalized:
+            return
+        vector = self._vectorize(text)
+
+        with self._lock:
+            context_id = self._context_id(context)
+            for index in range(self._size):
+                if self._texts[index] == normalized and self._contexts[index] == context_id:
+                    self._values[index] = value
+                    self._last_used[index] = time.monotonic()
+                    self._created_at[index] = time.time()
+                    return
+
+            if self._size < self.max_entries:
+                index = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expired(time.time()))
+                if len(expired):
+                    index = int(expired[0])
+                else:
+                    index = int(np.argmin(self._last_used[:self._size]))
+                    self._evictions += 1
+                self._doc_freq -= self._counts[index] > 0
+
+            self._counts[index] = vector
+            self._doc_freq += vector > 0
+            self._contexts[index] = context_id
+            self._last_used[index] = time.monotonic()
+            self._created_at[index] = time.time()
+            self._texts[index] = normalized
+            self._values[index] = value
+            self._matrix = None
+
+    def stats(self):
+        """缓存配置与命中统计"""
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'ttl_seconds': self.ttl_seconds,
+                'size': self._size,
+                'expired': int(self._expired(time.time()).sum()),
+                'max_entries': self.max_entries,
+                'dimensions': self.dimensions,
+                'lookups': self._lookups,
+                'hits': self._hits,
+                'hit_rate': round(self._hits / self._lookups, 4) if self._lookups else 0,
+                'evictions': self._evictions,
+                'expired_matches': self._expired_matches
+            }
@@ -1,25 +1,275 @@
+import gc
 import re
+import os
 import json
+import logging
+import resource
+import threading
+import time
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    StoppingCriteriaList,
+    LogitsProcessorList,
+    TextIteratorStreamer
+)
+from .generation_criteria import JsonObjectStoppingCriteria, CancellationStoppingCriteria
+from .constrained_decoding import ConstrainedVocabulary, SeoJsonLogitsProcessor
+from .seo_stream_parser import SeoFieldStreamParser
+from .cancellation import CancelToken, cancellation_stats, CANCEL_DISCONNECTED, STAGE_QUEUED, STAGE_DECODING
+from .generation_errors import (
+    GenerationFailedError,
+    GenerationCancelledError,
+    ModelNotReadyError,
+    MODEL_NOT_LOADED,
+    MODEL_LOADING,
+    MODEL_READY,
+    MODEL_FAILED
+)
+from ..config.inference_profiles import INFERENCE_PROFILES
 from ..config.prompts import (
-    SEO_SYSTEM_PROMPT,
-    SEO_USER_PROMPT_TEMPLATE,
-    SEO_ASSISTANT_EXAMPLE,
+    build_prompt_set,
     GENERATION_PARAMS,
     VALIDATION_PARAMS
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _peak_rss_mb():
+    """进程峰值RSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024, 1)
+
+
+def _to_legacy_cache(past_key_values):
+    """统一转换为((key, value), ...)形式的缓存"""
+    if hasattr(past_key_values, 'to_legacy_cache'):
+        return past_key_values.to_legacy_cache()
+    return past_key_values
+
+
+def _expand_cache(past_key_values, batch_size):
+    """将batch为1的缓存扩展到指定batch大小（不复制数据）"""
+    return tuple(
+        tuple(tensor.expand(batch_size, *tensor.shape[1:]) for tensor in layer)
+        for layer in past_key_values
+    )
+
+
+def _expand_rows(inputs, num_return_sequences):
+    """每行复制num_return_sequences份（含预填充的缓存），候选结果共享同一次预填充"""
+    expanded = {
+        'input_ids': inputs['input_ids'].repeat_interleave(num_return_sequences, dim=0),
+        'attention_mask': inputs['attention_mask'].repeat_interleave(num_return_sequences, dim=0)
+    }
+    if inputs.get('past_key_values') is not None:
+        expanded['past_key_values'] = tuple(
+            tuple(tensor.repeat_interleave(num_return_sequences, dim=0) for tensor in layer)
+            for layer in _to_legacy_cache(inputs['past_key_values'])
+        )
+    return expanded
+
+
 class SEOGenerator:
-    def __init__(self, model_name="meta-llama/Llama-3.2-3B-Instruct"):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    def __init__(self, model_name="meta-llama/Llama-3.2-3B-Instruct", use_prefix_cache=True, lazy=False,
+                 model_dir=None, profile='default', num_threads=None, num_interop_threads=None, compile_model=False,
+                 draft_model_name=None, draft_model_dir=None, prompt_sets=None):
+        if profile not in INFERENCE_PROFILES:
+            raise ValueError(f"未知的推理配置: {profile}，可选: {', '.join(INFERENCE_PROFILES)}")
+        self.profile = profile
+        self._profile_params = INFERENCE_PROFILES[profile]
+        if self._profile_params['device'] == 'cpu':
+            self.device = torch.device('cpu')
+        else:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model_name = model_name
+        # 本地模型快照目录（python -m backend.prepare_model生成），设置后不访问Hugging Face Hub
+        self.model_dir = model_dir
+        # 为None时沿用进程当前的torch线程设置（如gunicorn post_fork或推理副本绑核时的设置）
+        self.num_threads = num_threads
+        self.num_interop_threads = num_interop_threads
+        self.compile_model = compile_model
+        # 辅助解码使用的草稿模型（与主模型同一分词器家族的小模型），为空时不启用
+        self.draft_model_name = draft_model_name
+        self.draft_model_dir = draft_model_dir
+        self.draft_model = None
+        self._draft_lock = threading.Lock()
+        self._draft_stats_lock = threading.Lock()
+        self._draft_local = threading.local()
+        self._forward_calls = {'model': 0, 'draft': 0}
+        self._draft_stats = {'calls': 0, 'new_tokens': 0, 'draft_tokens': 0, 'accepted_tokens': 0, 'main_forwards': 0}
+        # 语言 -> 提示词配置（见config/prompts.py），同一模型可服务多种语言，第一个为默认语言
+        self.prompt_sets = prompt_sets or {'en': build_prompt_set('en')}
+        self.default_language = next(iter(self.prompt_sets))
+        self.use_prefix_cache = use_prefix_cache
         self.tokenizer = None
         self.model = None
-        self._initialize_model()
+        # 每种语言的提示词前缀不同，前缀缓存按语言分别保存
+        self._prefix_ids = {}
+        self._prefix_cache = {}
+        self._token_text_cache = {}
+        self._constrained_vocabulary = None
+
+        # 加载状态
+        self.state = MODEL_NOT_LOADED
+        self.load_error = None
+        self.load_time = None
+        self.warmup_time = None
+        self.peak_rss_mb = None
+        self._load_lock = threading.Lock()
+        self._loaded_event = threading.Event()
+        self._load_thread = None
+
+        if not lazy:
+            self.load(warmup=False)
+
+    def load(self, warmup=True):
+        """
+        同步加载模型（已加载时直接返回）
+
+        Args:
+            warmup (bool): 加载后是否执行一次预热生成
+        """
+        with self._load_lock:
+            if self.state == MODEL_READY:
+                return
+            self.state = MODEL_LOADING
+            self.load_error = None
+            self._loaded_event.clear()
+            try:
+                started_at = time.monotonic()
+                self._configure_threads()
+                self._initialize_model()
+                self._apply_profile()
+                if self.use_prefix_cache:
+                    self._initialize_prefix_cache()
+                self.load_time = round(time.monotonic() - started_at, 3)
+                self.peak_rss_mb = _peak_rss_mb()
+                logger.info(
+                    "模型加载完成: 来源=%s 耗时=%.2fs 峰值RSS=%.1fMB",
+                    self.model_dir or self.model_name, self.load_time, self.peak_rss_mb
+                )
+
+                if warmup:
+                    started_at = time.monotonic()
+                    self._generate_batch(
+                        [self.prompt_sets[self.default_language]['example_business_type']],
+                        max_new_tokens=4,
+                        stop_on_json_close=False
+                    )
+                    self.warmup_time = round(time.monotonic() - started_at, 3)
+
+                self.state = MODEL_READY
+            except Exception as e:
+                self.state = MODEL_FAILED
+                self.load_error = str(e)
+                raise
+            finally:
+                self._loaded_event.set()
+
+    def start_background_load(self, warmup=True):
+        """在后台线程中加载模型，重复调用不会重复加载"""
+        with self._load_lock:
+            if self.state in (MODEL_READY, MODEL_LOADING):
+                return
+            if self._load_thread is not None and self._load_thread.is_alive():
+                return
+            self.state = MODEL_LOADING
+            self._loaded_event.clear()
+
+            def _load():
+                try:
+                    self.load(warmup=warmup)
+                except Exception:
+                    # 错误信息保存在load_error中，由就绪检查接口返回
+                    pass
+
+            self._load_thread = threading.Thread(target=_load, name='model-loader', daemon=True)
+            self._load_thread.start()
+
+    def unload(self):
+        """释放模型权重和前缀缓存，之后可重新加载（正在加载时不做处理）"""
+        with self._load_lock:
+            if self.state == MODEL_LOADING:
+                return
+            self.model = None
+            self.draft_model = None
+            self.tokenizer = None
+            self._prefix_ids = {}
+            self._prefix_cache = {}
+            self._token_text_cache = {}
+            self._constrained_vocabulary = None
+            self.state = MODEL_NOT_LOADED
+            self.load_error = None
+            self._loaded_event.clear()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def memory_mb(self):
+        """已加载模型（含草稿模型）权重和缓冲区占用的内存（MB），未加载时返回0"""
+        total = 0
+        for model in (self.model, self.draft_model):
+            if model is None:
+                continue
+            for value in model.state_dict().values():
+                # 动态量化的Linear层以(weight, bias)元组保存打包后的参数
+                tensors = value if isinstance(value, tuple) else (value,)
+                total += sum(t.numel() * t.element_size() for t in tensors if torch.is_tensor(t))
+        return round(total / 1024 / 1024, 1)
+
+    @property
+    def is_ready(self):
+        return self.state == MODEL_READY
+
+    def wait_until_ready(self, timeout=None):
+        """等待本次加载结束（成功或失败），返回是否就绪"""
+        if self.state in (MODEL_LOADING, MODEL_READY):
+            self._loaded_event.wait(timeout)
+        return self.is_ready
+
+    def ensure_ready(self):
+        """模型未就绪时抛出ModelNotReadyError"""
+        if self.state == MODEL_READY:
+            return
+        if self.state == MODEL_FAILED:
+            raise ModelNotReadyError(f"模型加载失败: {self.load_error}", self.state)
+        raise ModelNotReadyError("模型正在加载，请稍后重试", self.state)
+
+    def status(self):
+        """模型加载状态"""
+        return {
+            'model_name': self.model_name,
+            'state': self.state,
+            'ready': self.is_ready,
+            'load_time_seconds': self.load_time,
+            'warmup_time_seconds': self.warmup_time,
+            'model_dir': self.model_dir,
+            'profile': self.profile,
+            'draft': self.draft_stats(),
+            'torch_threads': torch.get_num_threads(),
+            'peak_rss_mb': self.peak_rss_mb,
+            'languages': list(self.prompt_sets),
+            'prefix_cache': sorted(self._prefix_cache),
+            'error': self.load_error
+        }
 
     def _initialize_model(self):
-        """初始化模型和分词器"""
+        """初始化模型和分词器（配置了草稿模型时一并加载）"""
+        if self.model_dir:
+            self._initialize_model_from_snapshot()
+        else:
+            self._initialize_model_from_hub()
+        # 批量生成时使用左侧填充，保证所有行的生成位置对齐。
+        # 分词器由所有生成线程共享，只在加载时设置一次，生成过程中不再修改
+        self.tokenizer.padding_side = 'left'
+        if self.draft_model_name or self.draft_model_dir:
+            self._initialize_draft_model()
+
+    def _initialize_model_from_hub(self):
+        """从Hugging Face Hub加载模型和分词器"""
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_auth_token=True)
             if self.tokenizer.pad_token is None:
@@ -27,17 +277,167 @@ class SEOGenerator:
 
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
-                torch_dtype=torch.float16,
-                device_map='auto',
+                **self._model_load_kwargs()
             )
         except Exception as e:
             raise Exception(f"模型初始化失败: {str(e)}")
 
+    def draft_stats(self):
+        """辅助解码统计，未配置草稿模型时返回None"""
+        if not (self.draft_model_name or self.draft_model_dir):
+            return None
+        with self._draft_stats_lock:
+            stats = dict(self._draft_stats)
+        stats['model'] = self.draft_model_dir or self.draft_model_name
+        # 每次主模型前向（一次验证）接受草稿token数 + 主模型自身生成的1个token
+        stats['acceptance_rate'] = (
+            round(stats['accepted_tokens'] / stats['draft_tokens'], 4) if stats['draft_tokens'] else None
+        )
+        stats['tokens_per_main_forward'] = (
+            round(stats['new_tokens'] / stats['main_forwards'], 2) if stats['main_forwards'] else None
+        )
+        return stats
+
+    def _initialize_model_from_snapshot(self):
+        """
+        从本地快照加载模型和分词器
+
+        只读取本地文件（不访问网络），权重为safetensors格式，
+        按张量从内存映射的文件中逐个读取，不会先在内存中完整构建一份随机初始化的模型
+        """
+        if not os.path.isdir(self.model_dir):
+            raise Exception(f"模型快照目录不存在: {self.model_dir}，请先运行 python -m backend.prepare_model")
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True)
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+
+            self.model = AutoModelForCausalLM.from_pretrained(
+                self.model_dir,
+                low_cpu_mem_usage=True,
+                use_safetensors=True,
+                local_files_only=True,
+                **self._model_load_kwargs()
+            )
+        except Exception as e:
+            raise Exception(f"模型初始化失败: {str(e)}")
+
+    def _initialize_draft_model(self):
+        """加载草稿模型，并统计两个模型的前向调用次数用于估算接受率"""
+        try:
+            if self.draft_model_dir:
+                self.draft_model = AutoModelForCausalLM.from_pretrained(
+                    self.draft_model_dir,
+                    low_cpu_mem_usage=True,
+                    use_safetensors=True,
+                    local_files_only=True,
+                    **self._model_load_kwargs()
+                )
+            else:
+                self.draft_model = AutoModelForCausalLM.from_pretrained(
+                    self.draft_model_name,
+                    use_auth_token=True,
+                    **self._model_load_kwargs()
+                )
+        except Exception as e:
+            raise Exception(f"草稿模型初始化失败: {str(e)}")
+
+        if self.draft_model.config.vocab_size != self.model.config.vocab_size:
+            raise Exception(
+                f"草稿模型词表大小({self.draft_model.config.vocab_size})与主模型"
+                f"({self.model.config.vocab_size})不一致，需使用同一分词器家族的模型"
+            )
+
+    def _register_forward_counters(self):
+        """只统计当前线程处于辅助解码中时的前向调用"""
+        def counter(name):
+            def hook(module, inputs, outputs):
+                if getattr(self._draft_local, 'active', False):
+                    self._forward_calls[name] += 1
+            return hook
+
+        self.model.register_forward_hook(counter('model'))
+        self.draft_model.register_forward_hook(counter('draft'))
+
+    def _model_load_kwargs(self):
+        """按推理配置确定权重精度和设备"""
+        kwargs = {'torch_dtype': getattr(torch, self._profile_params['torch_dtype'])}
+        if self._profile_params['device'] == 'auto':
+            kwargs['device_map'] = 'auto'
+        return kwargs
+
+    def _configure_threads(self):
+        """设置torch计算线程数（未指定时不修改）"""
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.num_interop_threads:
+            try:
+                torch.set_num_interop_threads(self.num_interop_threads)
+            except RuntimeError:
+                # 进程中已经执行过并行计算后不能再修改，沿用当前设置
+                logger.warning("无法修改torch inter-op线程数，当前为%d", torch.get_num_interop_threads())
+
+    def _apply_profile(self):
+        """加载后按推理配置量化或编译模型（草稿模型只量化）"""
+        models = [self.model] if self.draft_model is None else [self.model, self.draft_model]
+        for model in models:
+            model.eval()
+            if self._profile_params['quantization'] == 'dynamic-int8':
+                # 原地替换Linear层，避免量化时复制一份完整的float32模型
+                torch.quantization.quantize_dynamic(
+                    model,
+                    {torch.nn.Linear},
+                    dtype=torch.qint8,
+                    inplace=True
+                )
+        if self.compile_model:
+            # 输入长度随请求变化，使用动态形状编译，首次生成（预热）时完成编译
+            self.model.forward = torch.compile(self.model.forward, dynamic=True)
+        if self.draft_model is not None:
+            self._register_forward_counters()
+
+    def _initialize_prefix_cache(self):
+        """
+        预填充静态提示词前缀
+
+        系统提示词、少样本示例和模板中业务类型之前的文本对所有请求都相同，
+        初始化时每种语言只编码一次并保留其past_key_values，之后每个请求只需编码可变后缀。
+        """
+        for language in self.prompt_sets:
+            try:
+                prefix_text, _ = self._split_prompt('', language)
+                prefix_ids = self.tokenizer(
+                    prefix_text,
+                    return_tensors="pt",
+                    add_special_tokens=True
+                )['input_ids']
+
+                if torch.cuda.is_available():
+                    prefix_ids = prefix_ids.to(self.device)
+
+                with torch.no_grad():
+                    outputs = self.model(input_ids=prefix_ids, use_cache=True)
+
+                self._prefix_ids[language] = prefix_ids
+                self._prefix_cache[language] = _to_legacy_cache(outputs.past_key_values)
+            except Exception:
+                # 前缀缓存不可用时该语言退回完整提示词编码
+                self._prefix_ids.pop(language, None)
+                self._prefix_cache.pop(language, None)
+
     def _extract_clean_json(self, text):
         """从文本中提取和清理JSON对象"""
         # 移除代码块标记和换行
         text = re.sub(r'```(?:json)?\s*', '', text)
         text = text.replace('\n', ' ').strip()
+
+        # 输出本身就是一个完整JSON对象时直接解析（字符串中可能含有花括号）
+        start = text.find('{')
+        if start != -1:
+            try:
+                return json.loads(text[start:])
+            except json.JSONDecodeError:
+                pass
         
         # 找到最后一个JSON对象
         json_matches = list(re.finditer(r'\{[^{]*\}', text))
@@ -86,58 +486,484 @@ class SEOGenerator:
 
         return normalized_data
 
-    def generate_seo(self, business_type):
-        """生成SEO信息"""
-        try:
-            # 构建提示词
-            messages = [
-                {"role": "system", "content": SEO_SYSTEM_PROMPT},
-                {"role": "user", "content": SEO_USER_PROMPT_TEMPLATE.format(business_type=business_type)},
-                {"role": "assistant", "content": SEO_ASSISTANT_EXAMPLE},
-                {"role": "user", "content": "Now generate a new, unique JSON with the same structure but different content."}
-            ]
-
-            # 构建输入文本
-            input_text = "Let's think about this step by step:\n\n"
-            for message in messages:
-                role = message["role"]
-                content = message["content"]
-                input_text += f"{role.title()}: {content}\n\n"
-
-            # 准备输入
-            inputs = self.tokenizer(
-                input_text,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=512,
-                add_special_tokens=True
-            )
+    def _split_prompt(self, business_type, language=None):
+        """
+        构建提示词并拆分为静态前缀和可变后缀
+
+        业务类型只出现在最后一条用户消息中，因此其之前的全部文本都是静态前缀。
+        """
+        prompts = self.prompt_sets[language or self.default_language]
+        template = prompts['user_template']
+        messages = [
+            {"role": "system", "content": prompts['system']},
+            {"role": "user", "content": template.format(business_type=prompts['example_business_type'])},
+            {"role": "assistant", "content": prompts['assistant_example']},
+        ]
+
+        prefix = prompts['preamble']
+        for message in messages:
+            role = message["role"]
+            content = message["content"]
+            prefix += f"{role.title()}: {content}\n\n"
+
+        template_head, template_tail = template.format(business_type='\0').split('\0', 1)
+        # 分隔空格放到后缀中，使业务类型按词首方式分词
+        prefix += "User: " + template_head.rstrip(' ')
+        suffix = template_head[len(template_head.rstrip(' ')):] + business_type + template_tail + "\n\n"
+        return prefix, suffix
+
+    def _build_input_text(self, business_type, language=None):
+        """构建单个业务类型的完整提示词文本"""
+        prefix, suffix = self._split_prompt(business_type, language)
+        return prefix + suffix
+
+    def _encode_full(self, business_types, language=None):
+        """完整编码提示词（未启用前缀缓存时使用）"""
+        input_texts = [self._build_input_text(business_type, language) for business_type in business_types]
+
+        inputs = self.tokenizer(
+            input_texts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=512,
+            add_special_tokens=True
+        )
+
+        if torch.cuda.is_available():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        return {
+            'input_ids': inputs['input_ids'],
+            'attention_mask': inputs['attention_mask']
+        }
+
+    def _encode_with_prefix_cache(self, business_types, language):
+        """
+        只编码可变后缀，并在缓存的前缀之上预填充
+
+        后缀左侧填充，填充位位于前缀与后缀之间并由attention_mask屏蔽。
+        最后一个token留给generate处理，因此预填充的缓存长度比input_ids少1。
+        """
+        suffixes = [self._split_prompt(business_type, language)[1] for business_type in business_types]
+        suffix_inputs = self.tokenizer(
+            suffixes,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=512,
+            add_special_tokens=False
+        )
+        suffix_ids = suffix_inputs['input_ids']
+        suffix_mask = suffix_inputs['attention_mask']
+
+        if torch.cuda.is_available():
+            suffix_ids = suffix_ids.to(self.device)
+            suffix_mask = suffix_mask.to(self.device)
+
+        batch_size = len(business_types)
+        prefix_ids = self._prefix_ids[language]
+        prefix_length = prefix_ids.shape[1]
+        input_ids = torch.cat([prefix_ids.expand(batch_size, -1), suffix_ids], dim=1)
+        attention_mask = torch.cat([
+            torch.ones((batch_size, prefix_length), dtype=suffix_mask.dtype, device=suffix_mask.device),
+            suffix_mask
+        ], dim=1)
+
+        past_key_values = _expand_cache(self._prefix_cache[language], batch_size)
+        if suffix_ids.shape[1] > 1:
+            position_ids = (attention_mask.long().cumsum(-1) - 1).clamp(min=0)
+            with torch.no_grad():
+                outputs = self.model(
+                    input_ids=suffix_ids[:, :-1],
+                    attention_mask=attention_mask[:, :-1],
+                    position_ids=position_ids[:, prefix_length:-1],
+                    past_key_values=past_key_values,
+                    use_cache=True
+                )
+            past_key_values = outputs.past_key_values
+
+        return {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'past_key_values': past_key_values
+        }
+
+    def _get_constrained_vocabulary(self):
+        """约束解码使用的词表索引（首次使用时构建，所有请求共享）"""
+        if self._constrained_vocabulary is None:
+            vocab_texts = [self.tokenizer.decode([token_id]) for token_id in range(len(self.tokenizer))]
+            self._constrained_vocabulary = ConstrainedVocabulary(vocab_texts, self.tokenizer.all_special_ids)
+        return self._constrained_vocabulary
+
+    def _generate_batch(self, business_types, max_new_tokens=None, stop_on_json_close=True, constrained=False,
+                        num_return_sequences=1, language=None, streamer=None, cancel_tokens=None, greedy=False):
+        """
+        对一批业务类型执行一次generate调用，返回每个业务类型的候选文本列表
+
+        Args:
+            business_types (list): 业务类型列表
+            max_new_tokens (int): 新生成token上限，默认使用GENERATION_PARAMS
+            stop_on_json_close (bool): 第一个JSON对象闭合后是否立即停止
+            constrained (bool): 是否按输出结构约束解码
+            num_return_sequences (int): 每个业务类型的候选数量
+            language (str): 提示词语言，默认为default_language
+            streamer: transformers的文本流式输出对象（只支持单行单候选）
+            cancel_tokens (list): 每个业务类型的CancelToken（可为None），所有行都取消或完成时提前停止
+            greedy (bool): 贪心解码（不采样，忽略temperature/top_p）。只有贪心解码会使用草稿模型，
+                辅助解码与普通贪心解码的结果一致，批次大小只影响速度，不影响解码方式
+
+        Returns:
+            list: 每个业务类型对应一个候选文本列表（只包含新生成部分）
+        """
+        # 辅助解码只支持单行输入；约束解码的处理器按增量跟踪状态，不支持草稿token被拒绝后的回退
+        use_draft = (
+            greedy
+            and self.draft_model is not None
+            and len(business_types) == 1
+            and num_return_sequences == 1
+            and not constrained
+        )
+
+        language = language or self.default_language
+        if language in self._prefix_cache:
+            # 辅助解码时主模型同样使用前缀缓存，草稿模型不接收主模型的缓存，自行预填充完整的input_ids
+            inputs = self._encode_with_prefix_cache(business_types, language)
+        else:
+            inputs = self._encode_full(business_types, language)
 
-            if torch.cuda.is_available():
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        if num_return_sequences > 1:
+            inputs = _expand_rows(inputs, num_return_sequences)
+        total_rows = inputs['input_ids'].shape[0]
 
-            # 生成输出
+        generation_params = dict(GENERATION_PARAMS)
+        if max_new_tokens:
+            generation_params['max_new_tokens'] = max_new_tokens
+        if greedy:
+            generation_params.pop('temperature', None)
+            generation_params.pop('top_p', None)
+
+        prompt_length = inputs['input_ids'].shape[1]
+        logits_processor = LogitsProcessorList()
+        if constrained:
+            # 结构中的分隔符本身会重复，n-gram去重会与结构约束冲突
+            generation_params.pop('no_repeat_ngram_size', None)
+            logits_processor.append(SeoJsonLogitsProcessor(
+                self._get_constrained_vocabulary(),
+                prompt_length,
+                total_rows,
+                self.tokenizer.eos_token_id
+            ))
+
+        stopping_criteria = StoppingCriteriaList()
+        json_criteria = None
+        if stop_on_json_close:
+            json_criteria = JsonObjectStoppingCriteria(
+                self.tokenizer,
+                prompt_length,
+                total_rows,
+                token_text_cache=self._token_text_cache
+            )
+            stopping_criteria.append(json_criteria)
+        if cancel_tokens and any(token is not None for token in cancel_tokens):
+            row_tokens = [token for token in cancel_tokens for _ in range(num_return_sequences)]
+            stopping_criteria.append(CancellationStoppingCriteria(row_tokens, json_criteria))
+
+        if use_draft:
+            outputs = self._generate_assisted(inputs, logits_processor, stopping_criteria, generation_params, streamer)
+        else:
             with torch.no_grad():
                 outputs = self.model.generate(
-                    input_ids=inputs['input_ids'],
-                    attention_mask=inputs['attention_mask'],
+                    **inputs,
                     pad_token_id=self.tokenizer.pad_token_id,
-                    do_sample=True,
-                    **GENERATION_PARAMS
+                    do_sample=not greedy,
+                    logits_processor=logits_processor,
+                    stopping_criteria=stopping_criteria,
+                    streamer=streamer,
+                    **generation_params
                 )
 
-            # 解码输出
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+        responses = []
+        for row, output in enumerate(outputs):
+            generated = output[prompt_length:]
+            if json_criteria is not None and json_criteria.end_positions[row] is not None:
+                # 丢弃JSON闭合之后（等待同批次其他行时）生成的token
+                generated = generated[:json_criteria.end_positions[row]]
+            responses.append(self.tokenizer.decode(generated, skip_special_tokens=True).strip())
 
-            # 提取和处理JSON
-            json_data = self._extract_clean_json(response)
-            normalized_data = self._normalize_json_data(json_data)
+        return [
+            responses[i:i + num_return_sequences]
+            for i in range(0, len(responses), num_return_sequences)
+        ]
 
-            if normalized_data:
-                return normalized_data
-            else:
-                raise Exception("无法生成有效的SEO信息")
+    def _generate_assisted(self, inputs, logits_processor, stopping_criteria, generation_params, streamer=None):
+        """
+        使用草稿模型辅助解码
 
-        except Exception as e:
-            raise Exception(f"SEO生成失败: {str(e)}")
+        草稿模型先连续生成若干候选token，主模型一次前向验证全部候选，接受与自身预测一致的前缀。
+        transformers 4.30的辅助解码只支持贪心解码，只用于greedy请求，结果与主模型单独贪心解码一致。
+        """
+        prompt_length = inputs['input_ids'].shape[1]
+
+        with self._draft_lock:
+            self._forward_calls['model'] = 0
+            self._forward_calls['draft'] = 0
+            self._draft_local.active = True
+            try:
+                with torch.no_grad():
+                    outputs = self.model.generate(
+                        **inputs,
+                        assistant_model=self.draft_model,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        do_sample=False,
+                        logits_processor=logits_processor,
+                        stopping_criteria=stopping_criteria,
+                        streamer=streamer,
+                        **generation_params
+                    )
+            finally:
+                self._draft_local.active = False
+
+            new_tokens = outputs.shape[1] - prompt_length
+            main_forwards = self._forward_calls['model']
+            draft_forwards = self._forward_calls['draft']
+
+        with self._draft_stats_lock:
+            self._draft_stats['calls'] += 1
+            self._draft_stats['new_tokens'] += new_tokens
+            self._draft_stats['main_forwards'] += main_forwards
+            self._draft_stats['draft_tokens'] += draft_forwards
+            self._draft_stats['accepted_tokens'] += max(0, new_tokens - main_forwards)
+        return outputs
+
+    def _parse_response(self, response):
+        """解析单行模型输出，失败时返回None"""
+        json_data = self._extract_clean_json(response)
+        return self._normalize_json_data(json_data)
+
+    def _select_candidate(self, responses, scorer=None):
+        """
+        解析候选文本并选出结果
+
+        未提供scorer时返回第一个可解析的候选，否则返回得分最高的候选。
+
+        Returns:
+            tuple: (结果数据, 错误信息, 候选明细列表)
+        """
+        candidates = []
+        for response in responses:
+            candidate = {'text': response, 'parsed': False, 'data': None, 'score': None, 'error': None}
+            try:
+                candidate['data'] = self._parse_response(response)
+                candidate['parsed'] = candidate['data'] is not None
+            except Exception as e:
+                candidate['error'] = str(e)
+            candidates.append(candidate)
+
+            if candidate['parsed'] and scorer is None:
+                break
+            if candidate['parsed']:
+                try:
+                    candidate['score'] = scorer(candidate['data'])
+                except Exception as e:
+                    candidate['error'] = f"评分失败: {str(e)}"
+
+        parsed = [c for c in candidates if c['parsed']]
+        if not parsed:
+            return None, "无法生成有效的SEO信息", candidates
+
+        if scorer is not None:
+            scored = [c for c in parsed if c['score'] is not None]
+            if scored:
+                return max(scored, key=lambda c: c['score'])['data'], None, candidates
+        return parsed[0]['data'], None, candidates
+
+    def generate_seo(self, business_type, return_candidates=False, **options):
+        """
+        生成SEO信息
+
+        Args:
+            business_type (str): 业务类型
+            return_candidates (bool): 是否同时返回候选明细（调试用）
+            **options: 生成参数，同generate_seo_batch
+
+        Returns:
+            dict: SEO信息；return_candidates为True时返回(SEO信息, 候选明细)
+        """
+        row = self.generate_seo_batch([business_type], batch_size=1, return_candidates=return_candidates, **options)[0]
+        if not row['success']:
+            raise GenerationFailedError(f"SEO生成失败: {row['error']}", row.get('candidates'))
+        if return_candidates:
+            return row['data'], row['candidates']
+        return row['data']
+
+    def generate_seo_stream(self, business_type, max_new_tokens=None, constrained=False, language=None,
+                            cancel_token=None, greedy=False):
+        """
+        流式生成单个业务类型的SEO信息
+
+        model.generate在工作线程中执行，新生成的文本经TextIteratorStreamer逐段取出，
+        每个字段的值完整生成后立即产出，不必等待整个生成结束。
+
+        Args:
+            business_type (str): 业务类型
+            max_new_tokens (int): 新生成token上限，默认使用GENERATION_PARAMS
+            constrained (bool): 是否按输出结构约束解码
+            language (str): 提示词语言，默认为default_language
+            cancel_token (CancelToken): 取消标记（截止时间等）；消费方提前关闭生成器时也会取消解码
+            greedy (bool): 贪心解码，配置了草稿模型时使用辅助解码
+
+        Yields:
+            dict: {'type': 'token', 'text': str}：新生成的文本
+                  {'type': 'field', 'name': str, 'value': ...}：已完整生成的字段（未经规范化）
+                  {'type': 'result', 'success': bool, 'data': dict, 'error': str}：最终解析结果，最后产出
+        """
+        self.ensure_ready()
+        if language is not None and language not in self.prompt_sets:
+            raise ValueError(f"不支持的语言: {language}")
+
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancel_token = cancel_token or CancelToken()
+        outcome = {}
+
+        def _run():
+            try:
+                outcome['responses'] = self._generate_batch(
+                    [business_type],
+                    max_new_tokens=max_new_tokens,
+                    constrained=constrained,
+                    language=language,
+                    streamer=streamer,
+                    cancel_tokens=[cancel_token],
+                    greedy=greedy
+                )
+            except Exception as e:
+                outcome['error'] = e
+                # 生成出错时结束流，避免消费方一直等待
+                streamer.end()
+
+        thread = threading.Thread(target=_run, name='seo-stream', daemon=True)
+        thread.start()
+
+        parser = SeoFieldStreamParser()
+        finished = False
+        try:
+            for text in streamer:
+                if not text:
+                    continue
+                yield {'type': 'token', 'text': text}
+                for name, value in parser.feed(text):
+                    yield {'type': 'field', 'name': name, 'value': value}
+            finished = True
+        finally:
+            if not finished:
+                # 消费方提前关闭（如客户端断开连接），停止仍在进行的解码
+                cancel_token.cancel(CANCEL_DISCONNECTED)
+                cancellation_stats.record(cancel_token.reason, STAGE_DECODING)
+        thread.join()
+
+        if 'error' in outcome:
+            raise Exception(f"SEO生成失败: {str(outcome['error'])}")
+        normalized_data, error, _ = self._select_candidate(outcome['responses'][0], None)
+        if normalized_data is None and cancel_token.cancelled:
+            cancellation_stats.record(cancel_token.reason, STAGE_DECODING)
+            raise GenerationCancelledError(cancel_token.message, cancel_token.reason)
+        yield {
+            'type': 'result',
+            'success': normalized_data is not None,
+            'data': normalized_data,
+            'error': error
+        }
+
+    def generate_seo_batch(self, business_types, batch_size=8, max_new_tokens=None, stop_on_json_close=True,
+                           constrained=False, num_return_sequences=1, scorer=None, return_candidates=False,
+                           language=None, cancel_tokens=None, greedy=False):
+        """
+        批量生成SEO信息
+
+        每个批次只调用一次model.generate，各行独立解析，
+        单行失败不会影响同批次的其他结果。
+
+        Args:
+            business_types (list): 业务类型列表
+            batch_size (int): 每次generate调用处理的业务类型数量
+            max_new_tokens (int): 新生成token上限，默认使用GENERATION_PARAMS
+            stop_on_json_close (bool): 第一个JSON对象闭合后是否立即停止
+            constrained (bool): 是否按输出结构约束解码
+            num_return_sequences (int): 每个业务类型在同一次generate中解码的候选数量
+            scorer (callable): 候选评分函数，提供时选择得分最高的可解析候选，否则选第一个
+            return_candidates (bool): 结果中是否包含候选明细（调试用）
+            language (str): 提示词语言，需在prompt_sets中，默认为default_language
+            cancel_tokens (list): 与business_types对应的CancelToken（可为None）。
+                已取消且没有得到可解析结果的行标记为失败，并带有cancelled字段（取消原因）
+            greedy (bool): 贪心解码（不采样）；配置了草稿模型时，单行批次使用辅助解码加速，结果相同
+
+        Returns:
+            list: 与输入顺序一致的结果列表，每项包含
+                business_type、success、data、error字段（以及可选的candidates、cancelled）
+        """
+        self.ensure_ready()
+        if batch_size < 1:
+            raise ValueError("batch_size必须大于0")
+        if num_return_sequences < 1:
+            raise ValueError("num_return_sequences必须大于0")
+        if greedy and num_return_sequences > 1:
+            raise ValueError("贪心解码的多个候选完全相同，greedy时num_return_sequences只能为1")
+        if language is not None and language not in self.prompt_sets:
+            raise ValueError(f"不支持的语言: {language}")
+
+        results = []
+        for start in range(0, len(business_types), batch_size):
+            chunk = business_types[start:start + batch_size]
+            chunk_tokens = cancel_tokens[start:start + batch_size] if cancel_tokens else [None] * len(chunk)
+            if all(token is not None and token.cancelled for token in chunk_tokens):
+                # 整个批次在开始前已取消，不再生成
+                for business_type, token in zip(chunk, chunk_tokens):
+                    cancellation_stats.record(token.reason, STAGE_QUEUED)
+                    results.append({
+                        'business_type': business_type,
+                        'success': False,
+                        'data': None,
+                        'error': token.message,
+                        'cancelled': token.reason
+                    })
+                continue
+            try:
+                responses = self._generate_batch(
+                    chunk,
+                    max_new_tokens=max_new_tokens,
+                    stop_on_json_close=stop_on_json_close,
+                    constrained=constrained,
+                    num_return_sequences=num_return_sequences,
+                    language=language,
+                    cancel_tokens=chunk_tokens,
+                    greedy=greedy
+                )
+            except Exception as e:
+                # 整个批次生成失败时，只标记本批次的行
+                results.extend({
+                    'business_type': business_type,
+                    'success': False,
+                    'data': None,
+                    'error': str(e)
+                } for business_type in chunk)
+                continue
+
+            for business_type, candidate_texts, token in zip(chunk, responses, chunk_tokens):
+                normalized_data, error, candidates = self._select_candidate(candidate_texts, scorer)
+                result = {
+                    'business_type': business_type,
+                    'success': normalized_data is not None,
+                    'data': normalized_data,
+                    'error': error
+                }
+                if normalized_data is None and token is not None and token.cancelled:
+                    # 解码被提前停止，结果不完整
+                    cancellation_stats.record(token.reason, STAGE_DECODING)
+                    result['error'] = token.message
+                    result['cancelled'] = token.reason
+                if return_candidates:
+                    result['candidates'] = candidates
+                results.append(result)
+
+        return results
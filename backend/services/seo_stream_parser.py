@@ -0,0 +1,45 @@
+import json
+import re
+
+# 字段名（兼容meta_description写法） -> 完整值的正则
+_FIELD_PATTERNS = {
+    'title': re.compile(r'"title"\s*:\s*("(?:[^"\\]|\\.)*")'),
+    'metaDescription': re.compile(r'"meta_?[dD]escription"\s*:\s*("(?:[^"\\]|\\.)*")'),
+    'keywords': re.compile(r'"keywords"\s*:\s*(\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\])')
+}
+
+
+class SeoFieldStreamParser:
+    """
+    流式输出的字段解析
+
+    逐段输入模型生成的文本，每个字段（title、metaDescription、keywords）的值完整出现后立即返回，
+    不必等待整个JSON对象生成完毕。每个字段只返回一次。
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+
+    def feed(self, text):
+        """
+        输入新生成的文本
+
+        Returns:
+            list: 本次新完成的(字段名, 值)列表
+        """
+        self.text += text
+        completed = []
+        for name, pattern in _FIELD_PATTERNS.items():
+            if name in self.fields:
+                continue
+            match = pattern.search(self.text)
+            if not match:
+                continue
+            try:
+                value = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                continue
+            self.fields[name] = value
+            completed.append((name, value))
+        return completed
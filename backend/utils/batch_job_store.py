@@ -0,0 +1,233 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    language TEXT,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    pending_chunks INTEGER NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner_pid INTEGER,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_batch_jobs_finished_at ON batch_jobs(finished_at);
+CREATE TABLE IF NOT EXISTS batch_job_results (
+    job_id TEXT NOT NULL REFERENCES batch_jobs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+
+class BatchJobStore:
+    """
+    批量任务状态和结果的存储（SQLite）
+
+    任务由提交它的进程在后台线程中执行，状态、进度、取消标记和每一条结果都写入同一个SQLite文件，
+    gunicorn的任一worker都能查询任务、分页读取结果和取消任务。
+    每个线程使用独立的连接（fork后重新连接），跨进程的写入由SQLite文件锁协调。
+    """
+
+    def __init__(self, db_path='data/batch_jobs.sqlite3', busy_timeout_ms=5000):
+        """
+        Args:
+            db_path (str): 数据库文件路径
+            busy_timeout_ms (int): 等待其他进程释放写锁的时间
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        """当前线程的连接；fork后的子进程重新建立连接，不沿用父进程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _to_dict(row):
+        """任务行转换为状态字典（不包含结果明细）"""
+        total = row['total']
+        return {
+            'job_id': row['id'],
+            'status': row['status'],
+            'language': row['language'],
+            'progress': {
+                'total': total,
+                'processed': row['processed'],
+                'succeeded': row['succeeded'],
+                'failed': row['failed'],
+                'percent': round(row['processed'] * 100 / total, 2) if total else 100
+            },
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def _get_row(self, conn, job_id):
+        return conn.execute('SELECT * FROM batch_jobs WHERE id = ?', (job_id,)).fetchone()
+
+    def create(self, job_id, total, chunks, language=None, max_finished_jobs=100):
+        """
+        新建任务，并只保留最近max_finished_jobs个已结束的任务
+
+        Returns:
+            dict: 任务状态
+        """
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute(
+                'INSERT INTO batch_jobs (id, status, language, total, pending_chunks, owner_pid, created_at, finished_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    job_id,
+                    JOB_COMPLETED if chunks == 0 else JOB_QUEUED,
+                    language,
+                    total,
+                    chunks,
+                    os.getpid(),
+                    now,
+                    now if chunks == 0 else None
+                )
+            )
+            conn.execute(
+                f"DELETE FROM batch_jobs WHERE id IN ("
+                f"SELECT id FROM batch_jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))}) "
+                f"ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                FINISHED_STATES + (max_finished_jobs,)
+            )
+            return self._to_dict(self._get_row(conn, job_id))
+
+    def get(self, job_id):
+        """任务状态，任务不存在时返回None"""
+        row = self._get_row(self._connect(), job_id)
+        return self._to_dict(row) if row else None
+
+    def start_chunk(self, job_id):
+        """
+        开始执行一个块：排队中的任务标记为运行中
+
+        Returns:
+            bool: 是否已请求取消（已取消时跳过该块）
+        """
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute(
+                'UPDATE batch_jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?',
+                (JOB_RUNNING, datetime.now().isoformat(), job_id, JOB_QUEUED)
+            )
+            row = conn.execute('SELECT cancel_requested FROM batch_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def finish_chunk(self, job_id, start, results):
+        """保存一个块的结果并更新进度，最后一个块完成时确定任务的最终状态"""
+        succeeded = sum(1 for result in results if result['success'])
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if self._get_row(conn, job_id) is None:
+                # 任务已被清理
+                return
+            conn.executemany(
+                'INSERT OR REPLACE INTO batch_job_results (job_id, position, result) VALUES (?, ?, ?)',
+                [
+                    (job_id, start + index, json.dumps(result, ensure_ascii=False))
+                    for index, result in enumerate(results)
+                ]
+            )
+            conn.execute(
+                'UPDATE batch_jobs SET processed = processed + ?, succeeded = succeeded + ?, failed = failed + ?, '
+                'pending_chunks = pending_chunks - 1 WHERE id = ?',
+                (len(results), succeeded, len(results) - succeeded, job_id)
+            )
+            row = self._get_row(conn, job_id)
+            if row['pending_chunks'] > 0:
+                return
+            status, error = JOB_COMPLETED, None
+            if row['cancel_requested']:
+                status = JOB_CANCELLED
+            elif row['succeeded'] == 0 and row['failed'] > 0:
+                status, error = JOB_FAILED, '所有内容生成失败'
+            conn.execute(
+                'UPDATE batch_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, error, datetime.now().isoformat(), job_id)
+            )
+
+    def cancel(self, job_id):
+        """请求取消任务（尚未开始的块将被跳过），任务不存在时返回None"""
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute(
+                f"UPDATE batch_jobs SET cancel_requested = 1 "
+                f"WHERE id = ? AND status NOT IN ({', '.join('?' * len(FINISHED_STATES))})",
+                (job_id,) + FINISHED_STATES
+            )
+            row = self._get_row(conn, job_id)
+        return self._to_dict(row) if row else None
+
+    def results(self, job_id, offset=0, limit=100):
+        """
+        按提交顺序读取[offset, offset + limit)范围内已完成的结果
+
+        Returns:
+            dict: 任务状态、结果列表及下一次查询的offset，任务不存在时返回None
+        """
+        if offset < 0 or limit < 1:
+            # 负的offset或为0的limit会让按next_offset翻页的客户端得到错误的位置或陷入死循环
+            raise ValueError('offset不能小于0，limit必须大于0')
+        conn = self._connect()
+        row = self._get_row(conn, job_id)
+        if row is None:
+            return None
+        end = min(offset + limit, row['total'])
+        results = [
+            json.loads(result_row['result'])
+            for result_row in conn.execute(
+                'SELECT result FROM batch_job_results WHERE job_id = ? AND position >= ? AND position < ? '
+                'ORDER BY position',
+                (job_id, offset, end)
+            )
+        ]
+        return {
+            'status': row['status'],
+            'results': results,
+            'next_offset': end if end < row['total'] else None
+        }
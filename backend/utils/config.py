@@ -6,7 +6,20 @@ class Config:
         load_dotenv()
         
         # 数据库配置
+        # 存储实现由扩展名决定：.sqlite/.sqlite3/.db使用SQLite，.log使用仅追加日志，其他使用TinyDB
         self.DB_PATH = os.getenv('DB_PATH', 'data/db.json')
+        # 日志存储：fsync策略（always/interval/never）、interval策略的同步间隔，
+        # 以及触发后台压缩的无效记录占比和最少数量
+        self.LOG_STORE_FSYNC = os.getenv('LOG_STORE_FSYNC', 'interval')
+        self.LOG_STORE_FSYNC_INTERVAL_MS = int(os.getenv('LOG_STORE_FSYNC_INTERVAL_MS', '1000'))
+        self.LOG_STORE_COMPACT_RATIO = float(os.getenv('LOG_STORE_COMPACT_RATIO', '0.5'))
+        self.LOG_STORE_COMPACT_MIN_DEAD = int(os.getenv('LOG_STORE_COMPACT_MIN_DEAD', '1000'))
+        # TinyDB延迟写入：写入先进入内存缓存，每DB_FLUSH_INTERVAL_MS毫秒或累积DB_FLUSH_MAX_WRITES次写入后落盘，
+        # DB_FLUSH_DURABILITY为fsync（等待写入磁盘）或buffered（只写入操作系统缓冲）
+        self.DB_WRITE_BEHIND = os.getenv('DB_WRITE_BEHIND', 'false').lower() == 'true'
+        self.DB_FLUSH_INTERVAL_MS = int(os.getenv('DB_FLUSH_INTERVAL_MS', '200'))
+        self.DB_FLUSH_MAX_WRITES = int(os.getenv('DB_FLUSH_MAX_WRITES', '100'))
+        self.DB_FLUSH_DURABILITY = os.getenv('DB_FLUSH_DURABILITY', 'fsync')
         
         # Hugging Face token
         self.HF_TOKEN = os.getenv('HF_TOKEN')
@@ -18,6 +31,111 @@ class Config:
         # 其他配置
         self.MAX_TOKENS = int(os.getenv('MAX_TOKENS', '1500'))
         self.TEMPERATURE = float(os.getenv('TEMPERATURE', '0.7'))
+
+        # 服务角色：crud（内容管理和搜索）、analytics（数据分析）、generation（模型生成）
+        self.APP_ROLES = [
+            role.strip()
+            for role in os.getenv('APP_ROLES', 'crud,analytics,generation').split(',')
+            if role.strip()
+        ]
+
+        # 模型配置
+        self.MODEL_NAME = os.getenv('MODEL_NAME', 'meta-llama/Llama-3.2-3B-Instruct')
+        # 本地模型快照目录（python -m backend.prepare_model生成），为空时从Hugging Face Hub加载
+        self.MODEL_DIR = os.getenv('MODEL_DIR', '')
+        # 辅助解码草稿模型（同一分词器家族的小模型，如meta-llama/Llama-3.2-1B-Instruct），为空时不启用
+        self.DRAFT_MODEL_NAME = os.getenv('DRAFT_MODEL_NAME', '')
+        self.DRAFT_MODEL_DIR = os.getenv('DRAFT_MODEL_DIR', '')
+        # 推理配置：default/cpu-fp32/cpu-bf16/cpu-int8-dynamic（见config/inference_profiles.py）
+        self.INFERENCE_PROFILE = os.getenv('INFERENCE_PROFILE', 'default')
+        # torch计算线程数，0表示不修改
+        self.TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', '0'))
+        self.TORCH_INTEROP_THREADS = int(os.getenv('TORCH_INTEROP_THREADS', '0'))
+        self.TORCH_COMPILE = os.getenv('TORCH_COMPILE', 'false').lower() == 'true'
+
+        # 多语言模型配置
+        self.DEFAULT_LANGUAGE = os.getenv('DEFAULT_LANGUAGE', 'en')
+        # 语言专用模型，如 zh=Qwen/Qwen2.5-3B-Instruct,en=models/Llama-3.2-3B-Instruct（值为目录时按本地快照加载），
+        # 未列出的语言使用MODEL_NAME/MODEL_DIR；使用同一模型的语言共享一份权重
+        self.LANGUAGE_MODELS = dict(
+            item.strip().split('=', 1)
+            for item in os.getenv('LANGUAGE_MODELS', '').split(',')
+            if '=' in item
+        )
+        # 模型池：常驻模型的内存预算（MB）和数量上限，0表示不限制；超出时按最近最少使用淘汰空闲模型
+        self.MODEL_POOL_MEMORY_MB = int(os.getenv('MODEL_POOL_MEMORY_MB', '0'))
+        self.MODEL_POOL_MAX_MODELS = int(os.getenv('MODEL_POOL_MAX_MODELS', '0'))
+        # 启动时预加载的语言，默认只加载DEFAULT_LANGUAGE
+        self.PRELOAD_LANGUAGES = [
+            language.strip()
+            for language in os.getenv('PRELOAD_LANGUAGES', self.DEFAULT_LANGUAGE).split(',')
+            if language.strip()
+        ]
+
+        # 生成配置
+        self.MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'true').lower() == 'true'
+        self.MODEL_RETRY_AFTER = int(os.getenv('MODEL_RETRY_AFTER', '10'))
+        self.USE_PREFIX_CACHE = os.getenv('USE_PREFIX_CACHE', 'true').lower() == 'true'
+        self.CONSTRAINED_DECODING = os.getenv('CONSTRAINED_DECODING', 'false').lower() == 'true'
+        # 默认使用贪心解码（不采样，相同输入得到相同输出）；配置了草稿模型时只有贪心解码使用辅助解码
+        self.GREEDY_DECODING = os.getenv('GREEDY_DECODING', 'false').lower() == 'true'
+        self.MAX_RETURN_SEQUENCES = int(os.getenv('MAX_RETURN_SEQUENCES', '4'))
+        # 单个生成请求的默认截止时间（毫秒），也是请求中timeout_ms的上限，0表示不限制
+        self.GENERATION_TIMEOUT_MS = int(os.getenv('GENERATION_TIMEOUT_MS', '120000'))
+        # 客户端断开连接时停止解码（通过窥探客户端套接字检测）
+        self.CANCEL_ON_DISCONNECT = os.getenv('CANCEL_ON_DISCONNECT', 'true').lower() == 'true'
+
+        # 独立推理服务配置（INFERENCE_SERVERS为空时在Web进程内加载模型）
+        self.INFERENCE_SERVERS = [
+            address.strip()
+            for address in os.getenv('INFERENCE_SERVERS', '').split(',')
+            if address.strip()
+        ]
+        # 连接认证密钥，没有默认值：连接建立后双方会反序列化收到的数据，知道密钥即可在对方进程中执行代码。
+        # 未设置时推理进程和客户端拒绝启动
+        self.INFERENCE_AUTHKEY = os.getenv('INFERENCE_AUTHKEY', '')
+        self.INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '120'))
+        self.INFERENCE_HOST = os.getenv('INFERENCE_HOST', '127.0.0.1')
+        self.INFERENCE_BASE_PORT = int(os.getenv('INFERENCE_BASE_PORT', '6100'))
+        self.INFERENCE_REPLICAS = int(os.getenv('INFERENCE_REPLICAS', '1'))
+
+        # 生成结果缓存配置
+        self.GENERATION_CACHE_SIZE = int(os.getenv('GENERATION_CACHE_SIZE', '1000'))
+        self.GENERATION_CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', '86400'))
+        self.GENERATION_CACHE_PERSIST = os.getenv('GENERATION_CACHE_PERSIST', 'false').lower() == 'true'
+        self.GENERATION_CACHE_PATH = os.getenv(
+            'GENERATION_CACHE_PATH',
+            os.path.join(os.path.dirname(self.DB_PATH), 'generation_cache.json')
+        )
+
+        # 近似匹配缓存配置
+        self.SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+        self.SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.8'))
+        self.SEMANTIC_CACHE_SIZE = int(os.getenv('SEMANTIC_CACHE_SIZE', '2000'))
+
+        # 微批调度配置
+        self.SCHEDULER_MAX_WAIT_MS = float(os.getenv('SCHEDULER_MAX_WAIT_MS', '20'))
+        self.SCHEDULER_MAX_BATCH_SIZE = int(os.getenv('SCHEDULER_MAX_BATCH_SIZE', '8'))
+        self.SCHEDULER_MAX_QUEUE_SIZE = int(os.getenv('SCHEDULER_MAX_QUEUE_SIZE', '256'))
+
+        # 准入控制配置：每个优先级类别的并发上限和排队上限，队列已满时返回429
+        # interactive为在线请求（/api/generate、/api/generate/stream），batch为批量任务和标记为batch的后台请求
+        self.ADMISSION_INTERACTIVE_CONCURRENCY = int(os.getenv('ADMISSION_INTERACTIVE_CONCURRENCY', '8'))
+        self.ADMISSION_INTERACTIVE_QUEUE = int(os.getenv('ADMISSION_INTERACTIVE_QUEUE', '32'))
+        self.ADMISSION_BATCH_CONCURRENCY = int(os.getenv('ADMISSION_BATCH_CONCURRENCY', '1'))
+        self.ADMISSION_BATCH_QUEUE = int(os.getenv('ADMISSION_BATCH_QUEUE', '16'))
+
+        # 批量任务配置
+        self.BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '1'))
+        self.BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '8'))
+        self.BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '10000'))
+        # 批量任务结果每次查询的最大数量
+        self.BATCH_RESULTS_MAX_LIMIT = int(os.getenv('BATCH_RESULTS_MAX_LIMIT', '1000'))
+        # 批量任务状态和结果的SQLite文件，多worker共享，任一worker都能查询和取消任务
+        self.BATCH_JOB_DB_PATH = os.getenv(
+            'BATCH_JOB_DB_PATH',
+            os.path.join(os.path.dirname(self.DB_PATH), 'batch_jobs.sqlite3')
+        )
         
         # SEO配置
         self.SEO_STRUCT = {
@@ -33,6 +151,15 @@ class Config:
             }
         }
         
+    @property
+    def single_process_storage(self):
+        """当前存储配置只允许一个进程写入时返回说明，否则返回None"""
+        if self.DB_PATH.lower().endswith('.log'):
+            return '仅追加日志存储（DB_PATH=*.log）：偏移和ID分配保存在进程内存中'
+        if self.DB_WRITE_BEHIND and not self.DB_PATH.lower().endswith(('.sqlite', '.sqlite3', '.db', '.log')):
+            return 'TinyDB延迟写入（DB_WRITE_BEHIND=true）：每个进程各自缓存写入，落盘时会互相覆盖'
+        return None
+
     @property
     def is_valid(self):
         """检查配置是否有效"""
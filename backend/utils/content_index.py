@@ -0,0 +1,126 @@
+from bisect import bisect_left, bisect_right, insort
+
+# 比任何内容ID都大的哨兵，用于按created_at取区间上界
+_MAX_ID = float('inf')
+
+
+def _remove_key(keys, key):
+    del keys[bisect_left(keys, key)]
+
+
+class ContentIndex:
+    """
+    内容的内存二级索引
+
+    - 按(created_at, id)排序的列表：分页、游标分页、按时间范围查询用bisect定位，O(log n + 返回数量)；
+    - business_type哈希索引：每个业务类型各有一个按(created_at, id)排序的列表，筛选后的分页同样用bisect定位；
+    - 总数即索引大小，O(1)。
+    没有created_at的内容按空字符串排序（升序时在最前）。索引不是线程安全的，由调用方加锁。
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._created_at = {}
+        self._business_type = {}
+        self._by_business_type = {}
+
+    def __len__(self):
+        return len(self._created_at)
+
+    def __contains__(self, content_id):
+        return content_id in self._created_at
+
+    def rebuild(self, documents):
+        """根据(id, 文档)序列重建索引"""
+        self.__init__()
+        for content_id, document in documents:
+            created_at = str(document.get('created_at') or '')
+            business_type = document.get('business_type', '')
+            self._created_at[content_id] = created_at
+            self._business_type[content_id] = business_type
+            self._keys.append((created_at, content_id))
+            self._by_business_type.setdefault(business_type, []).append((created_at, content_id))
+        self._keys.sort()
+        for keys in self._by_business_type.values():
+            keys.sort()
+
+    def _insert(self, content_id, created_at, business_type):
+        self._created_at[content_id] = created_at
+        self._business_type[content_id] = business_type
+        # 新内容的created_at通常最大，insort只需追加到末尾
+        insort(self._keys, (created_at, content_id))
+        insort(self._by_business_type.setdefault(business_type, []), (created_at, content_id))
+
+    def _delete(self, content_id):
+        created_at = self._created_at.pop(content_id)
+        business_type = self._business_type.pop(content_id)
+        _remove_key(self._keys, (created_at, content_id))
+        keys = self._by_business_type[business_type]
+        _remove_key(keys, (created_at, content_id))
+        if not keys:
+            del self._by_business_type[business_type]
+
+    def add(self, content_id, document):
+        """新增内容（已存在时按更新处理）"""
+        if content_id in self._created_at:
+            self._delete(content_id)
+        self._insert(content_id, str(document.get('created_at') or ''), document.get('business_type', ''))
+
+    def update(self, content_id, changes):
+        """按修改的字段更新索引，只有created_at或business_type变化时才调整"""
+        if content_id not in self._created_at:
+            return
+        created_at = str(changes['created_at'] or '') if 'created_at' in changes else self._created_at[content_id]
+        business_type = changes.get('business_type', self._business_type[content_id])
+        if created_at != self._created_at[content_id] or business_type != self._business_type[content_id]:
+            self._delete(content_id)
+            self._insert(content_id, created_at, business_type)
+
+    def remove(self, content_id):
+        if content_id in self._created_at:
+            self._delete(content_id)
+
+    def _sorted_keys(self, business_type=None):
+        if business_type is None:
+            return self._keys
+        return self._by_business_type.get(business_type, [])
+
+    def count(self, business_type=None):
+        return len(self._sorted_keys(business_type))
+
+    def page(self, skip=0, limit=10, desc=True, business_type=None):
+        """按(created_at, id)排序后的第skip到skip+limit条内容的ID"""
+        keys = self._sorted_keys(business_type)
+        if desc:
+            end = len(keys) - skip
+            if end <= 0:
+                return []
+            return [content_id for _, content_id in reversed(keys[max(0, end - limit):end])]
+        return [content_id for _, content_id in keys[skip:skip + limit]]
+
+    def keyset(self, limit=10, after=None, before=None, business_type=None):
+        """
+        按(created_at, id)倒序的游标分页
+
+        Args:
+            after (tuple): 返回排在该键之后（更旧）的limit条
+            before (tuple): 返回排在该键之前（更新）的limit条
+            都为None时返回第一页
+
+        Returns:
+            tuple: (内容ID列表, 是否还有更新的内容, 是否还有更旧的内容)
+        """
+        keys = self._sorted_keys(business_type)
+        if before is not None:
+            low = bisect_right(keys, tuple(before))
+            high = min(len(keys), low + limit)
+        else:
+            high = bisect_left(keys, tuple(after)) if after is not None else len(keys)
+            low = max(0, high - limit)
+        return [content_id for _, content_id in reversed(keys[low:high])], high < len(keys), low > 0
+
+    def range(self, start_date=None, end_date=None):
+        """created_at在[start_date, end_date]内的内容ID（升序），不包括没有created_at的内容"""
+        low = bisect_left(self._keys, (start_date, -1)) if start_date else bisect_right(self._keys, ('', _MAX_ID))
+        high = bisect_right(self._keys, (end_date, _MAX_ID)) if end_date else len(self._keys)
+        return [content_id for _, content_id in self._keys[low:high]]
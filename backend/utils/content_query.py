@@ -0,0 +1,81 @@
+import base64
+import json
+import re
+
+# 默认搜索字段
+DEFAULT_SEARCH_FIELDS = ['title', 'meta_description', 'keywords', 'business_type']
+
+# 游标方向：next取更旧的一页，prev取更新的一页
+CURSOR_NEXT = 'next'
+CURSOR_PREV = 'prev'
+
+
+def encode_cursor(direction, content):
+    """把方向和内容的(created_at, id)编码为不透明的游标"""
+    payload = json.dumps([direction, str(content.get('created_at') or ''), int(content['id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析游标
+
+    Returns:
+        tuple: (方向, (created_at, id))
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, created_at, content_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if direction not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError(direction)
+        return direction, (str(created_at), int(content_id))
+    except Exception:
+        raise ValueError('无效的分页游标')
+
+
+def relevance_score(content, query_text, search_fields=None):
+    """按字段匹配次数加权计算相关度，title和keywords权重为2"""
+    score = 0
+    for field in search_fields or DEFAULT_SEARCH_FIELDS:
+        value = content.get(field, '')
+        if isinstance(value, list):
+            value = ' '.join(value)
+        if isinstance(value, str):
+            # 计算匹配次数
+            matches = len(re.findall(re.escape(query_text), value, re.I))
+            # 根据字段重要性加权
+            weight = 2.0 if field in ['title', 'keywords'] else 1.0
+            score += matches * weight
+    return score
+
+
+def search_documents(documents, query_text, search_fields=None):
+    """对已带id的文档计算相关度，返回按相关度降序排列的匹配结果（副本）"""
+    results = []
+    for content in documents:
+        score = relevance_score(content, query_text, search_fields)
+        if score > 0:
+            content_copy = dict(content)
+            content_copy['relevance'] = score
+            results.append(content_copy)
+
+    # 按分数排序
+    results.sort(key=lambda x: x['relevance'], reverse=True)
+    return results
+
+
+def paginate_documents(documents, limit=10, skip=0, sort_by='created_at', order='desc'):
+    """对已带id的文档排序并分页，返回与Database.get_contents相同的结构"""
+    # 按指定字段排序
+    sorted_contents = sorted(
+        documents,
+        key=lambda x: x.get(sort_by, ''),
+        reverse=(order.lower() == 'desc')
+    )
+    # 分页
+    return {
+        'items': sorted_contents[skip:skip + limit],
+        'total': len(sorted_contents),
+        'page': skip // limit + 1,
+        'total_pages': (len(sorted_contents) + limit - 1) // limit
+    }
@@ -1,52 +1,328 @@
 from tinydb import TinyDB, Query
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
+from contextlib import nullcontext
 from datetime import datetime
+import atexit
+import copy
+import json
+import logging
 import os
-import re
+import threading
+import time
+from .config import Config
+from .content_query import DEFAULT_SEARCH_FIELDS, search_documents, paginate_documents
+from .content_index import ContentIndex
+
+logger = logging.getLogger(__name__)
+
+# 使用SQLite存储和仅追加日志存储的文件扩展名，其他路径使用TinyDB（JSON文件）
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+LOG_STORE_EXTENSIONS = ('.log',)
+
+# 延迟写入时落盘的持久化级别：fsync等待数据写入磁盘；buffered只写入操作系统缓冲
+DURABILITY_FSYNC = 'fsync'
+DURABILITY_BUFFERED = 'buffered'
+DURABILITY_LEVELS = (DURABILITY_FSYNC, DURABILITY_BUFFERED)
+
+class BufferedJSONStorage(JSONStorage):
+    """与JSONStorage相同，但写入后不调用fsync"""
+
+    def write(self, data):
+        self._handle.seek(0)
+        self._handle.write(json.dumps(data, **self.kwargs))
+        self._handle.flush()
+        self._handle.truncate()
+
+class WriteBehindMiddleware(CachingMiddleware):
+    """
+    延迟写入中间件
+
+    读写都在内存缓存中进行，累积max_writes次写入后落盘一次（其余由Database的后台线程定期落盘），
+    并记录待落盘的写入数、落盘耗时和落盘失败次数。
+    """
+
+    def __init__(self, storage_cls, max_writes=100):
+        super().__init__(storage_cls)
+        self.WRITE_CACHE_SIZE = max_writes
+
+        # 统计数据
+        self.flushes = 0
+        self.flushed_writes = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.last_flush_time = 0.0
+        self.flush_errors = 0
+        self.last_flush_error = None
+
+    @property
+    def pending_writes(self):
+        return self._cache_modified_count
+
+    def flush(self):
+        pending = self._cache_modified_count
+        if pending == 0:
+            return
+        started_at = time.perf_counter()
+        try:
+            super().flush()
+        except Exception as e:
+            # 失败时修改仍保留在缓存中，下次落盘时重试
+            self.flush_errors += 1
+            self.last_flush_error = f"{datetime.now().isoformat()} {str(e)}"
+            raise
+        elapsed = time.perf_counter() - started_at
+        self.flushes += 1
+        self.flushed_writes += pending
+        self.total_flush_time += elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+        self.last_flush_time = elapsed
 
 class Database:
-    def __init__(self, db_path='data/db.json'):
+    def __init__(self, db_path='data/db.json', write_behind=False, flush_interval_ms=200, flush_max_writes=100,
+                 durability=DURABILITY_FSYNC):
+        """
+        Args:
+            db_path (str): 数据库文件路径
+            write_behind (bool): 延迟写入：并发请求的插入和更新在内存中合并，
+                每flush_interval_ms毫秒或累积flush_max_writes次写入后整体落盘一次，进程退出时落盘
+            flush_interval_ms (int): 延迟写入的落盘间隔
+            flush_max_writes (int): 延迟写入累积多少次写入后立即落盘
+            durability (str): 延迟写入的持久化级别，fsync或buffered
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"不支持的持久化级别: {durability}，可选: {', '.join(DURABILITY_LEVELS)}")
         # 确保数据目录存在
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.db = TinyDB(db_path, encoding='utf-8')
+        self.db_path = db_path
+        self.write_behind = write_behind
+        self.durability = durability
+        self.flush_interval = flush_interval_ms / 1000.0
+        # 后台批量任务与请求线程会并发写入，TinyDB本身不是线程安全的
+        self._write_lock = threading.RLock()
+        self._closed = threading.Event()
+        self._flush_thread = None
+        self._flush_pid = None
+
+        if write_behind:
+            storage_cls = JSONStorage if durability == DURABILITY_FSYNC else BufferedJSONStorage
+            self.db = TinyDB(db_path, encoding='utf-8', storage=WriteBehindMiddleware(storage_cls, flush_max_writes))
+            # 延迟写入时读写共享同一份内存缓存，读取也需要加锁
+            self._read_lock = self._write_lock
+            self._ensure_flush_thread()
+            atexit.register(self.close)
+            # fork时不能有其他线程持有写锁，且待落盘的写入只能由一个进程落盘
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(
+                    before=self._before_fork,
+                    after_in_parent=self._write_lock.release,
+                    after_in_child=self._write_lock.release
+                )
+        else:
+            self.db = TinyDB(db_path, encoding='utf-8')
+            self._read_lock = nullcontext()
         self.contents = self.db.table('contents')
         self.analytics = self.db.table('analytics')
         self.Query = Query()
 
+        # created_at排序索引、business_type索引和总数，每次写入时同步更新
+        self._index = ContentIndex()
+        self._index_signature = None
+        # 未启用延迟写入时解析后的contents表及其对应的文件状态，文件未变化时分页读取不再重新解析整个JSON
+        self._documents_cache = (None, None)
+        with self._write_lock:
+            self._rebuild_index()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.db_path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _rebuild_index(self):
+        """从全部文档重建索引（需持有写锁）"""
+        with self._read_lock:
+            self._index.rebuild((content.doc_id, content) for content in self.contents.all())
+        self._index_signature = self._file_signature()
+
+    def _indexed(self):
+        """
+        返回最新的索引
+
+        未启用延迟写入时，其他进程也可能写入同一个文件：文件的修改时间或大小与本进程最后一次写入后不同时重建索引。
+        """
+        with self._write_lock:
+            if not self.write_behind and self._file_signature() != self._index_signature:
+                self._rebuild_index()
+            return self._index
+
+    def _written(self):
+        """
+        本进程写入后记录文件状态，避免把自己的写入当成其他进程的修改（需持有写锁）
+
+        延迟写入时确保本进程有落盘线程：在gunicorn master中创建的实例被fork到worker后，worker中没有落盘线程。
+        """
+        if self.write_behind:
+            self._ensure_flush_thread()
+        else:
+            self._index_signature = self._file_signature()
+
+    def _before_fork(self):
+        self._write_lock.acquire()
+        if not self._closed.is_set():
+            self.db.storage.flush()
+
+    def _ensure_flush_thread(self):
+        """启动落盘线程（fork后在子进程中重新启动）"""
+        if self._flush_thread is not None and self._flush_thread.is_alive() and self._flush_pid == os.getpid():
+            return
+        self._flush_pid = os.getpid()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True, name='db-flush')
+        self._flush_thread.start()
+
+    def _document_table(self):
+        """
+        contents表的原始文档（ID为字符串）
+
+        延迟写入时直接使用内存缓存；否则按文件状态（与_indexed相同的修改时间和大小）缓存解析结果，
+        文件被本进程或其他进程修改后重新读取。
+        """
+        if self.write_behind:
+            return (self.db.storage.read() or {}).get('contents', {})
+        signature = self._file_signature()
+        cached_signature, table = self._documents_cache
+        if table is None or signature != cached_signature:
+            table = (self.db.storage.read() or {}).get('contents', {})
+            self._documents_cache = (signature, table)
+        return table
+
+    def _get_documents(self, content_ids):
+        """按给定顺序读取文档，不构造整张表的文档对象"""
+        with self._read_lock:
+            table = self._document_table()
+            documents = []
+            for content_id in content_ids:
+                raw = table.get(str(content_id))
+                if raw is not None:
+                    # 缓存的文档在多次请求间共享，返回副本
+                    content = copy.deepcopy(raw)
+                    content['id'] = content_id
+                    documents.append(content)
+        return documents
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 落盘失败时保留缓存，下一轮重试
+                logger.exception("数据库落盘失败: %s", self.db_path)
+
+    def flush(self):
+        """把延迟写入的修改落盘（未启用延迟写入时无操作）"""
+        if self.write_behind:
+            with self._write_lock:
+                self.db.storage.flush()
+
+    def close(self):
+        """落盘并关闭数据库（启用延迟写入时在进程退出时自动调用）"""
+        with self._write_lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self.db.close()
+
+    def stats(self):
+        """存储统计：延迟写入时包括待落盘的写入数、落盘耗时和落盘失败次数"""
+        stats = {
+            'backend': 'tinydb',
+            'path': self.db_path,
+            'write_behind': self.write_behind
+        }
+        if self.write_behind:
+            with self._write_lock:
+                storage = self.db.storage
+                stats.update({
+                    'durability': self.durability,
+                    'flush_interval_ms': self.flush_interval * 1000,
+                    'flush_max_writes': storage.WRITE_CACHE_SIZE,
+                    'pending_writes': storage.pending_writes,
+                    'flushes': storage.flushes,
+                    'writes_per_flush': round(storage.flushed_writes / storage.flushes, 2) if storage.flushes else 0,
+                    'avg_flush_ms': round(storage.total_flush_time * 1000 / storage.flushes, 2) if storage.flushes else 0,
+                    'max_flush_ms': round(storage.max_flush_time * 1000, 2),
+                    'last_flush_ms': round(storage.last_flush_time * 1000, 2),
+                    'flush_errors': storage.flush_errors,
+                    'last_flush_error': storage.last_flush_error
+                })
+        return stats
+
     def save_content(self, content_data):
         """保存生成的内容"""
         content_data['created_at'] = datetime.now().isoformat()
-        return self.contents.insert(content_data)
+        with self._write_lock:
+            self._indexed()
+            content_id = self.contents.insert(content_data)
+            self._index.add(content_id, content_data)
+            self._written()
+            return content_id
 
     def get_content(self, content_id):
         """获取单个内容"""
         try:
-            content = self.contents.get(doc_id=int(content_id))
+            with self._read_lock:
+                content = self.contents.get(doc_id=int(content_id))
             if content:
                 content['id'] = content_id
             return content
         except Exception as e:
             raise Exception(f"获取内容失败: {str(e)}")
 
-    def get_contents(self, limit=10, skip=0, sort_by='created_at', order='desc'):
-        """获取内容列表，支持排序和分页"""
+    def get_contents(self, limit=10, skip=0, sort_by='created_at', order='desc', business_type=None):
+        """获取内容列表，支持排序、按业务类型筛选和分页（按created_at排序时使用索引，不排序全表）"""
         try:
-            all_contents = self.contents.all()
+            if sort_by == 'created_at':
+                with self._write_lock:
+                    index = self._indexed()
+                    content_ids = index.page(skip, limit, order.lower() == 'desc', business_type)
+                    total = index.count(business_type)
+                return {
+                    'items': self._get_documents(content_ids),
+                    'total': total,
+                    'page': skip // limit + 1,
+                    'total_pages': (total + limit - 1) // limit
+                }
+
+            with self._read_lock:
+                all_contents = self.contents.all()
             # 为每个内容添加ID
             for content in all_contents:
                 content['id'] = content.doc_id
-            # 按指定字段排序
-            sorted_contents = sorted(
-                all_contents,
-                key=lambda x: x.get(sort_by, ''),
-                reverse=(order.lower() == 'desc')
-            )
-            # 分页
-            paginated = sorted_contents[skip:skip + limit]
+            if business_type is not None:
+                all_contents = [content for content in all_contents if content.get('business_type') == business_type]
+            return paginate_documents(all_contents, limit, skip, sort_by, order)
+        except Exception as e:
+            raise Exception(f"获取内容列表失败: {str(e)}")
+
+    def get_contents_keyset(self, limit=10, after=None, before=None, business_type=None):
+        """
+        按(created_at, id)倒序的游标分页，页面位置不受新插入内容的影响
+
+        Args:
+            after (tuple): 上一页最后一条的(created_at, id)，返回更旧的一页
+            before (tuple): 当前页第一条的(created_at, id)，返回更新的一页
+        """
+        try:
+            with self._write_lock:
+                index = self._indexed()
+                content_ids, has_newer, has_older = index.keyset(limit, after, before, business_type)
+                total = index.count(business_type)
             return {
-                'items': paginated,
-                'total': len(all_contents),
-                'page': skip // limit + 1,
-                'total_pages': (len(all_contents) + limit - 1) // limit
+                'items': self._get_documents(content_ids),
+                'total': total,
+                'has_newer': has_newer,
+                'has_older': has_older
             }
         except Exception as e:
             raise Exception(f"获取内容列表失败: {str(e)}")
@@ -54,7 +330,11 @@ class Database:
     def update_content(self, content_id, data):
         """更新内容"""
         try:
-            self.contents.update(data, doc_ids=[int(content_id)])
+            with self._write_lock:
+                self._indexed()
+                self.contents.update(data, doc_ids=[int(content_id)])
+                self._index.update(int(content_id), data)
+                self._written()
             return True
         except Exception as e:
             raise Exception(f"更新内容失败: {str(e)}")
@@ -68,7 +348,11 @@ class Database:
                 raise Exception("内容不存在")
                 
             # 删除内容
-            self.contents.remove(doc_ids=[int(content_id)])
+            with self._write_lock:
+                self._indexed()
+                self.contents.remove(doc_ids=[int(content_id)])
+                self._index.remove(int(content_id))
+                self._written()
             return True
         except Exception as e:
             raise Exception(f"删除内容失败: {str(e)}")
@@ -77,49 +361,27 @@ class Database:
         """增强的搜索功能"""
         try:
             if not search_fields:
-                search_fields = ['title', 'meta_description', 'keywords', 'business_type']
-            
-            all_contents = self.contents.all()
-            results = []
+                search_fields = DEFAULT_SEARCH_FIELDS
             
+            with self._read_lock:
+                all_contents = self.contents.all()
             for content in all_contents:
-                score = 0
-                for field in search_fields:
-                    value = content.get(field, '')
-                    if isinstance(value, list):
-                        value = ' '.join(value)
-                    if isinstance(value, str):
-                        # 计算匹配次数
-                        matches = len(re.findall(re.escape(query_text), value, re.I))
-                        # 根据字段重要性加权
-                        weight = 2.0 if field in ['title', 'keywords'] else 1.0
-                        score += matches * weight
-                
-                if score > 0:
-                    content_copy = dict(content)
-                    content_copy['relevance'] = score
-                    content_copy['id'] = content.doc_id
-                    results.append(content_copy)
-            
-            # 按分数排序
-            results.sort(key=lambda x: x['relevance'], reverse=True)
-            return results
+                content['id'] = content.doc_id
+            return search_documents(all_contents, query_text, search_fields)
             
         except Exception as e:
             raise Exception(f"搜索内容失败: {str(e)}")
 
     def get_analytics(self, start_date=None, end_date=None):
-        """获取分析数据"""
-        query = self.Query.created_at.exists()
-        if start_date:
-            query = query & (self.Query.created_at >= start_date)
-        if end_date:
-            query = query & (self.Query.created_at <= end_date)
-        return self.contents.search(query)
-
-    def get_contents_count(self):
+        """获取分析数据（在created_at索引上二分查找时间范围）"""
+        with self._write_lock:
+            content_ids = self._indexed().range(start_date, end_date)
+        return self._get_documents(content_ids)
+
+    def get_contents_count(self, business_type=None):
         """获取内容总数"""
-        return len(self.contents.all())
+        with self._write_lock:
+            return self._indexed().count(business_type)
 
     def save_batch_contents(self, contents_list):
         """增强的批量保存功能"""
@@ -138,7 +400,12 @@ class Database:
                 content['updated_at'] = timestamp
             
             # 批量插入
-            inserted_ids = self.contents.insert_multiple(contents_list)
+            with self._write_lock:
+                self._indexed()
+                inserted_ids = self.contents.insert_multiple(contents_list)
+                for content_id, content in zip(inserted_ids, contents_list):
+                    self._index.add(content_id, content)
+                self._written()
             return {
                 'success': True,
                 'inserted_count': len(inserted_ids),
@@ -148,5 +415,28 @@ class Database:
         except Exception as e:
             raise Exception(f"批量保存失败: {str(e)}")
 
+def create_database(config):
+    """按DB_PATH的扩展名选择存储实现：.sqlite/.sqlite3/.db使用SQLite，.log使用仅追加日志，其他使用TinyDB"""
+    db_path = config.DB_PATH
+    if db_path.lower().endswith(SQLITE_EXTENSIONS):
+        from .sqlite_db import SQLiteDatabase
+        return SQLiteDatabase(db_path)
+    if db_path.lower().endswith(LOG_STORE_EXTENSIONS):
+        from .log_store import LogStructuredDatabase
+        return LogStructuredDatabase(
+            db_path,
+            fsync_policy=config.LOG_STORE_FSYNC,
+            fsync_interval_ms=config.LOG_STORE_FSYNC_INTERVAL_MS,
+            compact_ratio=config.LOG_STORE_COMPACT_RATIO,
+            compact_min_dead=config.LOG_STORE_COMPACT_MIN_DEAD
+        )
+    return Database(
+        db_path,
+        write_behind=config.DB_WRITE_BEHIND,
+        flush_interval_ms=config.DB_FLUSH_INTERVAL_MS,
+        flush_max_writes=config.DB_FLUSH_MAX_WRITES,
+        durability=config.DB_FLUSH_DURABILITY
+    )
+
 # 创建全局数据库实例
-db = Database()
+db = create_database(Config())
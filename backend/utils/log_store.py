@@ -0,0 +1,593 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from .content_query import DEFAULT_SEARCH_FIELDS, search_documents, paginate_documents
+from .content_index import ContentIndex
+
+logger = logging.getLogger(__name__)
+
+# fsync策略：always每次写入后同步；interval由后台线程定期同步；never交给操作系统
+FSYNC_ALWAYS = 'always'
+FSYNC_INTERVAL = 'interval'
+FSYNC_NEVER = 'never'
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+# 记录类型
+OP_PUT = 'put'
+OP_DELETE = 'del'
+OP_META = 'meta'
+
+
+def _encode(record):
+    """一条记录占一行：8位十六进制CRC32 + 空格 + JSON"""
+    payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b'%08x ' % zlib.crc32(payload) + payload + b'\n'
+
+
+def _decode(line):
+    """解析一行记录，不完整或校验失败时返回None"""
+    if len(line) < 10 or not line.endswith(b'\n') or line[8:9] != b' ':
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload.decode('utf-8'))
+    except ValueError:
+        return None
+
+
+class _LogIndex:
+    """id -> (偏移, 长度) 索引及日志中的记录计数"""
+
+    def __init__(self):
+        self.offsets = {}
+        self.next_id = 1
+        self.records = 0
+        self.dead = 0
+
+    def apply(self, record, offset, length):
+        op = record['op']
+        if op == OP_META:
+            self.next_id = max(self.next_id, record['next_id'])
+            return
+        self.records += 1
+        content_id = record['id']
+        if op == OP_PUT:
+            if content_id in self.offsets:
+                self.dead += 1
+            self.offsets[content_id] = (offset, length)
+            self.next_id = max(self.next_id, content_id + 1)
+        elif op == OP_DELETE:
+            if self.offsets.pop(content_id, None) is not None:
+                self.dead += 1
+            # 删除标记本身也是无效记录
+            self.dead += 1
+
+
+class LogStructuredDatabase:
+    """
+    仅追加的日志存储，接口与Database（TinyDB）一致
+
+    - 插入、更新、删除都以一行记录追加到日志文件末尾（更新追加完整文档，删除追加删除标记），
+      写入开销与已有记录数无关；批量保存只追加一次、同步一次；
+    - 每行带CRC32校验，写入中途崩溃只会在末尾留下不完整的记录，打开时截断；
+    - 打开时顺序扫描日志重建 id -> 偏移 的内存索引，读取单条内容只需一次pread；
+      同时重建created_at/business_type二级索引，按时间分页、计数和时间范围查询只读取需要的记录；
+    - 无效记录（被覆盖的旧版本和删除标记）超过阈值时后台压缩：把存活记录写成新的快照文件后原子替换，
+      压缩期间的写入不受影响，完成前追加的记录会一并复制到快照中；
+    - 偏移、下一个ID等状态保存在进程内存中，同一时间只能有一个进程使用：打开时对<日志>.lock加排他的flock，
+      已被其他进程持有时报错。fork时父进程释放文件锁，fork后哪个进程先访问存储就由哪个进程重新加锁并重新扫描日志
+      （gunicorn预加载时master创建的实例由worker接管），其他进程再访问时报错。
+    """
+
+    def __init__(self, db_path='data/contents.log', fsync_policy=FSYNC_INTERVAL, fsync_interval_ms=1000,
+                 compact_ratio=0.5, compact_min_dead=1000, migrate_from=None):
+        """
+        Args:
+            db_path (str): 日志文件路径
+            fsync_policy (str): always/interval/never
+            fsync_interval_ms (int): interval策略下的同步间隔
+            compact_ratio (float): 无效记录占比达到该值时压缩
+            compact_min_dead (int): 触发压缩的最少无效记录数
+            migrate_from (str): 空日志时导入的TinyDB文件，默认取同目录下的db.json
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"不支持的fsync策略: {fsync_policy}，可选: {', '.join(FSYNC_POLICIES)}")
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.compact_ratio = compact_ratio
+        self.compact_min_dead = compact_min_dead
+
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compacting = False
+        self._dirty = False
+        self._closed = threading.Event()
+        self._lock_path = db_path + '.lock'
+        self._lock_fd = None
+        self._fsync_thread = None
+        self._fsync_pid = None
+
+        # 统计数据
+        self._fsyncs = 0
+        self._fsync_errors = 0
+        self._last_fsync_error = None
+        self._compactions = 0
+        self._last_compaction = None
+        self._last_compaction_error = None
+
+        self._acquire_process_lock()
+        self._pid = os.getpid()
+        self._index, self._contents_index, self._size = self._load()
+        self._open_files()
+
+        if migrate_from is None:
+            migrate_from = os.path.join(directory, 'db.json')
+        if migrate_from and os.path.exists(migrate_from) and self._index.records == 0:
+            self.migrate_from_tinydb(migrate_from)
+
+        self._ensure_fsync_thread()
+        atexit.register(self.close)
+        os.register_at_fork(
+            before=self._before_fork,
+            after_in_parent=self._after_fork_in_parent,
+            after_in_child=self._after_fork_in_child
+        )
+
+    def _acquire_process_lock(self):
+        """对锁文件加排他锁，已被其他进程持有时报错"""
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            holder = os.pread(fd, 32, 0).decode('ascii', 'ignore').strip() or '未知'
+            os.close(fd)
+            raise Exception(
+                f"日志存储{self.db_path}已被其他进程（pid {holder}）打开。"
+                f"日志存储只支持单进程写入，多进程部署请使用SQLite"
+            )
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, str(os.getpid()).encode('ascii'), 0)
+        self._lock_fd = fd
+
+    @contextmanager
+    def _locked(self):
+        """持有锁并确认本进程拥有日志存储"""
+        with self._lock:
+            self._ensure_process()
+            yield
+
+    def _ensure_process(self):
+        """fork后第一次访问时重新加锁，并重新扫描日志（其他进程可能已经写入）"""
+        if self._pid == os.getpid():
+            return
+        # 继承的锁文件描述符与其他进程共享，需要重新打开
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._acquire_process_lock()
+        self._close_files()
+        self._index, self._contents_index, self._size = self._load()
+        self._open_files()
+        self._dirty = False
+        self._pid = os.getpid()
+        self._ensure_fsync_thread()
+
+    def _ensure_fsync_thread(self):
+        """interval策略下启动同步线程（fork后在子进程中重新启动）"""
+        if self.fsync_policy != FSYNC_INTERVAL:
+            return
+        if self._fsync_thread is not None and self._fsync_thread.is_alive() and self._fsync_pid == os.getpid():
+            return
+        self._fsync_pid = os.getpid()
+        self._fsync_thread = threading.Thread(target=self._fsync_loop, daemon=True, name='log-store-fsync')
+        self._fsync_thread.start()
+
+    def _before_fork(self):
+        # fork时不能有其他线程持有锁；同步已追加的记录并释放文件锁，交给fork后先访问存储的进程
+        self._lock.acquire()
+        if self._closed.is_set() or self._pid != os.getpid():
+            return
+        self.flush()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._pid = None
+
+    def _after_fork_in_parent(self):
+        self._lock.release()
+
+    def _after_fork_in_child(self):
+        # 父进程中的压缩线程不会出现在子进程中
+        self._compaction_lock = threading.Lock()
+        self._compacting = False
+        self._lock.release()
+
+    def _load(self):
+        """扫描日志重建索引，截断末尾不完整的记录"""
+        index = _LogIndex()
+        contents_index = ContentIndex()
+        offset = 0
+        if not os.path.exists(self.db_path):
+            return index, contents_index, offset
+        with open(self.db_path, 'rb+') as f:
+            for line in f:
+                record = _decode(line)
+                if record is None:
+                    if f.read():
+                        raise Exception(f"日志文件损坏（偏移{offset}）: {self.db_path}")
+                    # 写入中途崩溃留下的不完整记录
+                    f.truncate(offset)
+                    break
+                index.apply(record, offset, len(line))
+                self._apply_to_contents_index(contents_index, record)
+                offset += len(line)
+        return index, contents_index, offset
+
+    @staticmethod
+    def _apply_to_contents_index(contents_index, record):
+        if record['op'] == OP_PUT:
+            contents_index.add(record['id'], record['doc'])
+        elif record['op'] == OP_DELETE:
+            contents_index.remove(record['id'])
+
+    def _open_files(self):
+        self._fd = os.open(self.db_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._read_fd = os.open(self.db_path, os.O_RDONLY)
+
+    def _close_files(self):
+        os.close(self._fd)
+        os.close(self._read_fd)
+
+    def _append(self, records):
+        """追加记录并更新索引（需持有锁），按fsync策略同步"""
+        offset = self._size
+        lines = [_encode(record) for record in records]
+        data = memoryview(b''.join(lines))
+        try:
+            while data:
+                written = os.write(self._fd, data)
+                data = data[written:]
+        except OSError:
+            # 部分写入后失败（如ENOSPC、EIO）时截掉已写入的部分，否则之后追加的记录偏移都会错位
+            self._discard_partial_write()
+            raise
+        for record, line in zip(records, lines):
+            self._index.apply(record, offset, len(line))
+            self._apply_to_contents_index(self._contents_index, record)
+            offset += len(line)
+        self._size = offset
+
+        if self.fsync_policy == FSYNC_ALWAYS:
+            os.fsync(self._fd)
+            self._fsyncs += 1
+        else:
+            self._dirty = True
+        self._maybe_compact()
+
+    def _discard_partial_write(self):
+        """截断到最后一条完整记录的末尾；截断也失败时按文件实际大小继续追加"""
+        try:
+            os.ftruncate(self._fd, self._size)
+        except OSError:
+            # 残留的半条记录在重新打开时会被当作日志损坏，但本进程之后的读取和追加仍然正确
+            self._size = os.fstat(self._fd).st_size
+
+    def _read(self, content_id):
+        """读取单条内容（需持有锁），不存在时返回None"""
+        position = self._index.offsets.get(content_id)
+        if position is None:
+            return None
+        offset, length = position
+        record = _decode(os.pread(self._read_fd, length, offset))
+        if record is None:
+            raise Exception(f"日志记录损坏（偏移{offset}）: {self.db_path}")
+        content = record['doc']
+        content['id'] = content_id
+        return content
+
+    def _all(self):
+        """按ID顺序读取全部内容"""
+        with self._locked():
+            return [self._read(content_id) for content_id in sorted(self._index.offsets)]
+
+    def save_content(self, content_data):
+        """保存生成的内容"""
+        content_data['created_at'] = datetime.now().isoformat()
+        with self._locked():
+            content_id = self._index.next_id
+            self._append([{'op': OP_PUT, 'id': content_id, 'doc': content_data}])
+            return content_id
+
+    def get_content(self, content_id):
+        """获取单个内容"""
+        try:
+            with self._locked():
+                content = self._read(int(content_id))
+            if content:
+                content['id'] = content_id
+            return content
+        except Exception as e:
+            raise Exception(f"获取内容失败: {str(e)}")
+
+    def get_contents(self, limit=10, skip=0, sort_by='created_at', order='desc', business_type=None):
+        """获取内容列表，支持排序、按业务类型筛选和分页（按created_at排序时只读取当前页）"""
+        try:
+            if sort_by == 'created_at':
+                with self._locked():
+                    content_ids = self._contents_index.page(skip, limit, order.lower() == 'desc', business_type)
+                    total = self._contents_index.count(business_type)
+                    items = [self._read(content_id) for content_id in content_ids]
+                return {
+                    'items': items,
+                    'total': total,
+                    'page': skip // limit + 1,
+                    'total_pages': (total + limit - 1) // limit
+                }
+            contents = self._all()
+            if business_type is not None:
+                contents = [content for content in contents if content.get('business_type') == business_type]
+            return paginate_documents(contents, limit, skip, sort_by, order)
+        except Exception as e:
+            raise Exception(f"获取内容列表失败: {str(e)}")
+
+    def get_contents_keyset(self, limit=10, after=None, before=None, business_type=None):
+        """按(created_at, id)倒序的游标分页，after/before为(created_at, id)"""
+        try:
+            with self._locked():
+                content_ids, has_newer, has_older = self._contents_index.keyset(limit, after, before, business_type)
+                return {
+                    'items': [self._read(content_id) for content_id in content_ids],
+                    'total': self._contents_index.count(business_type),
+                    'has_newer': has_newer,
+                    'has_older': has_older
+                }
+        except Exception as e:
+            raise Exception(f"获取内容列表失败: {str(e)}")
+
+    def update_content(self, content_id, data):
+        """更新内容（追加更新后的完整文档）"""
+        try:
+            with self._locked():
+                content = self._read(int(content_id))
+                if content is None:
+                    raise Exception("内容不存在")
+                content.pop('id')
+                content.update(data)
+                self._append([{'op': OP_PUT, 'id': int(content_id), 'doc': content}])
+            return True
+        except Exception as e:
+            raise Exception(f"更新内容失败: {str(e)}")
+
+    def delete_content(self, content_id):
+        """删除内容（追加删除标记）"""
+        try:
+            with self._locked():
+                if int(content_id) not in self._index.offsets:
+                    raise Exception("内容不存在")
+                self._append([{'op': OP_DELETE, 'id': int(content_id)}])
+            return True
+        except Exception as e:
+            raise Exception(f"删除内容失败: {str(e)}")
+
+    def search_contents(self, query_text, search_fields=None):
+        """增强的搜索功能"""
+        try:
+            return search_documents(self._all(), query_text, search_fields or DEFAULT_SEARCH_FIELDS)
+        except Exception as e:
+            raise Exception(f"搜索内容失败: {str(e)}")
+
+    def get_analytics(self, start_date=None, end_date=None):
+        """获取分析数据（在created_at索引上二分查找时间范围）"""
+        with self._locked():
+            return [self._read(content_id) for content_id in self._contents_index.range(start_date, end_date)]
+
+    def get_contents_count(self, business_type=None):
+        """获取内容总数"""
+        with self._locked():
+            return self._contents_index.count(business_type)
+
+    def save_batch_contents(self, contents_list):
+        """增强的批量保存功能（一次追加、一次同步）"""
+        try:
+            # 验证数据格式
+            required_fields = ['title', 'meta_description', 'keywords']
+            for content in contents_list:
+                missing_fields = [field for field in required_fields if field not in content]
+                if missing_fields:
+                    raise ValueError(f"内容缺少必要字段: {', '.join(missing_fields)}")
+
+            # 添加时间戳
+            timestamp = datetime.now().isoformat()
+            for content in contents_list:
+                content['created_at'] = timestamp
+                content['updated_at'] = timestamp
+
+            # 批量追加
+            with self._locked():
+                first_id = self._index.next_id
+                inserted_ids = list(range(first_id, first_id + len(contents_list)))
+                self._append([
+                    {'op': OP_PUT, 'id': content_id, 'doc': content}
+                    for content_id, content in zip(inserted_ids, contents_list)
+                ])
+            return {
+                'success': True,
+                'inserted_count': len(inserted_ids),
+                'inserted_ids': inserted_ids
+            }
+
+        except Exception as e:
+            raise Exception(f"批量保存失败: {str(e)}")
+
+    def migrate_from_tinydb(self, json_path):
+        """
+        从TinyDB文件导入内容（保留原ID），只导入到空日志
+
+        Returns:
+            int: 导入的内容数量
+        """
+        try:
+            with open(json_path, encoding='utf-8') as f:
+                documents = json.load(f).get('contents', {})
+        except Exception as e:
+            raise Exception(f"读取TinyDB文件失败: {str(e)}")
+        with self._locked():
+            if self._index.records or not documents:
+                return 0
+            self._append([
+                {'op': OP_PUT, 'id': int(doc_id), 'doc': document}
+                for doc_id, document in sorted(documents.items(), key=lambda item: int(item[0]))
+            ])
+            self.flush()
+        return len(documents)
+
+    def flush(self):
+        """把已追加的记录同步到磁盘"""
+        with self._lock:
+            if self._dirty:
+                os.fsync(self._fd)
+                self._dirty = False
+                self._fsyncs += 1
+
+    def _fsync_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # 同步失败时线程继续运行，下一个间隔重试；错误保留在统计中，
+                # 之后的同步成功也不清除（fsync失败后内核可能已丢弃这部分脏页）
+                with self._lock:
+                    self._fsync_errors += 1
+                    self._last_fsync_error = f"{datetime.now().isoformat()} {str(e)}"
+                logger.exception("日志存储同步失败: %s", self.db_path)
+
+    def _maybe_compact(self):
+        """无效记录超过阈值时在后台压缩（需持有锁）"""
+        index = self._index
+        if self._compacting or index.dead < self.compact_min_dead or index.dead < index.records * self.compact_ratio:
+            return
+        self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True, name='log-store-compaction').start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            self._last_compaction_error = str(e)
+
+    def compact(self):
+        """
+        把存活记录写成快照文件并原子替换日志
+
+        复制存活记录时不持有锁，写入照常进行；替换前在锁内补上复制期间追加的记录。
+        """
+        with self._compaction_lock:
+            self._compacting = True
+            try:
+                self._compact()
+            finally:
+                self._compacting = False
+
+    def _compact(self):
+        with self._locked():
+            pid = self._pid
+            self.flush()
+            snapshot = dict(self._index.offsets)
+            next_id = self._index.next_id
+            end = self._size
+
+        compact_path = f'{self.db_path}.compact.{os.getpid()}'
+        index = _LogIndex()
+        read_fd = os.open(self.db_path, os.O_RDONLY)
+        try:
+            with open(compact_path, 'wb') as out:
+                header = {'op': OP_META, 'next_id': next_id, 'compacted_at': datetime.now().isoformat()}
+                line = _encode(header)
+                out.write(line)
+                index.apply(header, 0, len(line))
+                offset = len(line)
+                for content_id in sorted(snapshot):
+                    position, length = snapshot[content_id]
+                    line = os.pread(read_fd, length, position)
+                    out.write(line)
+                    index.offsets[content_id] = (offset, length)
+                    index.records += 1
+                    offset += length
+
+                with self._locked():
+                    if self._pid != pid:
+                        raise Exception("压缩期间发生了fork，放弃本次压缩")
+                    # 复制期间追加的记录
+                    tail = os.pread(read_fd, self._size - end, end)
+                    for line in tail.splitlines(keepends=True):
+                        index.apply(_decode(line), offset, len(line))
+                        offset += len(line)
+                    out.write(tail)
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                    os.replace(compact_path, self.db_path)
+                    self._fsync_directory()
+                    self._close_files()
+                    self._open_files()
+                    self._index = index
+                    self._size = offset
+                    self._dirty = False
+                    self._compactions += 1
+                    self._last_compaction = datetime.now().isoformat()
+                    self._last_compaction_error = None
+        finally:
+            os.close(read_fd)
+            if os.path.exists(compact_path):
+                os.remove(compact_path)
+
+    def _fsync_directory(self):
+        """同步目录项，保证替换后的文件名在崩溃后仍然有效"""
+        dir_fd = os.open(os.path.dirname(self.db_path) or '.', os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def close(self):
+        """同步并关闭日志文件（进程退出时自动调用）"""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self.flush()
+            self._close_files()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    def stats(self):
+        """日志存储统计"""
+        with self._lock:
+            return {
+                'backend': 'log',
+                'path': self.db_path,
+                'fsync_policy': self.fsync_policy,
+                'size_bytes': self._size,
+                'live': len(self._index.offsets),
+                'records': self._index.records,
+                'dead': self._index.dead,
+                'pending_fsync': self._dirty,
+                'fsyncs': self._fsyncs,
+                'fsync_errors': self._fsync_errors,
+                'last_fsync_error': self._last_fsync_error,
+                'compacting': self._compacting,
+                'compactions': self._compactions,
+                'last_compaction': self._last_compaction,
+                'last_compaction_error': self._last_compaction_error
+            }
@@ -0,0 +1,392 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from .content_query import DEFAULT_SEARCH_FIELDS, search_documents
+
+# 内容表的列（keywords单独存放在content_keywords表中）
+CONTENT_COLUMNS = ('title', 'meta_description', 'business_type', 'created_at', 'updated_at')
+SORTABLE_COLUMNS = ('id',) + CONTENT_COLUMNS
+# 单条SQL中IN (...)参数数量上限，低于SQLite默认的999
+_MAX_PARAMS = 500
+# 游标分页的排序键：没有created_at的内容（如从TinyDB导入的旧文档）按空字符串排序，与ContentIndex一致。
+# 直接比较NULL永远不成立，这些内容将无法通过游标翻到
+_KEYSET_SORT_KEY = "COALESCE(created_at, '')"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL DEFAULT '',
+    meta_description TEXT NOT NULL DEFAULT '',
+    business_type TEXT NOT NULL DEFAULT '',
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_contents_created_at ON contents(created_at);
+CREATE INDEX IF NOT EXISTS idx_contents_business_type ON contents(business_type);
+CREATE INDEX IF NOT EXISTS idx_contents_keyset ON contents(COALESCE(created_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_contents_business_type_keyset ON contents(business_type, COALESCE(created_at, ''), id);
+CREATE TABLE IF NOT EXISTS content_keywords (
+    content_id INTEGER NOT NULL REFERENCES contents(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (content_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_content_keywords_keyword ON content_keywords(keyword);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _contains_text(value, query_text):
+    """
+    SQL函数contains_text：与relevance_score相同的忽略大小写子串匹配
+
+    SQLite的LIKE只对ASCII字母忽略大小写，非ASCII文本（如"CAFÉ"与"café"）会被漏掉，
+    搜索结果与TinyDB实现不一致，因此筛选也使用Python的re.I匹配
+    """
+    return value is not None and re.search(re.escape(query_text), value, re.I) is not None
+
+
+class SQLiteDatabase:
+    """
+    SQLite存储实现，接口与Database（TinyDB）一致
+
+    - WAL模式：读不阻塞写，写入只追加到WAL文件，不再重写整个数据文件；
+    - created_at、business_type建有索引，列表、分析查询不再扫描全表；
+    - 关键词存放在content_keywords表（每行一个关键词），可按关键词索引查询；
+    - 首次打开空库时，自动把同目录下旧的TinyDB文件（db.json）导入一次。
+    每个线程使用独立的连接，进程内的写入由锁串行化，跨进程的写入由SQLite文件锁协调。
+    """
+
+    def __init__(self, db_path='data/db.sqlite3', migrate_from=None, busy_timeout_ms=5000):
+        """
+        Args:
+            db_path (str): 数据库文件路径
+            migrate_from (str): 要导入的TinyDB文件，默认取同目录下的db.json
+            busy_timeout_ms (int): 等待其他进程释放写锁的时间
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executescript(_SCHEMA)
+
+        if migrate_from is None:
+            migrate_from = os.path.join(directory, 'db.json')
+        if migrate_from and os.path.exists(migrate_from):
+            self.migrate_from_tinydb(migrate_from)
+
+    def _connect(self):
+        """当前线程的连接；fork后的子进程重新建立连接，不沿用父进程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下NORMAL只在检查点时同步，断电最多丢失最近提交的事务，不会损坏数据库
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.create_function('contains_text', 2, _contains_text, deterministic=True)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _insert(self, conn, content_data, content_id=None):
+        """插入一条内容及其关键词（需在事务中调用），返回ID"""
+        columns = ['id'] if content_id is not None else []
+        values = [content_id] if content_id is not None else []
+        for column in CONTENT_COLUMNS:
+            if column in content_data:
+                columns.append(column)
+                values.append(content_data[column])
+        cursor = conn.execute(
+            f"INSERT INTO contents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+        content_id = cursor.lastrowid
+        self._replace_keywords(conn, content_id, content_data.get('keywords') or [])
+        return content_id
+
+    def _replace_keywords(self, conn, content_id, keywords):
+        conn.execute('DELETE FROM content_keywords WHERE content_id = ?', (content_id,))
+        conn.executemany(
+            'INSERT INTO content_keywords (content_id, position, keyword) VALUES (?, ?, ?)',
+            [(content_id, position, str(keyword)) for position, keyword in enumerate(keywords)]
+        )
+
+    def _to_dicts(self, conn, rows):
+        """查询结果转换为与TinyDB文档相同的字典，并附带关键词列表和id"""
+        # 与TinyDB一致，未设置的字段不出现在结果中
+        contents = [{key: value for key, value in dict(row).items() if value is not None} for row in rows]
+        keywords = {content['id']: [] for content in contents}
+        ids = list(keywords)
+        for start in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[start:start + _MAX_PARAMS]
+            for row in conn.execute(
+                f"SELECT content_id, keyword FROM content_keywords WHERE content_id IN ({', '.join('?' * len(chunk))}) "
+                "ORDER BY content_id, position",
+                chunk
+            ):
+                keywords[row['content_id']].append(row['keyword'])
+        for content in contents:
+            content['keywords'] = keywords[content['id']]
+        return contents
+
+    def save_content(self, content_data):
+        """保存生成的内容"""
+        content_data['created_at'] = datetime.now().isoformat()
+        conn = self._connect()
+        with self._write_lock, conn:
+            return self._insert(conn, content_data)
+
+    def get_content(self, content_id):
+        """获取单个内容"""
+        try:
+            conn = self._connect()
+            rows = conn.execute('SELECT * FROM contents WHERE id = ?', (int(content_id),)).fetchall()
+            if not rows:
+                return None
+            content = self._to_dicts(conn, rows)[0]
+            content['id'] = content_id
+            return content
+        except Exception as e:
+            raise Exception(f"获取内容失败: {str(e)}")
+
+    def get_contents(self, limit=10, skip=0, sort_by='created_at', order='desc', business_type=None):
+        """获取内容列表，支持排序、按业务类型筛选和分页"""
+        try:
+            if sort_by not in SORTABLE_COLUMNS:
+                raise ValueError(f"不支持的排序字段: {sort_by}")
+            direction = 'DESC' if order.lower() == 'desc' else 'ASC'
+            where, params = ('WHERE business_type = ?', [business_type]) if business_type is not None else ('', [])
+            conn = self._connect()
+            rows = conn.execute(
+                f"SELECT * FROM contents {where} ORDER BY {sort_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+                params + [limit, skip]
+            ).fetchall()
+            total = self.get_contents_count(business_type)
+            return {
+                'items': self._to_dicts(conn, rows),
+                'total': total,
+                'page': skip // limit + 1,
+                'total_pages': (total + limit - 1) // limit
+            }
+        except Exception as e:
+            raise Exception(f"获取内容列表失败: {str(e)}")
+
+    def get_contents_keyset(self, limit=10, after=None, before=None, business_type=None):
+        """按(created_at, id)倒序的游标分页（使用(created_at, id)表达式索引），after/before为(created_at, id)"""
+        try:
+            key = _KEYSET_SORT_KEY
+            filters = ['business_type = ?'] if business_type is not None else []
+            filter_params = [business_type] if business_type is not None else []
+            # 先用排序键的单边范围定位索引，再排除与游标同一时间且id越界的行
+            older = f'{key} <= ? AND ({key} < ? OR id < ?)'
+            newer = f'{key} >= ? AND ({key} > ? OR id > ?)'
+            cursor = before if before is not None else after
+
+            def _where(conditions):
+                return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+            if before is not None:
+                # 从游标向更新的方向取，再翻转为倒序
+                conditions, order = filters + [newer], 'ASC'
+            else:
+                conditions, order = filters + ([older] if after is not None else []), 'DESC'
+            params = filter_params + ([cursor[0], cursor[0], cursor[1]] if cursor is not None else [])
+
+            conn = self._connect()
+            # 多取一条判断该方向上是否还有内容
+            rows = conn.execute(
+                f"SELECT * FROM contents {_where(conditions)} ORDER BY {key} {order}, id {order} LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if before is not None:
+                rows.reverse()
+
+            # 反方向上是否还有内容（相对于游标）
+            has_opposite = False
+            if cursor is not None:
+                opposite = (f'{key} <= ? AND ({key} < ? OR id <= ?)' if before is not None
+                            else f'{key} >= ? AND ({key} > ? OR id >= ?)')
+                has_opposite = conn.execute(
+                    f"SELECT 1 FROM contents {_where(filters + [opposite])} LIMIT 1",
+                    filter_params + [cursor[0], cursor[0], cursor[1]]
+                ).fetchone() is not None
+
+            return {
+                'items': self._to_dicts(conn, rows),
+                'total': self.get_contents_count(business_type),
+                'has_newer': has_more if before is not None else has_opposite,
+                'has_older': has_opposite if before is not None else has_more
+            }
+        except Exception as e:
+            raise Exception(f"获取内容列表失败: {str(e)}")
+
+    def update_content(self, content_id, data):
+        """更新内容"""
+        try:
+            unknown = [key for key in data if key not in CONTENT_COLUMNS and key != 'keywords']
+            if unknown:
+                raise ValueError(f"未知字段: {', '.join(unknown)}")
+            columns = [column for column in CONTENT_COLUMNS if column in data]
+            conn = self._connect()
+            with self._write_lock, conn:
+                if columns:
+                    conn.execute(
+                        f"UPDATE contents SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                        [data[column] for column in columns] + [int(content_id)]
+                    )
+                if 'keywords' in data:
+                    self._replace_keywords(conn, int(content_id), data['keywords'] or [])
+            return True
+        except Exception as e:
+            raise Exception(f"更新内容失败: {str(e)}")
+
+    def delete_content(self, content_id):
+        """删除内容"""
+        try:
+            conn = self._connect()
+            with self._write_lock, conn:
+                conn.execute('DELETE FROM content_keywords WHERE content_id = ?', (int(content_id),))
+                cursor = conn.execute('DELETE FROM contents WHERE id = ?', (int(content_id),))
+                if cursor.rowcount == 0:
+                    raise Exception("内容不存在")
+            return True
+        except Exception as e:
+            raise Exception(f"删除内容失败: {str(e)}")
+
+    def search_contents(self, query_text, search_fields=None):
+        """增强的搜索功能（先用SQL筛选包含查询文本的内容，再按与TinyDB实现相同的规则计分）"""
+        try:
+            if not search_fields:
+                search_fields = DEFAULT_SEARCH_FIELDS
+
+            conditions = []
+            for field in search_fields:
+                if field == 'keywords':
+                    # 与TinyDB实现一样，在按顺序以空格连接的关键词中匹配
+                    conditions.append(
+                        "contains_text((SELECT group_concat(keyword, ' ') FROM ("
+                        "SELECT keyword FROM content_keywords WHERE content_id = contents.id ORDER BY position)), ?)"
+                    )
+                elif field in CONTENT_COLUMNS:
+                    conditions.append(f"contains_text({field}, ?)")
+            if not conditions:
+                return []
+
+            conn = self._connect()
+            rows = conn.execute(
+                f"SELECT * FROM contents WHERE {' OR '.join(conditions)}", [query_text] * len(conditions)
+            ).fetchall()
+            return search_documents(self._to_dicts(conn, rows), query_text, search_fields)
+
+        except Exception as e:
+            raise Exception(f"搜索内容失败: {str(e)}")
+
+    def get_analytics(self, start_date=None, end_date=None):
+        """获取分析数据（使用created_at索引按时间范围查询）"""
+        conditions = ['created_at IS NOT NULL']
+        params = []
+        if start_date:
+            conditions.append('created_at >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append('created_at <= ?')
+            params.append(end_date)
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT * FROM contents WHERE {' AND '.join(conditions)} ORDER BY created_at",
+            params
+        ).fetchall()
+        return self._to_dicts(conn, rows)
+
+    def get_contents_count(self, business_type=None):
+        """获取内容总数"""
+        if business_type is not None:
+            return self._connect().execute(
+                'SELECT COUNT(*) FROM contents WHERE business_type = ?', (business_type,)
+            ).fetchone()[0]
+        return self._connect().execute('SELECT COUNT(*) FROM contents').fetchone()[0]
+
+    def save_batch_contents(self, contents_list):
+        """增强的批量保存功能（单个事务）"""
+        try:
+            # 验证数据格式
+            required_fields = ['title', 'meta_description', 'keywords']
+            for content in contents_list:
+                missing_fields = [field for field in required_fields if field not in content]
+                if missing_fields:
+                    raise ValueError(f"内容缺少必要字段: {', '.join(missing_fields)}")
+
+            # 添加时间戳
+            timestamp = datetime.now().isoformat()
+            for content in contents_list:
+                content['created_at'] = timestamp
+                content['updated_at'] = timestamp
+
+            # 批量插入
+            conn = self._connect()
+            with self._write_lock, conn:
+                inserted_ids = [self._insert(conn, content) for content in contents_list]
+            return {
+                'success': True,
+                'inserted_count': len(inserted_ids),
+                'inserted_ids': inserted_ids
+            }
+
+        except Exception as e:
+            raise Exception(f"批量保存失败: {str(e)}")
+
+    def stats(self):
+        """存储统计"""
+        conn = self._connect()
+        return {
+            'backend': 'sqlite',
+            'path': self.db_path,
+            'journal_mode': conn.execute('PRAGMA journal_mode').fetchone()[0],
+            'contents': self.get_contents_count()
+        }
+
+    def migrate_from_tinydb(self, json_path):
+        """
+        从TinyDB文件导入内容（保留原ID），只导入一次，且只导入到空库
+
+        Returns:
+            int: 导入的内容数量，已导入过或库中已有内容时返回0
+        """
+        conn = self._connect()
+        source = os.path.abspath(json_path)
+        with self._write_lock, conn:
+            # 检查前先取得写锁：多个进程（GUNICORN_PRELOAD=false时的各个worker）同时启动时，
+            # 只有一个进程执行导入，其他进程等待提交后看到已导入的记录
+            conn.execute('BEGIN IMMEDIATE')
+            migrated = conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+            if migrated is not None or conn.execute('SELECT 1 FROM contents LIMIT 1').fetchone():
+                return 0
+            try:
+                with open(json_path, encoding='utf-8') as f:
+                    documents = json.load(f).get('contents', {})
+            except Exception as e:
+                raise Exception(f"读取TinyDB文件失败: {str(e)}")
+            for doc_id, document in sorted(documents.items(), key=lambda item: int(item[0])):
+                self._insert(conn, document, content_id=int(doc_id))
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (json.dumps({'path': source, 'count': len(documents), 'at': datetime.now().isoformat()}),)
+            )
+        return len(documents)
@@ -61,6 +61,38 @@ const BatchOperations = () => {
     }
   };
 
+  const fetchJobResults = async (jobId) => {
+    const results = [];
+    let offset = 0;
+    while (offset !== null) {
+      const response = await axios.get(
+        `http://localhost:5000/api/batch/jobs/${jobId}/results`,
+        { params: { offset, limit: 500 } }
+      );
+      results.push(...response.data.results);
+      offset = response.data.next_offset;
+    }
+    return results;
+  };
+
+  const waitForJob = (jobId) => new Promise((resolve, reject) => {
+    const poll = async () => {
+      try {
+        const response = await axios.get(`http://localhost:5000/api/batch/jobs/${jobId}`);
+        const job = response.data.job;
+        setProgress(Math.round(job.progress.percent));
+        if (['completed', 'failed', 'cancelled'].includes(job.status)) {
+          resolve(job);
+        } else {
+          setTimeout(poll, 2000);
+        }
+      } catch (error) {
+        reject(error);
+      }
+    };
+    poll();
+  });
+
   const startBatchGeneration = async () => {
     if (keywords.length === 0) {
       message.warning('请先添加关键词');
@@ -76,8 +108,13 @@ const BatchOperations = () => {
       });
 
       if (response.data.success) {
-        setGeneratedContents(response.data.results);
-        message.success('批量生成完成！');
+        const job = await waitForJob(response.data.job.job_id);
+        setGeneratedContents(await fetchJobResults(job.job_id));
+        if (job.status === 'completed') {
+          message.success('批量生成完成！');
+        } else {
+          message.error('生成失败：' + (job.error || job.status));
+        }
       } else {
         message.error('生成失败：' + response.data.error);
       }
@@ -121,12 +158,12 @@ const BatchOperations = () => {
   const columns = [
     {
       title: '关键词',
-      dataIndex: 'keywords',
-      key: 'keywords',
+      dataIndex: 'business_type',
+      key: 'business_type',
     },
     {
       title: '标题',
-      dataIndex: ['content', '标题'],
+      dataIndex: ['content', 'title'],
       key: 'title',
     },
     {
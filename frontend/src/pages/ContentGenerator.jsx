@@ -1,28 +1,79 @@
 import React, { useState } from 'react';
-import { Form, Input, Button, Card, Select, message, Spin } from 'antd';
-import axios from 'axios';
+import { Form, Input, Button, Card, Select, message, Spin, Tag } from 'antd';
 
-const { TextArea } = Input;
 const { Option } = Select;
 
+// 解析一段Server-Sent Events文本，返回 [{event, data}]
+const parseEvents = (chunk) => chunk
+  .split('\n\n')
+  .filter(block => block.trim())
+  .map(block => {
+    const lines = block.split('\n');
+    const event = lines.find(line => line.startsWith('event: '));
+    const data = lines.find(line => line.startsWith('data: '));
+    return {
+      event: event ? event.slice(7) : 'message',
+      data: data ? JSON.parse(data.slice(6)) : null
+    };
+  });
+
 const ContentGenerator = () => {
   const [form] = Form.useForm();
   const [loading, setLoading] = useState(false);
   const [generatedContent, setGeneratedContent] = useState(null);
+  const [rawText, setRawText] = useState('');
+  const [validation, setValidation] = useState(null);
+
+  const handleEvent = ({ event, data }) => {
+    if (event === 'token') {
+      setRawText(text => text + data.text);
+    } else if (event === 'field') {
+      // 每个字段生成完毕即显示，不必等待整个结果
+      setGeneratedContent(content => ({ ...content, [data.name]: data.value }));
+    } else if (event === 'result') {
+      setGeneratedContent(data.data);
+    } else if (event === 'validation') {
+      setValidation(data);
+    } else if (event === 'done') {
+      message.success('内容生成成功！');
+    } else if (event === 'error') {
+      message.error('内容生成失败：' + data.error);
+    }
+  };
 
   const handleSubmit = async (values) => {
     setLoading(true);
+    setGeneratedContent({});
+    setRawText('');
+    setValidation(null);
     try {
-      const response = await axios.post('http://localhost:5000/api/generate', {
-        keywords: values.keywords,
-        type: values.contentType
+      const response = await fetch('http://localhost:5000/api/generate/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          business_type: values.businessType,
+          language: values.language
+        })
       });
 
-      if (response.data.success) {
-        setGeneratedContent(response.data.content);
-        message.success('内容生成成功！');
-      } else {
-        message.error('内容生成失败：' + response.data.error);
+      if (!response.ok) {
+        const result = await response.json();
+        message.error('内容生成失败：' + result.error);
+        return;
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        // 只处理已完整接收的事件，剩余部分留到下一次
+        const end = buffer.lastIndexOf('\n\n');
+        if (end === -1) continue;
+        parseEvents(buffer.slice(0, end)).forEach(handleEvent);
+        buffer = buffer.slice(end + 2);
       }
     } catch (error) {
       message.error('请求失败：' + error.message);
@@ -38,23 +89,23 @@ const ContentGenerator = () => {
           form={form}
           layout="vertical"
           onFinish={handleSubmit}
+          initialValues={{ language: 'zh' }}
         >
           <Form.Item
-            name="keywords"
-            label="关键词"
-            rules={[{ required: true, message: '请输入关键词' }]}
+            name="businessType"
+            label="业务类型"
+            rules={[{ required: true, message: '请输入业务类型' }]}
           >
-            <Input placeholder="请输入目标关键词，多个关键词用逗号分隔" />
+            <Input placeholder="例如：智能照明、咖啡店" />
           </Form.Item>
 
           <Form.Item
-            name="contentType"
-            label="内容类型"
-            rules={[{ required: true, message: '请选择内容类型' }]}
+            name="language"
+            label="语言"
           >
-            <Select placeholder="请选择内容类型">
-              <Option value="article">文章</Option>
-              <Option value="product">产品描述</Option>
+            <Select>
+              <Option value="zh">中文</Option>
+              <Option value="en">English</Option>
             </Select>
           </Form.Item>
 
@@ -66,7 +117,7 @@ const ContentGenerator = () => {
         </Form>
       </Card>
 
-      {loading && (
+      {loading && !rawText && (
         <div style={{ textAlign: 'center', margin: '20px 0' }}>
           <Spin tip="正在生成内容..." />
         </div>
@@ -76,15 +127,30 @@ const ContentGenerator = () => {
         <Card title="生成结果" style={{ marginTop: 24 }}>
           <div>
             <h3>标题</h3>
-            <p>{generatedContent.标题}</p>
+            <p>{generatedContent.title || (loading && <Spin size="small" />)}</p>
 
             <h3>Meta描述</h3>
-            <p>{generatedContent.meta描述}</p>
+            <p>{generatedContent.metaDescription || (loading && <Spin size="small" />)}</p>
 
-            <h3>正文</h3>
-            <div style={{ whiteSpace: 'pre-wrap' }}>
-              {generatedContent.正文}
+            <h3>关键词</h3>
+            <div>
+              {generatedContent.keywords
+                ? generatedContent.keywords.map(keyword => <Tag key={keyword}>{keyword}</Tag>)
+                : (loading && <Spin size="small" />)}
             </div>
+
+            {validation && (
+              <>
+                <h3>SEO评分</h3>
+                <p>{validation.seo_score.total_score}</p>
+              </>
+            )}
+
+            {loading && (
+              <div style={{ whiteSpace: 'pre-wrap', color: '#999', marginTop: 16 }}>
+                {rawText}
+              </div>
+            )}
           </div>
         </Card>
       )}
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import { Table, Card, Input, Select, Button, Space, message, Modal } from 'antd';
-import { SearchOutlined, DeleteOutlined, EyeOutlined } from '@ant-design/icons';
+import { Table, Card, Input, Select, Button, Space, Tag, message, Modal } from 'antd';
+import { SearchOutlined, DeleteOutlined, EyeOutlined, LeftOutlined, RightOutlined } from '@ant-design/icons';
 import axios from 'axios';
 
 const { Option } = Select;
@@ -9,34 +9,37 @@ const ContentHistory = () => {
   const [contents, setContents] = useState([]);
   const [loading, setLoading] = useState(false);
   const [searchKeywords, setSearchKeywords] = useState('');
-  const [contentType, setContentType] = useState('');
-  const [pagination, setPagination] = useState({
-    current: 1,
-    pageSize: 10,
-    total: 0
-  });
+  const [businessType, setBusinessType] = useState('');
+  const [pageSize, setPageSize] = useState(20);
+  const [total, setTotal] = useState(0);
+  // 当前页对应的游标（第一页为null），删除后用它刷新当前页
+  const [cursor, setCursor] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [prevCursor, setPrevCursor] = useState(null);
+  const [searching, setSearching] = useState(false);
   const [selectedContent, setSelectedContent] = useState(null);
   const [modalVisible, setModalVisible] = useState(false);
 
-  const fetchContents = async (page = 1, keywords = '', type = '') => {
+  // 按游标分页获取内容列表，翻页耗时不随页数增加
+  const fetchContents = async (pageCursor = null, type = businessType, limit = pageSize) => {
     setLoading(true);
     try {
-      const response = await axios.get('http://localhost:5000/api/content/search', {
-        params: {
-          page,
-          limit: pagination.pageSize,
-          keywords,
-          type
-        }
-      });
+      const params = { limit };
+      if (pageCursor) {
+        params.cursor = pageCursor;
+      }
+      if (type) {
+        params.business_type = type;
+      }
+      const response = await axios.get('http://localhost:5000/api/contents', { params });
 
       if (response.data.success) {
         setContents(response.data.contents);
-        setPagination({
-          ...pagination,
-          current: page,
-          total: response.data.total || 0
-        });
+        setTotal(response.data.total || 0);
+        setCursor(pageCursor);
+        setNextCursor(response.data.next_cursor);
+        setPrevCursor(response.data.prev_cursor);
+        setSearching(false);
       } else {
         message.error('获取内容列表失败：' + response.data.error);
       }
@@ -47,24 +50,56 @@ const ContentHistory = () => {
     }
   };
 
+  const searchContents = async (keywords) => {
+    setLoading(true);
+    try {
+      const response = await axios.get('http://localhost:5000/api/search', {
+        params: { q: keywords, limit: pageSize }
+      });
+
+      if (response.data.success) {
+        setContents(response.data.results);
+        setTotal(response.data.total || 0);
+        setNextCursor(null);
+        setPrevCursor(null);
+        setSearching(true);
+      } else {
+        message.error('搜索失败：' + response.data.error);
+      }
+    } catch (error) {
+      message.error('请求失败：' + error.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
     fetchContents();
   }, []);
 
   const handleSearch = () => {
-    fetchContents(1, searchKeywords, contentType);
+    if (searchKeywords.trim()) {
+      searchContents(searchKeywords.trim());
+    } else {
+      fetchContents(null);
+    }
   };
 
-  const handleTableChange = (pagination) => {
-    fetchContents(pagination.current, searchKeywords, contentType);
+  const handlePageSizeChange = (size) => {
+    setPageSize(size);
+    fetchContents(null, businessType, size);
   };
 
   const handleDelete = async (contentId) => {
     try {
-      const response = await axios.delete(`http://localhost:5000/api/content/${contentId}`);
+      const response = await axios.delete(`http://localhost:5000/api/contents/${contentId}`);
       if (response.data.success) {
         message.success('删除成功');
-        fetchContents(pagination.current, searchKeywords, contentType);
+        if (searching) {
+          setContents(contents.filter((content) => content.id !== contentId));
+        } else {
+          fetchContents(cursor);
+        }
       } else {
         message.error('删除失败：' + response.data.error);
       }
@@ -83,27 +118,27 @@ const ContentHistory = () => {
       title: '标题',
       dataIndex: 'title',
       key: 'title',
-      width: '30%',
+      width: '35%',
     },
     {
       title: '关键词',
       dataIndex: 'keywords',
       key: 'keywords',
-      width: '20%',
+      width: '25%',
+      render: (keywords) => (keywords || []).map((keyword) => <Tag key={keyword}>{keyword}</Tag>)
     },
     {
-      title: '内容类型',
-      dataIndex: 'content_type',
-      key: 'content_type',
-      width: '15%',
-      render: (text) => text === 'article' ? '文章' : '产品描述'
+      title: '业务类型',
+      dataIndex: 'businessType',
+      key: 'businessType',
+      width: '12%',
     },
     {
-      title: 'SEO得分',
-      dataIndex: ['seo_score', 'total_score'],
-      key: 'seo_score',
+      title: '创建时间',
+      dataIndex: 'createdAt',
+      key: 'createdAt',
       width: '15%',
-      render: (score) => `${score}分`
+      render: (text) => text ? text.replace('T', ' ').slice(0, 19) : ''
     },
     {
       title: '操作',
@@ -121,7 +156,7 @@ const ContentHistory = () => {
             type="text"
             danger
             icon={<DeleteOutlined />}
-            onClick={() => handleDelete(record._id)}
+            onClick={() => handleDelete(record.id)}
           >
             删除
           </Button>
@@ -138,18 +173,9 @@ const ContentHistory = () => {
             placeholder="搜索关键词"
             value={searchKeywords}
             onChange={(e) => setSearchKeywords(e.target.value)}
+            onPressEnter={handleSearch}
             style={{ width: 200 }}
           />
-          <Select
-            placeholder="内容类型"
-            value={contentType}
-            onChange={setContentType}
-            style={{ width: 120 }}
-            allowClear
-          >
-            <Option value="article">文章</Option>
-            <Option value="product">产品描述</Option>
-          </Select>
           <Button
             type="primary"
             icon={<SearchOutlined />}
@@ -157,16 +183,46 @@ const ContentHistory = () => {
           >
             搜索
           </Button>
+          <Input
+            placeholder="业务类型"
+            value={businessType}
+            onChange={(e) => setBusinessType(e.target.value)}
+            onPressEnter={() => fetchContents(null)}
+            allowClear
+            style={{ width: 160 }}
+          />
+          <Button onClick={() => fetchContents(null)}>筛选</Button>
         </Space>
 
         <Table
           columns={columns}
           dataSource={contents}
-          rowKey="_id"
-          pagination={pagination}
-          onChange={handleTableChange}
+          rowKey="id"
+          pagination={false}
           loading={loading}
         />
+
+        <Space style={{ marginTop: 16, width: '100%', justifyContent: 'flex-end' }}>
+          <span>共 {total} 条</span>
+          <Button
+            icon={<LeftOutlined />}
+            disabled={!prevCursor || loading}
+            onClick={() => fetchContents(prevCursor)}
+          >
+            上一页
+          </Button>
+          <Button
+            disabled={!nextCursor || loading}
+            onClick={() => fetchContents(nextCursor)}
+          >
+            下一页 <RightOutlined />
+          </Button>
+          <Select value={pageSize} onChange={handlePageSizeChange} style={{ width: 110 }}>
+            {[10, 20, 50, 100].map((size) => (
+              <Option key={size} value={size}>{size} 条/页</Option>
+            ))}
+          </Select>
+        </Space>
       </Card>
 
       <Modal
@@ -182,18 +238,16 @@ const ContentHistory = () => {
             <p>{selectedContent.title}</p>
 
             <h3>Meta描述</h3>
-            <p>{selectedContent.meta_description}</p>
-
-            <h3>正文</h3>
-            <div style={{ whiteSpace: 'pre-wrap' }}>
-              {selectedContent.content}
-            </div>
-
-            <h3>SEO分析</h3>
-            <p>总分：{selectedContent.seo_score.total_score}分</p>
-            <p>标题得分：{selectedContent.seo_score.factors.title}分</p>
-            <p>描述得分：{selectedContent.seo_score.factors.meta_description}分</p>
-            <p>内容质量得分：{selectedContent.seo_score.factors.content_quality}分</p>
+            <p>{selectedContent.metaDescription}</p>
+
+            <h3>关键词</h3>
+            <p>{(selectedContent.keywords || []).join(', ')}</p>
+
+            <h3>业务类型</h3>
+            <p>{selectedContent.businessType}</p>
+
+            <h3>创建时间</h3>
+            <p>{selectedContent.createdAt}</p>
           </div>
         )}
       </Modal>
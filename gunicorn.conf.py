@@ -0,0 +1,49 @@
+import gc
+import os
+
+# 预fork部署配置：python run.py --production 或 gunicorn -c gunicorn.conf.py wsgi:app
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+# 每个worker内多线程处理请求，并发请求才能在worker的微批调度器中合并
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+
+# master进程导入wsgi:app时加载模型，worker fork后共享权重（写时复制）
+# GUNICORN_PRELOAD=false时每个worker各自加载一份模型（用于对比内存占用）
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# master进程只用单线程加载和预热模型：GNU OpenMP的线程池在fork后不可用，
+# 父进程中已创建线程池时，worker中的矩阵运算可能卡死
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+
+def _torch_threads_per_worker():
+    """每个worker的torch计算线程数，默认将可用核心平均分给各worker，避免超额订阅"""
+    if os.getenv('TORCH_THREADS_PER_WORKER'):
+        return int(os.getenv('TORCH_THREADS_PER_WORKER'))
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    return max(1, cores // workers)
+
+
+def on_starting(server):
+    # 只允许单进程写入的存储配置不能用于多个worker
+    from backend.utils.config import Config
+
+    reason = Config().single_process_storage
+    if reason and server.cfg.workers > 1:
+        server.log.error(f"{reason}。当前worker数为{server.cfg.workers}，请设置GUNICORN_WORKERS=1或改用SQLite（DB_PATH=*.sqlite）")
+        raise SystemExit(1)
+
+
+def when_ready(server):
+    # 冻结master中已有的对象，fork后垃圾回收不再改写它们的对象头，减少写时复制的页
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import torch
+
+    torch.set_num_threads(_torch_threads_per_worker())
+    server.log.info(f"worker {worker.pid}: torch线程数 {torch.get_num_threads()}")
@@ -1,5 +1,19 @@
+import logging
+import os
+import sys
 from backend.app import create_app
 
 if __name__ == '__main__':
+    if '--production' in sys.argv[1:]:
+        # 预fork多进程模式（gunicorn），配置见gunicorn.conf.py
+        root = os.path.dirname(os.path.abspath(__file__))
+        os.execvp(sys.executable, [
+            sys.executable, '-m', 'gunicorn',
+            '-c', os.path.join(root, 'gunicorn.conf.py'),
+            '--pythonpath', root,
+            'wsgi:app'
+        ])
+
+    logging.basicConfig(level=logging.INFO)
     app = create_app()
     app.run(debug=True, port=5000)
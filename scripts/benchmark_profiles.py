@@ -0,0 +1,160 @@
+"""
+推理配置档基准测试
+
+每个配置档在独立的子进程中加载模型（线程设置和量化都是进程级的），
+依次为一组业务类型生成SEO内容，报告：
+- 加载耗时和峰值RSS
+- 生成速度（新生成token数/秒）和单条平均耗时
+- 质量：可解析率，以及ContentValidator的SEO总分均值
+- 与基准配置档（第一个）相比的速度倍数和得分差
+
+用法：
+    python scripts/benchmark_profiles.py
+    python scripts/benchmark_profiles.py --profiles cpu-fp32 cpu-int8-dynamic --threads 8 --repeat 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PROFILES = ['cpu-fp32', 'cpu-bf16', 'cpu-int8-dynamic']
+
+BUSINESS_TYPES = [
+    'coffee shop',
+    'online electronics store',
+    'dental clinic',
+    'yoga studio',
+    'used car dealership',
+    'wedding photography',
+    'pet grooming',
+    'accounting firm',
+    'bakery',
+    'home cleaning service',
+]
+
+
+def run_profile(args):
+    """子进程：加载一个配置档并执行生成"""
+    import torch
+    from backend.services.seo_generator import SEOGenerator
+    from backend.services.content_validator import ContentValidator
+    from backend.utils.config import Config
+
+    config = Config()
+    generator = SEOGenerator(
+        model_name=config.MODEL_NAME,
+        model_dir=config.MODEL_DIR or None,
+        use_prefix_cache=config.USE_PREFIX_CACHE,
+        lazy=True,
+        profile=args.child,
+        num_threads=args.threads,
+        num_interop_threads=args.interop_threads,
+        compile_model=args.compile,
+        draft_model_name=config.DRAFT_MODEL_NAME or None,
+        draft_model_dir=config.DRAFT_MODEL_DIR or None
+    )
+    generator.load()
+    validator = ContentValidator()
+
+    torch.manual_seed(args.seed)
+    tokens = 0
+    generation_seconds = 0.0
+    parsed = 0
+    scores = []
+    validation_errors = 0
+    business_types = BUSINESS_TYPES[:args.samples] * args.repeat
+    for business_type in business_types:
+        started_at = time.perf_counter()
+        row = generator.generate_seo_batch(
+            [business_type],
+            batch_size=1,
+            max_new_tokens=args.max_new_tokens,
+            constrained=args.constrained,
+            greedy=args.greedy,
+            return_candidates=True
+        )[0]
+        generation_seconds += time.perf_counter() - started_at
+        tokens += sum(
+            len(generator.tokenizer(c['text'], add_special_tokens=False)['input_ids'])
+            for c in row['candidates']
+        )
+        if row['success']:
+            parsed += 1
+            try:
+                scores.append(validator.validate(row['data'])['seo_score']['total_score'])
+            except Exception:
+                validation_errors += 1
+
+    status = generator.status()
+    return {
+        'profile': args.child,
+        'load_seconds': status['load_time_seconds'],
+        'peak_rss_mb': status['peak_rss_mb'],
+        'torch_threads': status['torch_threads'],
+        'requests': len(business_types),
+        'tokens': tokens,
+        'tokens_per_second': round(tokens / generation_seconds, 2) if generation_seconds else 0,
+        'avg_latency_seconds': round(generation_seconds / len(business_types), 3),
+        'parse_rate': round(parsed / len(business_types), 3),
+        'avg_seo_score': round(sum(scores) / len(scores), 2) if scores else None,
+        'validation_errors': validation_errors,
+        'draft': status['draft']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比各推理配置档的速度和生成质量')
+    parser.add_argument('--profiles', nargs='+', default=DEFAULT_PROFILES, help='配置档，第一个作为对比基准')
+    parser.add_argument('--samples', type=int, default=len(BUSINESS_TYPES), help='业务类型数量')
+    parser.add_argument('--repeat', type=int, default=1, help='每个业务类型的生成次数')
+    parser.add_argument('--max-new-tokens', type=int, default=256)
+    parser.add_argument('--constrained', action='store_true', help='使用结构约束解码')
+    parser.add_argument('--greedy', action='store_true', help='使用贪心解码（配置了草稿模型时使用辅助解码）')
+    parser.add_argument('--threads', type=int, help='torch计算线程数')
+    parser.add_argument('--interop-threads', type=int, help='torch inter-op线程数')
+    parser.add_argument('--compile', action='store_true', help='使用torch.compile')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args)))
+        return
+
+    child_args = sys.argv[1:]
+    results = []
+    for profile in args.profiles:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *child_args, '--child', profile],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = results[0]
+    print(f"{'profile':<18}{'load(s)':>9}{'RSS(MB)':>9}{'tok/s':>9}{'speedup':>9}"
+          f"{'latency(s)':>12}{'parsed':>8}{'SEO score':>11}{'delta':>8}{'val.err':>9}")
+    for result in results:
+        speedup = result['tokens_per_second'] / baseline['tokens_per_second'] if baseline['tokens_per_second'] else 0
+        if result['avg_seo_score'] is not None and baseline['avg_seo_score'] is not None:
+            delta = f"{result['avg_seo_score'] - baseline['avg_seo_score']:+.2f}"
+        else:
+            delta = '-'
+        score = result['avg_seo_score'] if result['avg_seo_score'] is not None else '-'
+        print(f"{result['profile']:<18}{result['load_seconds']:>9}{result['peak_rss_mb']:>9}"
+              f"{result['tokens_per_second']:>9}{speedup:>8.2f}x{result['avg_latency_seconds']:>12}"
+              f"{result['parse_rate']:>8}{score:>11}{delta:>8}{result['validation_errors']:>9}")
+        if result['draft']:
+            print(f"{'':<18}草稿模型 {result['draft']['model']}: 接受率 {result['draft']['acceptance_rate']}，"
+                  f"每次主模型前向生成 {result['draft']['tokens_per_main_forward']} 个token")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+测量服务进程及其子进程的内存占用
+
+读取/proc/<pid>/smaps_rollup（Linux），对每个进程报告：
+- RSS：常驻内存，共享页在每个进程中都会计入
+- PSS：按共享进程数分摊后的内存，所有进程的PSS之和即实际占用的物理内存
+- Shared/Private：共享页与私有页（私有页包括写时复制后产生的副本）
+
+用法：
+    python scripts/measure_rss.py <pid>          # 进程及其所有子进程（如gunicorn master）
+    python scripts/measure_rss.py <pid> <pid>... # 多个独立进程
+"""
+import os
+import sys
+
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_rollup(pid):
+    """读取smaps_rollup中的内存字段（kB）"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def children(pid):
+    """递归获取子进程"""
+    result = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                for child in f.read().split():
+                    result.append(int(child))
+                    result.extend(children(int(child)))
+        except OSError:
+            continue
+    return result
+
+
+def command(pid):
+    with open(f'/proc/{pid}/cmdline', 'rb') as f:
+        return f.read().replace(b'\0', b' ').decode(errors='replace').strip()[:60]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    pids = []
+    for arg in sys.argv[1:]:
+        pid = int(arg)
+        pids.append(pid)
+        if len(sys.argv) == 2:
+            pids.extend(children(pid))
+
+    mb = lambda kb: kb / 1024
+    print(f"{'pid':>8}{'RSS(MB)':>10}{'PSS(MB)':>10}{'Shared(MB)':>12}{'Private(MB)':>13}  command")
+    total_rss = total_pss = 0
+    for pid in pids:
+        values = read_rollup(pid)
+        shared = values['Shared_Clean'] + values['Shared_Dirty']
+        private = values['Private_Clean'] + values['Private_Dirty']
+        total_rss += values['Rss']
+        total_pss += values['Pss']
+        print(f"{pid:>8}{mb(values['Rss']):>10.1f}{mb(values['Pss']):>10.1f}{mb(shared):>12.1f}{mb(private):>13.1f}  {command(pid)}")
+    print(f"{'total':>8}{mb(total_rss):>10.1f}{mb(total_pss):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+测量各服务角色的启动耗时和内存占用
+
+每个角色组合在独立的子进程中执行 `from backend.app import create_app; create_app(roles=...)`，
+报告导入+初始化耗时、进程峰值RSS，以及是否加载了torch/transformers/textrazor/jieba。
+
+用法：
+    python scripts/measure_startup.py
+    python scripts/measure_startup.py --roles crud analytics --roles generation --repeat 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('torch', 'transformers', 'textrazor', 'jieba')
+
+DEFAULT_ROLE_SETS = [
+    ['crud'],
+    ['analytics'],
+    ['crud', 'analytics'],
+    ['generation'],
+    ['crud', 'analytics', 'generation'],
+]
+
+CHILD_CODE = '''
+import json, resource, sys, time
+started_at = time.perf_counter()
+from backend.app import create_app
+app = create_app(roles=json.loads(sys.argv[1]))
+elapsed = time.perf_counter() - started_at
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    peak_kb //= 1024
+print(json.dumps({
+    'startup_seconds': round(elapsed, 3),
+    'create_app_seconds': app.config['STARTUP_SECONDS'],
+    'peak_rss_mb': round(peak_kb / 1024, 1),
+    'heavy_modules': [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+}))
+'''
+
+
+def measure(roles):
+    """在新进程中启动一次应用并返回测量结果"""
+    env = dict(os.environ, MODEL_PRELOAD='false')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD_CODE, json.dumps(roles), json.dumps(HEAVY_MODULES)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量各服务角色的启动耗时')
+    parser.add_argument('--roles', nargs='+', action='append', help='角色组合，可重复指定')
+    parser.add_argument('--repeat', type=int, default=3, help='每个组合的测量次数，取最小值')
+    args = parser.parse_args()
+
+    print(f"{'roles':<32}{'startup(s)':>12}{'peak RSS(MB)':>14}  heavy modules")
+    for roles in args.roles or DEFAULT_ROLE_SETS:
+        runs = [measure(roles) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r['startup_seconds'])
+        print(f"{','.join(roles):<32}{best['startup_seconds']:>12.3f}{best['peak_rss_mb']:>14.1f}  "
+              f"{', '.join(best['heavy_modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
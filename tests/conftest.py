@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 从仓库根目录导入backend包（直接运行pytest时根目录不在sys.path中）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# backend.models.content导入时会按DB_PATH打开全局数据库，测试中使用临时目录，不改动data/
+os.environ.setdefault('DB_PATH', os.path.join(tempfile.mkdtemp(prefix='seo-tests-'), 'db.json'))
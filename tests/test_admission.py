@@ -0,0 +1,194 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from backend.api.generation_routes import _rejected_response
+from backend.services import admission
+from backend.services.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+)
+from backend.services.cancellation import CANCEL_DEADLINE, CANCEL_REQUESTED, CancelToken
+from backend.services.generation_errors import GenerationCancelledError
+
+
+class _FakeClock:
+    """每次读取时间后前进step秒：立即准入的请求排队时间和服务时间都等于step"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.step = 0.0
+
+    def monotonic(self):
+        now = self.now
+        self.now += self.step
+        return now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(admission, 'time', clock)
+    return clock
+
+
+def _controller(interactive=(1, 4), batch=(1, 4)):
+    return AdmissionController(
+        [(PRIORITY_INTERACTIVE,) + interactive, (PRIORITY_BATCH,) + batch],
+        poll_interval=0.01
+    )
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 10
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def _acquire_in_thread(controller, priority, cancel_token=None):
+    """在后台线程中申请准入，返回(线程, 结果字典)"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['ticket'] = controller.acquire(priority, cancel_token)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_batch_uses_idle_capacity(clock):
+    controller = _controller()
+    interactive = controller.acquire(PRIORITY_INTERACTIVE)
+    # 交互式请求没有排队时，批量任务可以使用剩余的并发
+    batch = controller.acquire(PRIORITY_BATCH)
+    stats = controller.stats()
+    assert stats[PRIORITY_INTERACTIVE]['running'] == 1
+    assert stats[PRIORITY_BATCH]['running'] == 1
+    interactive.release()
+    batch.release()
+    batch.release()
+    assert controller.stats()[PRIORITY_BATCH]['running'] == 0
+
+
+def test_batch_is_blocked_while_interactive_is_queued():
+    controller = _controller()
+    running = controller.acquire(PRIORITY_INTERACTIVE)
+    interactive_thread, interactive = _acquire_in_thread(controller, PRIORITY_INTERACTIVE)
+    _wait_for(lambda: controller.stats()[PRIORITY_INTERACTIVE]['queue_depth'] == 1)
+
+    batch_thread, batch = _acquire_in_thread(controller, PRIORITY_BATCH)
+    _wait_for(lambda: controller.stats()[PRIORITY_BATCH]['queue_depth'] == 1)
+    # 批量类别本身有空闲并发，但交互式请求排队时不准入
+    time.sleep(0.05)
+    assert 'ticket' not in batch
+    assert controller.stats()[PRIORITY_BATCH]['running'] == 0
+
+    running.release()
+    interactive_thread.join(5)
+    batch_thread.join(5)
+    assert 'ticket' in interactive and 'ticket' in batch
+    stats = controller.stats()
+    assert stats[PRIORITY_INTERACTIVE]['running'] == 1
+    assert stats[PRIORITY_BATCH]['running'] == 1
+    assert stats[PRIORITY_BATCH]['queue_depth'] == 0
+
+
+def test_full_queue_is_rejected_with_retry_after(clock):
+    controller = _controller(interactive=(1, 1))
+    # 两个已完成的请求，平均服务时间4秒
+    clock.step = 4.0
+    for _ in range(2):
+        controller.acquire(PRIORITY_INTERACTIVE).release()
+    clock.step = 0.0
+
+    running = controller.acquire(PRIORITY_INTERACTIVE)
+    waiter_thread, waiter = _acquire_in_thread(controller, PRIORITY_INTERACTIVE)
+    _wait_for(lambda: controller.stats()[PRIORITY_INTERACTIVE]['queue_depth'] == 1)
+
+    with pytest.raises(AdmissionRejectedError) as excinfo:
+        controller.acquire(PRIORITY_INTERACTIVE)
+    error = excinfo.value
+    assert error.priority == PRIORITY_INTERACTIVE
+    assert error.queue_depth == 1
+    # 排在1个等待请求之后：4秒 * (1 + 1) / 并发1
+    assert error.retry_after == 8
+    assert controller.stats()[PRIORITY_INTERACTIVE]['rejected'] == 1
+
+    with Flask(__name__).test_request_context():
+        response = _rejected_response(error)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '8'
+    assert response.headers['X-Queue-Depth'] == '1'
+    assert response.get_json()['priority'] == PRIORITY_INTERACTIVE
+
+    running.release()
+    waiter_thread.join(5)
+    assert 'ticket' in waiter
+
+
+def test_deadline_expires_while_queued():
+    controller = _controller()
+    running = controller.acquire(PRIORITY_INTERACTIVE)
+
+    token = CancelToken(timeout_ms=50)
+    with pytest.raises(GenerationCancelledError) as excinfo:
+        controller.acquire(PRIORITY_INTERACTIVE, token)
+    assert excinfo.value.reason == CANCEL_DEADLINE
+
+    stats = controller.stats()[PRIORITY_INTERACTIVE]
+    assert stats['cancelled'] == 1
+    assert stats['queue_depth'] == 0
+    running.release()
+
+
+def test_cancel_while_queued_lets_next_request_in():
+    controller = _controller()
+    running = controller.acquire(PRIORITY_INTERACTIVE)
+
+    token = CancelToken()
+    cancelled_thread, cancelled = _acquire_in_thread(controller, PRIORITY_INTERACTIVE, token)
+    _wait_for(lambda: controller.stats()[PRIORITY_INTERACTIVE]['queue_depth'] == 1)
+    next_thread, following = _acquire_in_thread(controller, PRIORITY_INTERACTIVE)
+    _wait_for(lambda: controller.stats()[PRIORITY_INTERACTIVE]['queue_depth'] == 2)
+
+    token.cancel()
+    cancelled_thread.join(5)
+    assert isinstance(cancelled['error'], GenerationCancelledError)
+    assert cancelled['error'].reason == CANCEL_REQUESTED
+
+    # 取消的请求离开队首后，后面的请求在并发释放时准入
+    running.release()
+    next_thread.join(5)
+    assert 'ticket' in following
+    assert controller.stats()[PRIORITY_INTERACTIVE]['queue_depth'] == 0
+
+
+def test_wait_percentiles(clock):
+    controller = _controller()
+    for wait_ms in range(1, 101):
+        clock.step = wait_ms / 1000.0
+        controller.acquire(PRIORITY_INTERACTIVE).release()
+
+    stats = controller.stats()[PRIORITY_INTERACTIVE]
+    assert stats['admitted'] == 100
+    assert stats['p50_wait_ms'] == 50
+    assert stats['p95_wait_ms'] == 95
+    assert stats['p99_wait_ms'] == 99
+    assert stats['max_wait_ms'] == 100
+    assert stats['avg_wait_ms'] == 50.5
+    assert stats['avg_service_ms'] == 50.5
+    assert controller.stats()[PRIORITY_BATCH]['p99_wait_ms'] == 0
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        _controller().acquire('realtime')
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+from backend.services.batch_job_service import BatchJobService
+from backend.utils.batch_job_store import BatchJobStore
+
+TIMEOUT = 10
+
+
+class _FakeService(BatchJobService):
+    """不加载模型：块的处理结果由测试控制"""
+
+    def __init__(self, job_store, **kwargs):
+        super().__init__(None, None, job_store=job_store, **kwargs)
+        self.release = threading.Event()
+        self.release.set()
+        self.processed_chunks = []
+
+    def _process_chunk(self, chunk, language=None):
+        assert self.release.wait(TIMEOUT)
+        self.processed_chunks.append(list(chunk))
+        return [{
+            'business_type': business_type,
+            'success': not business_type.startswith('bad'),
+            'content': {'title': business_type} if not business_type.startswith('bad') else None,
+            'error': None if not business_type.startswith('bad') else '生成失败'
+        } for business_type in chunk]
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / 'batch_jobs.sqlite3')
+
+
+def _wait_finished(service, job_id):
+    service._get_executor().shutdown(wait=True)
+    service._executor = None
+    return service.get_job(job_id)
+
+
+def test_job_state_and_results_are_visible_from_another_worker(store_path):
+    # 两个服务实例使用同一个文件，相当于gunicorn的两个worker
+    submitter = _FakeService(BatchJobStore(store_path), chunk_size=2)
+    other = BatchJobService(None, None, job_store=BatchJobStore(store_path))
+
+    business_types = ['a', 'bad1', 'c', 'd', 'e']
+    job = submitter.submit(business_types, language='zh')
+    assert other.get_job(job['job_id'])['progress']['total'] == 5
+
+    finished = _wait_finished(submitter, job['job_id'])
+    assert finished['status'] == 'completed'
+    assert other.get_job(job['job_id']) == finished
+    assert finished['progress'] == {'total': 5, 'processed': 5, 'succeeded': 4, 'failed': 1, 'percent': 100.0}
+    assert finished['language'] == 'zh'
+
+    page = other.get_results(job['job_id'], 0, 3)
+    assert [result['business_type'] for result in page['results']] == ['a', 'bad1', 'c']
+    assert page['results'][1]['error'] == '生成失败'
+    assert page['next_offset'] == 3
+    page = other.get_results(job['job_id'], 3, 3)
+    assert [result['business_type'] for result in page['results']] == ['d', 'e']
+    assert page['next_offset'] is None
+
+
+def test_cancel_from_another_worker_skips_remaining_chunks(store_path):
+    submitter = _FakeService(BatchJobStore(store_path), chunk_size=1)
+    other = BatchJobService(None, None, job_store=BatchJobStore(store_path))
+    submitter.release.clear()
+
+    job = submitter.submit(['a', 'b', 'c'])
+    assert other.cancel(job['job_id'])['status'] in ('queued', 'running')
+    submitter.release.set()
+
+    finished = _wait_finished(submitter, job['job_id'])
+    assert finished['status'] == 'cancelled'
+    # 取消前已开始的块照常完成，其余块被跳过
+    assert len(submitter.processed_chunks) <= 1
+    results = other.get_results(job['job_id'])['results']
+    assert [result['business_type'] for result in results] == ['a', 'b', 'c']
+    assert sum(result['error'] == '任务已取消' for result in results) >= 2
+
+
+def test_all_failed_job_is_marked_failed(store_path):
+    service = _FakeService(BatchJobStore(store_path))
+    job = service.submit(['bad1', 'bad2'])
+    finished = _wait_finished(service, job['job_id'])
+    assert finished['status'] == 'failed'
+    assert finished['error'] == '所有内容生成失败'
+
+
+def test_empty_job_completes_immediately(store_path):
+    service = _FakeService(BatchJobStore(store_path))
+    job = service.submit([])
+    assert job['status'] == 'completed'
+    assert job['progress']['percent'] == 100
+    assert service.get_results(job['job_id']) == {'status': 'completed', 'results': [], 'next_offset': None}
+
+
+def test_unknown_job_returns_none(store_path):
+    service = BatchJobService(None, None, job_store=BatchJobStore(store_path))
+    assert service.get_job('missing') is None
+    assert service.get_results('missing') is None
+    assert service.cancel('missing') is None
+
+
+def test_only_recent_finished_jobs_are_kept(store_path):
+    service = _FakeService(BatchJobStore(store_path), max_finished_jobs=2)
+    job_ids = []
+    for index in range(5):
+        job_ids.append(service.submit([f'item{index}'])['job_id'])
+        _wait_finished(service, job_ids[-1])
+
+    # 提交第5个任务时，之前已结束的4个任务只保留最近的2个
+    assert [service.get_job(job_id) is not None for job_id in job_ids] == [False, False, True, True, True]
+    assert service.get_results(job_ids[0]) is None
+
+
+@pytest.mark.parametrize('offset, limit', [(-1, 10), (0, 0), (0, -5)])
+def test_invalid_result_window_is_rejected(store_path, offset, limit):
+    service = _FakeService(BatchJobStore(store_path))
+    job = service.submit(['a'])
+    _wait_finished(service, job['job_id'])
+    with pytest.raises(ValueError):
+        service.get_results(job['job_id'], offset, limit)
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+import pytest
+
+from backend.services.batch_scheduler import MicroBatchScheduler, SchedulerQueueFullError
+from backend.services.cancellation import CANCEL_DEADLINE, CancelToken
+from backend.services.generation_errors import GenerationCancelledError, GenerationFailedError
+
+
+class _FakeGenerator:
+    """记录每次generate_seo_batch调用的假生成器，hold()之后的调用阻塞到release()"""
+
+    def __init__(self):
+        self.calls = []
+        self.entered = threading.Event()
+        self._gate = threading.Event()
+        self._gate.set()
+
+    def hold(self):
+        self.entered.clear()
+        self._gate.clear()
+
+    def release(self):
+        self._gate.set()
+
+    def generate_seo_batch(self, business_types, batch_size=None, **options):
+        self.calls.append((list(business_types), batch_size, options))
+        self.entered.set()
+        self._gate.wait(5)
+        return [
+            {
+                'business_type': business_type,
+                'success': not business_type.startswith('bad'),
+                'data': {'title': business_type},
+                'error': None if not business_type.startswith('bad') else 'invalid json'
+            }
+            for business_type in business_types
+        ]
+
+
+@pytest.fixture
+def generator():
+    generator = _FakeGenerator()
+    yield generator
+    generator.release()
+
+
+def _busy(scheduler, generator):
+    """让调度线程阻塞在一次生成调用中，之后提交的请求都留在队列里"""
+    generator.hold()
+    future = scheduler.submit('warmup')
+    assert generator.entered.wait(5)
+    return future
+
+
+def test_requests_are_grouped_by_options(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=10, max_batch_size=8)
+    warmup = _busy(scheduler, generator)
+
+    futures = [
+        scheduler.submit('a1', language='zh'),
+        scheduler.submit('b1', language='en'),
+        scheduler.submit('a2', language='zh'),
+        scheduler.submit('a3', language='zh', temperature=0.5),
+        scheduler.submit('a4', language='zh'),
+    ]
+    generator.release()
+    assert [future.result(5)['data']['title'] for future in futures] == ['a1', 'b1', 'a2', 'a3', 'a4']
+    warmup.result(5)
+
+    # 参数相同的请求合并成一批（与到达顺序交错无关），参数不同的请求各自成批
+    assert [(types, options) for types, _, options in generator.calls[1:]] == [
+        (['a1', 'a2', 'a4'], {'language': 'zh'}),
+        (['b1'], {'language': 'en'}),
+        (['a3'], {'language': 'zh', 'temperature': 0.5}),
+    ]
+    assert [batch_size for _, batch_size, _ in generator.calls] == [1, 3, 1, 1]
+
+
+def test_full_batch_is_flushed_before_max_wait(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=10000, max_batch_size=3)
+    started = time.monotonic()
+    futures = [scheduler.submit(f'type{index}') for index in range(4)]
+
+    # 凑满max_batch_size后立即执行，不等待max_wait_ms
+    for future in futures[:3]:
+        future.result(5)
+    assert time.monotonic() - started < 5
+    assert generator.calls[0][0] == ['type0', 'type1', 'type2']
+    assert not futures[3].done()
+    assert scheduler.stats()['queue_depth'] == 1
+
+
+def test_partial_batch_is_flushed_after_max_wait(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=100, max_batch_size=8)
+    started = time.monotonic()
+    row = scheduler.submit('shop').result(5)
+
+    assert row['data'] == {'title': 'shop'}
+    assert time.monotonic() - started >= 0.1
+    stats = scheduler.stats()
+    assert stats['batches'] == 1
+    assert stats['last_batch_size'] == 1
+    assert stats['max_queue_wait_ms'] >= 100
+
+
+def test_full_queue_rejects_new_requests(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=0, max_batch_size=8, max_queue_size=2)
+    _busy(scheduler, generator)
+    queued = [scheduler.submit('a'), scheduler.submit('b')]
+
+    # 路由把SchedulerQueueFullError映射为503
+    with pytest.raises(SchedulerQueueFullError):
+        scheduler.submit('c')
+    assert scheduler.stats()['queue_depth'] == 2
+
+    generator.release()
+    for future in queued:
+        future.result(5)
+    # 队列排空后重新接受请求
+    assert scheduler.submit('c').result(5)['data'] == {'title': 'c'}
+
+
+def test_cancelled_requests_are_dropped_at_dequeue(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=0, max_batch_size=8)
+    _busy(scheduler, generator)
+
+    expired = CancelToken(timeout_ms=1)
+    live = CancelToken(timeout_ms=60000)
+    expired_future = scheduler.submit('expired', cancel_token=expired)
+    live_future = scheduler.submit('live', cancel_token=live)
+    time.sleep(0.01)
+    generator.release()
+
+    with pytest.raises(GenerationCancelledError):
+        expired_future.result(5)
+    assert expired.reason == CANCEL_DEADLINE
+    assert live_future.result(5)['data'] == {'title': 'live'}
+
+    # 已取消的请求不会传给生成器，同批其余请求的取消标记按顺序传入
+    types, batch_size, options = generator.calls[-1]
+    assert (types, batch_size) == (['live'], 1)
+    assert options['cancel_tokens'] == [live]
+    assert scheduler.stats()['cancelled_in_queue'] == 1
+
+
+def test_generate_seo_raises_for_failed_rows_and_generator_errors(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=0)
+    assert scheduler.generate_seo('shop') == {'title': 'shop'}
+    with pytest.raises(GenerationFailedError):
+        scheduler.generate_seo('bad-shop')
+
+    def _fail(business_types, batch_size=None, **options):
+        raise RuntimeError('CUDA out of memory')
+
+    generator.generate_seo_batch = _fail
+    with pytest.raises(RuntimeError):
+        scheduler.generate_seo('shop')
+
+
+def test_thread_is_restarted_after_fork(generator):
+    scheduler = MicroBatchScheduler(generator, max_wait_ms=0)
+    scheduler.submit('parent').result(5)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # 子进程：调度线程没有随fork复制，提交请求时必须重新启动
+        status = 1
+        try:
+            os.close(read_fd)
+            row = scheduler.submit('child').result(5)
+            os.write(write_fd, row['data']['title'].encode())
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    try:
+        output = os.read(read_fd, 64)
+    finally:
+        os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert output == b'child'
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from backend.utils.content_index import ContentIndex
+
+
+def _documents(count=300, seed=7):
+    """随机文档：created_at大量重复，部分没有created_at"""
+    rng = random.Random(seed)
+    documents = {}
+    for content_id in range(1, count + 1):
+        document = {'business_type': rng.choice(['shop', 'cafe', 'gym'])}
+        if rng.random() > 0.1:
+            document['created_at'] = f'2024-01-{rng.randint(1, 9):02d}T00:00:00'
+        documents[content_id] = document
+    return documents
+
+
+def _sorted_ids(documents, business_type=None, desc=True):
+    keys = sorted(
+        (str(document.get('created_at') or ''), content_id)
+        for content_id, document in documents.items()
+        if business_type is None or document['business_type'] == business_type
+    )
+    if desc:
+        keys.reverse()
+    return [content_id for _, content_id in keys]
+
+
+def _key(documents, content_id):
+    return str(documents[content_id].get('created_at') or ''), content_id
+
+
+@pytest.fixture
+def documents():
+    return _documents()
+
+
+@pytest.fixture
+def index(documents):
+    index = ContentIndex()
+    index.rebuild(documents.items())
+    return index
+
+
+@pytest.mark.parametrize('business_type', [None, 'shop', 'cafe', 'missing'])
+def test_count_and_page_match_sorted_documents(index, documents, business_type):
+    expected = _sorted_ids(documents, business_type)
+    assert index.count(business_type) == len(expected)
+    for skip, limit in ((0, 10), (5, 7), (len(expected) - 3, 10), (len(expected) + 5, 10)):
+        assert index.page(skip, limit, business_type=business_type) == expected[skip:skip + limit]
+    ascending = _sorted_ids(documents, business_type, desc=False)
+    assert index.page(3, 20, desc=False, business_type=business_type) == ascending[3:23]
+
+
+@pytest.mark.parametrize('business_type', [None, 'gym'])
+@pytest.mark.parametrize('limit', [1, 7, 50, 1000])
+def test_keyset_walks_forward_and_backward(index, documents, business_type, limit):
+    expected = _sorted_ids(documents, business_type)
+
+    first, has_newer, has_older = index.keyset(limit, business_type=business_type)
+    assert first == expected[:limit]
+    assert not has_newer
+    assert has_older == (len(expected) > limit)
+
+    # 向后（更旧）翻页到最后一页
+    pages = [first]
+    while has_older:
+        ids, has_newer, has_older = index.keyset(limit, after=_key(documents, pages[-1][-1]), business_type=business_type)
+        assert has_newer
+        pages.append(ids)
+    assert [content_id for page in pages for content_id in page] == expected
+
+    # 从最后一页向前（更新）翻回第一页，每一页都与向后翻页时相同
+    for position in range(len(pages) - 1, 0, -1):
+        ids, has_newer, has_older = index.keyset(limit, before=_key(documents, pages[position][0]), business_type=business_type)
+        assert ids == pages[position - 1]
+        assert has_older
+        assert has_newer == (position - 1 > 0)
+
+
+def test_keyset_is_stable_across_inserts(index, documents):
+    first, _, _ = index.keyset(10)
+    second, _, _ = index.keyset(10, after=_key(documents, first[-1]))
+    # 在第一页之前插入新内容，第二页的位置不变
+    index.add(1000, {'created_at': '2030-01-01T00:00:00', 'business_type': 'shop'})
+    assert index.keyset(10, after=_key(documents, first[-1]))[0] == second
+    assert index.keyset(1)[0] == [1000]
+
+
+def test_range_is_inclusive_and_skips_missing_created_at(index, documents):
+    dated = {content_id: document for content_id, document in documents.items() if document.get('created_at')}
+    ascending = _sorted_ids(dated, desc=False)
+
+    assert index.range() == ascending
+    expected = [
+        content_id for content_id in ascending
+        if '2024-01-03T00:00:00' <= dated[content_id]['created_at'] <= '2024-01-05T00:00:00'
+    ]
+    assert index.range('2024-01-03T00:00:00', '2024-01-05T00:00:00') == expected
+    assert index.range(start_date='2024-01-09T00:00:00') == [
+        content_id for content_id in ascending if dated[content_id]['created_at'] >= '2024-01-09T00:00:00'
+    ]
+    assert index.range(end_date='2024-01-01T00:00:00') == [
+        content_id for content_id in ascending if dated[content_id]['created_at'] <= '2024-01-01T00:00:00'
+    ]
+    assert index.range('2025-01-01', '2025-12-31') == []
+
+
+def test_add_update_remove_keep_the_index_consistent(index, documents):
+    index.add(500, {'created_at': '2024-01-05T00:00:00', 'business_type': 'new'})
+    documents[500] = {'created_at': '2024-01-05T00:00:00', 'business_type': 'new'}
+
+    index.update(500, {'business_type': 'shop'})
+    documents[500] = dict(documents[500], business_type='shop')
+    index.update(1, {'created_at': '2023-12-31T00:00:00'})
+    documents[1] = dict(documents[1], created_at='2023-12-31T00:00:00')
+    index.update(2, {'title': 'only a title'})
+    index.update(12345, {'business_type': 'ignored'})
+
+    for content_id in (3, 4, 500):
+        index.remove(content_id)
+        del documents[content_id]
+    index.remove(3)
+
+    assert len(index) == len(documents)
+    assert 3 not in index and 1 in index
+    assert index.count('new') == 0
+    for business_type in (None, 'shop', 'cafe', 'gym'):
+        assert index.page(0, 1000, business_type=business_type) == _sorted_ids(documents, business_type)
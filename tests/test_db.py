@@ -0,0 +1,81 @@
+import pytest
+
+from backend.utils.db import Database
+
+
+def _content(title, business_type='shop'):
+    return {'title': title, 'meta_description': 'desc', 'keywords': ['k'], 'business_type': business_type}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'db.json')
+
+
+@pytest.fixture
+def database(db_path):
+    database = Database(db_path)
+    for index in range(30):
+        database.save_content(_content(f't{index}'))
+    return database
+
+
+def _count_reads(database, monkeypatch):
+    storage = database.db.storage
+    reads = []
+    original = storage.read
+
+    def counting_read():
+        reads.append(1)
+        return original()
+
+    monkeypatch.setattr(storage, 'read', counting_read)
+    return reads
+
+
+def _titles(page):
+    return [content['title'] for content in page['items']]
+
+
+def test_pages_reuse_parsed_documents(database, monkeypatch):
+    reads = _count_reads(database, monkeypatch)
+    first = _titles(database.get_contents(10))
+    assert _titles(database.get_contents(10, skip=10)) == [f't{index}' for index in range(19, 9, -1)]
+    database.get_contents_keyset(10)
+    database.get_analytics()
+    # 文件未变化时只解析一次
+    assert len(reads) == 1
+    assert first == [f't{index}' for index in range(29, 19, -1)]
+
+
+def test_own_writes_are_visible(database, monkeypatch):
+    reads = _count_reads(database, monkeypatch)
+    database.get_contents(10)
+    content_id = database.save_content(_content('new'))
+    database.update_content(content_id - 1, {'title': 'updated'})
+
+    assert _titles(database.get_contents(2)) == ['new', 'updated']
+    assert len(reads) > 1
+
+
+def test_writes_from_another_process_are_visible(database, db_path):
+    assert database.get_contents_count() == 30
+    database.get_contents(10)
+
+    # 另一个进程（这里用另一个实例模拟）写入同一个文件
+    other = Database(db_path)
+    other.save_content(_content('other'))
+    other.update_content(30, {'title': 'changed'})
+
+    assert _titles(database.get_contents(2)) == ['other', 'changed']
+    assert database.get_contents_count() == 31
+
+
+def test_returned_documents_are_copies(database):
+    page = database.get_contents(1)
+    page['items'][0]['title'] = 'mutated'
+    page['items'][0]['keywords'].append('mutated')
+
+    content = database.get_contents(1)['items'][0]
+    assert content['title'] == 't29'
+    assert content['keywords'] == ['k']
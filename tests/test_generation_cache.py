@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from backend.services import generation_cache as generation_cache_module
+from backend.services.generation_cache import GenerationCache
+
+
+class _FakeClock:
+    """替代time模块：time()只在测试调用advance时前进"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(generation_cache_module, 'time', clock)
+    return clock
+
+
+def _content(title):
+    return {'title': title, 'metaDescription': 'desc', 'keywords': ['k']}
+
+
+def test_key_normalizes_business_type():
+    cache = GenerationCache()
+    key = cache.make_key('coffee shop', 'en', {'greedy': True, 'max_new_tokens': 128})
+    assert cache.make_key('  Coffee \t  SHOP\n', 'en', {'max_new_tokens': 128, 'greedy': True}) == key
+    assert cache.make_key('coffee shop', 'zh', {'greedy': True, 'max_new_tokens': 128}) != key
+    assert cache.make_key('coffee shop', 'en', {'greedy': False, 'max_new_tokens': 128}) != key
+    assert cache.make_key('coffee-shop', 'en', {'greedy': True, 'max_new_tokens': 128}) != key
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = GenerationCache(max_size=2)
+    cache.set('a', _content('a'))
+    cache.set('b', _content('b'))
+    assert cache.get('a') == _content('a')
+
+    cache.set('c', _content('c'))
+    assert cache.get('b') is None
+    assert cache.get('a') == _content('a')
+    assert cache.get('c') == _content('c')
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 3, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = GenerationCache(ttl_seconds=100)
+    cache.set('fresh', _content('fresh'))
+    cache.set('old', _content('old'), created_at=clock.now - 60)
+
+    clock.advance(50)
+    assert cache.get('fresh') is not None
+    assert cache.get('old') is None
+    clock.advance(51)
+    assert cache.get('fresh') is None
+    assert cache.stats()['expirations'] == 2
+
+
+def test_persisted_entries_survive_restart(clock, tmp_path):
+    path = str(tmp_path / 'cache' / 'generation_cache.json')
+    cache = GenerationCache(max_size=3, ttl_seconds=100, persist_path=path, persist_interval=0)
+    cache.set('expired', _content('expired'), created_at=clock.now - 90)
+    cache.set('a', _content('a'))
+    cache.set('b', _content('b'))
+    cache.set('c', _content('c'))
+    with open(path, encoding='utf-8') as f:
+        assert [key for key, _ in json.load(f)] == ['a', 'b', 'c']
+
+    clock.advance(20)
+    reloaded = GenerationCache(max_size=2, ttl_seconds=100, persist_path=path)
+    # 按LRU顺序加载，超出容量的最旧条目不加载，条目保留原来的生成时间
+    assert reloaded.get('a') is None
+    assert reloaded.get('b') == _content('b')
+    assert reloaded.get('c') == _content('c')
+    clock.advance(81)
+    assert reloaded.get('c') is None
+
+
+def test_corrupt_persist_file_is_ignored(tmp_path):
+    path = tmp_path / 'generation_cache.json'
+    path.write_text('{not json', encoding='utf-8')
+    cache = GenerationCache(persist_path=str(path))
+    assert cache.stats()['size'] == 0
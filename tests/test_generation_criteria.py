@@ -0,0 +1,126 @@
+import pytest
+import torch
+
+from backend.services.cancellation import CancelToken
+from backend.services.generation_criteria import CancellationStoppingCriteria, JsonObjectStoppingCriteria
+
+PROMPT = ['<s>', 'prompt']
+
+
+class _FakeTokenizer:
+    """每个文本片段对应一个token，记录decode调用次数"""
+
+    def __init__(self):
+        self.ids = {}
+        self.texts = {}
+        self.decoded = 0
+
+    def encode(self, chunks):
+        for chunk in chunks:
+            if chunk not in self.ids:
+                self.ids[chunk] = len(self.ids)
+                self.texts[self.ids[chunk]] = chunk
+        return [self.ids[chunk] for chunk in chunks]
+
+    def decode(self, token_ids):
+        self.decoded += 1
+        return ''.join(self.texts[token_id] for token_id in token_ids)
+
+
+def _generate(rows, tokenizer=None, token_text_cache=None, extra_criteria=None):
+    """
+    按解码步逐步调用停止条件（每步每行新增一个token）
+
+    Returns:
+        tuple: (停止时的步数或None, 停止条件)
+    """
+    tokenizer = tokenizer or _FakeTokenizer()
+    length = max(len(chunks) for chunks in rows)
+    # 较短的行在末尾补空格（相当于闭合后继续生成的内容）
+    input_ids = torch.tensor([
+        tokenizer.encode(PROMPT + chunks + [' '] * (length - len(chunks)))
+        for chunks in rows
+    ])
+    criteria = JsonObjectStoppingCriteria(tokenizer, len(PROMPT), len(rows), token_text_cache)
+    for step in range(1, length + 1):
+        current = input_ids[:, :len(PROMPT) + step]
+        stop = criteria(current, None)
+        if extra_criteria is not None:
+            stop = extra_criteria(criteria)(current, None)
+        if stop:
+            return step, criteria
+    return None, criteria
+
+
+@pytest.mark.parametrize('chunks, end', [
+    (['{"', 'title', '":', ' "', 'x', '"}'], 6),
+    (['{"a": {"b": ', '1}', ', "c": 2', '}', '\n', 'trailing'], 4),
+    # 字符串内的括号不计入深度
+    (['{"title": "', 'a } b', ' {{', '"', ', "k": ["}"]', '}'], 6),
+    # 转义的引号不结束字符串
+    (['{"t": "say ', '\\"', '}', '\\"', ' ok"', '}'], 6),
+    (['{"t": "say \\', '"}', '"}'], 3),
+    # 转义的反斜杠之后的引号结束字符串
+    (['{"t": "c:\\\\', '"', '}'], 3),
+    # 第一个左括号之前的引号和右括号被忽略
+    (['Here is "the', ' JSON" }', ': {"a"', ': 1}'], 4),
+    (['He said "', '{"a": 1}'], 2),
+])
+def test_single_row_stops_when_object_closes(chunks, end):
+    step, criteria = _generate([chunks])
+    assert step == end
+    assert criteria.end_positions == [end]
+
+
+def test_unclosed_object_does_not_stop():
+    step, criteria = _generate([['{"a": ', '"}', ' {', '}']])
+    assert step is None
+    assert criteria.end_positions == [None]
+    assert criteria.depth == [1]
+    assert criteria.in_string == [True]
+
+
+def test_each_row_completes_independently():
+    rows = [
+        ['{"a": 1}', '{', '"', '{'],
+        ['{"b": "}', '"', ', "c": {}', '}', ' '],
+        ['{"d": [', '"\\\\"', ']', '}'],
+    ]
+    step, criteria = _generate(rows)
+    # 所有行闭合后才停止；已闭合行之后生成的括号和引号不影响该行
+    assert step == 4
+    assert criteria.end_positions == [1, 4, 4]
+    assert criteria.depth[0] == 0
+
+
+def test_generation_continues_while_any_row_is_open():
+    rows = [['{}', ' ', ' '], ['{"x": ', '"{"', ' ']]
+    step, criteria = _generate(rows)
+    assert step is None
+    assert criteria.end_positions == [1, None]
+
+
+def test_token_texts_are_decoded_once():
+    tokenizer = _FakeTokenizer()
+    cache = {}
+    _generate([['{"a": ', '1', '}']], tokenizer, cache)
+    decoded = tokenizer.decoded
+    # 共享缓存的下一次生成不再解码相同的token
+    _generate([['{"a": ', '1', '}']], tokenizer, cache)
+    assert tokenizer.decoded == decoded == 3
+
+
+def test_cancelled_rows_count_as_finished():
+    cancelled = CancelToken()
+    cancelled.cancel()
+    rows = [['{"a": 1}', ' ', ' '], ['{"b": ', '1', ' ']]
+
+    def with_cancellation(tokens):
+        return lambda json_criteria: CancellationStoppingCriteria(tokens, json_criteria)
+
+    # 第2行已取消，第1行闭合后即停止
+    step, _ = _generate(rows, extra_criteria=with_cancellation([None, cancelled]))
+    assert step == 1
+    # 第2行仍在生成
+    step, _ = _generate(rows, extra_criteria=with_cancellation([None, CancelToken()]))
+    assert step is None
@@ -0,0 +1,116 @@
+import json
+import random
+
+import pytest
+
+from backend.utils.content_query import CURSOR_NEXT, CURSOR_PREV, decode_cursor, encode_cursor
+from backend.utils.db import Database
+from backend.utils.log_store import LogStructuredDatabase
+from backend.utils.sqlite_db import SQLiteDatabase
+
+BACKENDS = ['tinydb', 'tinydb_write_behind', 'sqlite', 'log']
+
+
+def _legacy_documents(count=237, seed=3):
+    """TinyDB中的旧文档：created_at大量重复，部分没有created_at"""
+    rng = random.Random(seed)
+    documents = {}
+    for content_id in range(1, count + 1):
+        document = {
+            'title': f't{content_id}',
+            'meta_description': 'desc',
+            'keywords': ['k'],
+            'business_type': rng.choice(['shop', 'cafe', 'gym']),
+        }
+        if rng.random() > 0.15:
+            document['created_at'] = f'2024-01-{rng.randint(1, 9):02d}T00:00:00'
+        documents[str(content_id)] = document
+    return documents
+
+
+@pytest.fixture
+def documents():
+    return _legacy_documents()
+
+
+@pytest.fixture(params=BACKENDS)
+def db(request, tmp_path, documents):
+    json_path = tmp_path / 'db.json'
+    json_path.write_text(json.dumps({'contents': documents}), encoding='utf-8')
+    if request.param == 'tinydb':
+        database = Database(str(json_path))
+    elif request.param == 'tinydb_write_behind':
+        database = Database(str(json_path), write_behind=True)
+    elif request.param == 'sqlite':
+        database = SQLiteDatabase(str(tmp_path / 'db.sqlite3'), migrate_from=str(json_path))
+    else:
+        database = LogStructuredDatabase(str(tmp_path / 'contents.log'), migrate_from=str(json_path))
+    yield database
+    if hasattr(database, 'close'):
+        database.close()
+
+
+def _expected_keys(documents, business_type=None):
+    return sorted(
+        (
+            (document.get('created_at') or '', int(content_id))
+            for content_id, document in documents.items()
+            if business_type is None or document['business_type'] == business_type
+        ),
+        reverse=True
+    )
+
+
+def _keys(page):
+    return [(content.get('created_at') or '', content['id']) for content in page['items']]
+
+
+@pytest.mark.parametrize('business_type', [None, 'cafe', 'missing'])
+@pytest.mark.parametrize('limit', [1, 7, 50, 1000])
+def test_cursor_walks_forward_and_backward(db, documents, business_type, limit):
+    expected = _expected_keys(documents, business_type)
+
+    page = db.get_contents_keyset(limit, business_type=business_type)
+    assert page['total'] == len(expected)
+    assert not page['has_newer']
+    pages = [_keys(page)]
+
+    # 按next游标向后（更旧）翻到最后一页
+    while page['has_older']:
+        page = db.get_contents_keyset(limit, after=pages[-1][-1], business_type=business_type)
+        assert page['has_newer']
+        pages.append(_keys(page))
+    assert [key for keys in pages for key in keys] == expected
+
+    # 从最后一页按prev游标翻回第一页，每一页都与向后翻页时相同
+    for position in range(len(pages) - 1, 0, -1):
+        page = db.get_contents_keyset(limit, before=pages[position][0], business_type=business_type)
+        assert _keys(page) == pages[position - 1]
+        assert page['has_older']
+        assert page['has_newer'] == (position - 1 > 0)
+
+
+def test_cursor_pages_are_stable_across_inserts(db):
+    first = _keys(db.get_contents_keyset(10))
+    second = _keys(db.get_contents_keyset(10, after=first[-1]))
+
+    new_id = db.save_content({'title': 'new', 'meta_description': 'desc', 'keywords': ['k'], 'business_type': 'shop'})
+    # 新内容排在最前，已发出的next游标仍然指向原来的第二页
+    assert _keys(db.get_contents_keyset(10, after=first[-1])) == second
+    newer = db.get_contents_keyset(10, before=first[0])
+    assert [content['id'] for content in newer['items']] == [new_id]
+    assert not newer['has_newer']
+
+
+@pytest.mark.parametrize('direction', [CURSOR_NEXT, CURSOR_PREV])
+@pytest.mark.parametrize('created_at', ['2024-01-05T00:00:00', None])
+def test_cursor_round_trip(direction, created_at):
+    cursor = encode_cursor(direction, {'id': 42, 'created_at': created_at})
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (direction, (created_at or '', 42))
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', encode_cursor(CURSOR_NEXT, {'id': 1})[:-3]])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,258 @@
+import errno
+import os
+import threading
+import time
+
+import pytest
+
+from backend.utils import log_store
+from backend.utils.log_store import FSYNC_ALWAYS, LogStructuredDatabase
+
+
+def _content(title, business_type='shop'):
+    return {'title': title, 'meta_description': 'desc', 'keywords': ['k'], 'business_type': business_type}
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / 'contents.log')
+
+
+def _open(path, **kwargs):
+    kwargs.setdefault('migrate_from', '')
+    return LogStructuredDatabase(path, **kwargs)
+
+
+def test_reopen_restores_contents_and_next_id(log_path):
+    store = _open(log_path)
+    first = store.save_content(_content('first'))
+    second = store.save_content(_content('second', 'cafe'))
+    third = store.save_content(_content('third'))
+    store.update_content(second, {'title': 'second v2'})
+    store.delete_content(third)
+    store.close()
+
+    store = _open(log_path)
+    assert store.get_contents_count() == 2
+    assert store.get_contents_count('cafe') == 1
+    assert store.get_content(first)['title'] == 'first'
+    assert store.get_content(second)['title'] == 'second v2'
+    assert store.get_content(third) is None
+    # 删除的ID不会被重新分配
+    assert store.save_content(_content('fourth')) == third + 1
+    store.close()
+
+
+def test_second_open_is_refused_while_locked(log_path):
+    store = _open(log_path)
+    with pytest.raises(Exception, match='已被其他进程'):
+        _open(log_path)
+    store.close()
+    _open(log_path).close()
+
+
+def test_torn_tail_is_truncated_on_open(log_path):
+    store = _open(log_path, fsync_policy=FSYNC_ALWAYS)
+    ids = [store.save_content(_content(f't{i}')) for i in range(3)]
+    store.close()
+    size = os.path.getsize(log_path)
+
+    # 模拟写入中途崩溃：末尾只有半条记录
+    with open(log_path, 'ab') as f:
+        f.write(b'deadbeef {"op":"put","id"')
+
+    store = _open(log_path)
+    assert os.path.getsize(log_path) == size
+    assert store.stats()['size_bytes'] == size
+    assert store.get_contents_count() == 3
+    new_id = store.save_content(_content('after crash'))
+    assert new_id == ids[-1] + 1
+    store.close()
+
+    store = _open(log_path)
+    assert store.get_content(new_id)['title'] == 'after crash'
+    store.close()
+
+
+def test_corruption_before_the_tail_is_an_error(log_path):
+    store = _open(log_path, fsync_policy=FSYNC_ALWAYS)
+    for i in range(3):
+        store.save_content(_content(f't{i}'))
+    store.close()
+
+    with open(log_path, 'rb') as f:
+        lines = f.readlines()
+    lines[1] = b'00000000' + lines[1][8:]
+    with open(log_path, 'wb') as f:
+        f.writelines(lines)
+
+    with pytest.raises(Exception, match='日志文件损坏'):
+        _open(log_path)
+
+
+def test_failed_partial_write_is_truncated(log_path, monkeypatch):
+    store = _open(log_path, fsync_policy=FSYNC_ALWAYS)
+    first = store.save_content(_content('before'))
+    size = store.stats()['size_bytes']
+
+    real_write = os.write
+
+    def write_half_then_fail(fd, data):
+        # 写入一半后磁盘已满
+        real_write(fd, bytes(data[:len(data) // 2]))
+        raise OSError(errno.ENOSPC, '磁盘空间不足')
+
+    monkeypatch.setattr(os, 'write', write_half_then_fail)
+    with pytest.raises(OSError):
+        store.save_content(_content('lost'))
+    monkeypatch.setattr(os, 'write', real_write)
+
+    assert os.path.getsize(log_path) == size
+    assert store.stats()['size_bytes'] == size
+    # 之后追加的记录偏移正确，可以正常读取
+    second = store.save_content(_content('after'))
+    assert store.get_content(second)['title'] == 'after'
+    assert store.get_content(first)['title'] == 'before'
+    store.close()
+
+    store = _open(log_path)
+    assert [content['title'] for content in store.get_contents(10, 0, order='asc')['items']] == ['before', 'after']
+    store.close()
+
+
+def test_fsync_loop_survives_errors(log_path, monkeypatch):
+    store = _open(log_path, fsync_interval_ms=10)
+    real_fsync = os.fsync
+    calls = []
+
+    def failing_fsync(fd):
+        calls.append(fd)
+        if len(calls) <= 2:
+            raise OSError(errno.EIO, '输入/输出错误')
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', failing_fsync)
+    store.save_content(_content('t'))
+    deadline = time.monotonic() + 10
+    while store.stats()['fsyncs'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = store.stats()
+    # 两次失败后同步线程仍在运行，第三次同步成功
+    assert stats['fsync_errors'] == 2
+    assert '输入/输出错误' in stats['last_fsync_error']
+    assert stats['fsyncs'] == 1
+    assert not stats['pending_fsync']
+    monkeypatch.setattr(os, 'fsync', real_fsync)
+    store.close()
+
+
+def test_compaction_drops_dead_records(log_path):
+    store = _open(log_path, compact_min_dead=10 ** 6)
+    ids = [store.save_content(_content(f't{i}')) for i in range(50)]
+    for content_id in ids[:40]:
+        store.delete_content(content_id)
+    store.update_content(ids[45], {'title': 'updated'})
+    # 删除最大ID后压缩，下一个ID仍然递增
+    store.delete_content(ids[-1])
+    size_before = store.stats()['size_bytes']
+
+    store.compact()
+    stats = store.stats()
+    assert stats['dead'] == 0
+    assert stats['live'] == 9
+    assert stats['compactions'] == 1
+    assert stats['size_bytes'] == os.path.getsize(log_path) < size_before
+    assert store.get_content(ids[45])['title'] == 'updated'
+    assert store.save_content(_content('next')) == ids[-1] + 1
+    expected = store.get_contents(100, 0)['items']
+    store.close()
+
+    store = _open(log_path)
+    assert store.get_contents(100, 0)['items'] == expected
+    assert store.stats()['dead'] == 0
+    store.close()
+
+
+def test_writes_during_compaction_are_kept(log_path, monkeypatch):
+    store = _open(log_path, compact_min_dead=10 ** 6)
+    ids = [store.save_content(_content(f't{i}')) for i in range(200)]
+    for content_id in ids[:150]:
+        store.delete_content(content_id)
+
+    # 压缩在释放锁后、复制存活记录前创建新索引，此时写入的记录只能从日志尾部补上
+    written = []
+    new_index = log_store._LogIndex
+
+    def index_with_concurrent_writes():
+        written.extend(store.save_content(_content('during', 'concurrent')) for _ in range(20))
+        store.update_content(ids[150], {'title': 'updated during'})
+        store.delete_content(ids[151])
+        return new_index()
+
+    monkeypatch.setattr(log_store, '_LogIndex', index_with_concurrent_writes)
+    store.compact()
+    monkeypatch.setattr(log_store, '_LogIndex', new_index)
+
+    def check(store):
+        assert store.get_contents_count() == 49 + len(written)
+        assert store.get_contents_count('concurrent') == len(written)
+        assert all(store.get_content(content_id) is not None for content_id in written)
+        assert store.get_content(ids[150])['title'] == 'updated during'
+        assert store.get_content(ids[151]) is None
+
+    check(store)
+    assert store.stats()['compactions'] == 1
+    store.close()
+
+    store = _open(log_path)
+    check(store)
+    store.close()
+
+
+def test_concurrent_writer_during_compaction(log_path):
+    store = _open(log_path, compact_min_dead=10 ** 6)
+    for content_id in [store.save_content(_content(f't{i}')) for i in range(2000)][:1500]:
+        store.delete_content(content_id)
+
+    written = []
+    started = threading.Event()
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            written.append(store.save_content(_content('during', 'concurrent')))
+            started.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert started.wait(5)
+        store.compact()
+    finally:
+        stop.set()
+        thread.join()
+
+    live = store.get_contents_count()
+    assert store.get_contents_count('concurrent') == len(written)
+    store.close()
+
+    store = _open(log_path)
+    assert store.get_contents_count() == live
+    assert store.get_contents_count('concurrent') == len(written)
+    store.close()
+
+
+def test_automatic_compaction_runs_in_background(log_path):
+    store = _open(log_path, compact_min_dead=20, compact_ratio=0.5)
+    ids = [store.save_content(_content(f't{i}')) for i in range(30)]
+    for content_id in ids[:25]:
+        store.delete_content(content_id)
+    # 等待后台压缩完成
+    deadline = time.monotonic() + 10
+    while store.stats()['compactions'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = store.stats()
+    assert stats['compactions'] >= 1
+    assert stats['live'] == 5
+    store.close()
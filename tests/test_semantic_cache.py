@@ -0,0 +1,104 @@
+import pytest
+
+from backend.api import generation_routes
+from backend.services import generation_cache as generation_cache_module
+from backend.services import semantic_cache as semantic_cache_module
+from backend.services.generation_cache import GenerationCache
+from backend.services.semantic_cache import SemanticCache
+
+
+class _FakeClock:
+    """替代time模块：time()和monotonic()只在测试调用advance时前进"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(generation_cache_module, 'time', clock)
+    monkeypatch.setattr(semantic_cache_module, 'time', clock)
+    return clock
+
+
+def _content(title):
+    return {'title': title, 'metaDescription': 'desc', 'keywords': ['k']}
+
+
+def test_semantic_cache_matches_near_duplicates(clock):
+    cache = SemanticCache(threshold=0.8)
+    cache.add('coffee shop', _content('coffee'), context='en')
+    cache.add('yoga studio', _content('yoga'), context='en')
+
+    match = cache.lookup('The Coffee Shops', context='en')
+    assert match['value'] == _content('coffee')
+    assert match['matched'] == 'coffee shop'
+    assert match['similarity'] == 1.0
+    assert cache.lookup('coffee shop', context='zh') is None
+    assert cache.lookup('dental clinic', context='en') is None
+    assert cache.lookup('the', context='en') is None
+
+
+@pytest.mark.parametrize('offset, hit', [(-0.001, True), (0.001, False)])
+def test_semantic_threshold(clock, offset, hit):
+    probe = SemanticCache(threshold=0.0)
+    probe.add('italian restaurant', _content('italian'))
+    similarity = probe.lookup('italian pizza restaurant')['similarity']
+    assert 0.5 < similarity < 1.0
+
+    cache = SemanticCache(threshold=similarity + offset)
+    cache.add('italian restaurant', _content('italian'))
+    assert (cache.lookup('italian pizza restaurant') is not None) == hit
+
+
+def test_semantic_cache_evicts_expired_then_least_recently_used(clock):
+    cache = SemanticCache(max_entries=2, ttl_seconds=100)
+    cache.add('bakery', _content('bakery'))
+    clock.advance(1)
+    cache.add('florist', _content('florist'))
+    clock.advance(1)
+    assert cache.lookup('bakery') is not None
+
+    # 容量已满，淘汰最久未使用的florist
+    cache.add('barber', _content('barber'))
+    assert cache.lookup('florist') is None
+    assert cache.stats()['evictions'] == 1
+
+    # 已过期的条目不参与匹配，且优先被替换（不计入淘汰）
+    clock.advance(150)
+    assert cache.lookup('bakery') is None
+    assert cache.stats()['expired_matches'] == 1
+    cache.add('tailor', _content('tailor'))
+    assert cache.lookup('tailor') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_near_hit_keeps_original_timestamp(clock, monkeypatch):
+    monkeypatch.setattr(generation_routes, 'generation_cache', GenerationCache(ttl_seconds=100))
+    monkeypatch.setattr(generation_routes, 'semantic_cache', SemanticCache(threshold=0.8, ttl_seconds=100))
+
+    _, cache_key, context, _ = generation_routes._lookup_cache('coffee shop', 'en', {})
+    generation_routes._store_cache('coffee shop', _content('coffee'), cache_key, context)
+
+    clock.advance(60)
+    content, _, _, match = generation_routes._lookup_cache('The Coffee Shops', 'en', {})
+    assert content == _content('coffee')
+    assert match == {'similarity': 1.0, 'matched': 'coffee shop'}
+    # 近似命中写入了精确匹配缓存
+    content, _, _, match = generation_routes._lookup_cache('the coffee shops', 'en', {})
+    assert content == _content('coffee') and match is None
+
+    # 有效期从原结果的生成时间起算，近似命中后写入的精确匹配条目同时过期
+    clock.advance(41)
+    content, _, _, match = generation_routes._lookup_cache('The Coffee Shops', 'en', {})
+    assert content is None and match is None
@@ -0,0 +1,182 @@
+import json
+import multiprocessing
+
+import pytest
+
+from backend.utils.db import Database
+from backend.utils.sqlite_db import SQLiteDatabase
+
+# 旧TinyDB文件中的文档：ID不连续，包含非ASCII文本和LIKE通配符
+LEGACY_DOCUMENTS = {
+    '1': {'title': 'Best Coffee in Town', 'meta_description': 'Fresh beans daily', 'keywords': ['coffee', 'cafe'],
+          'business_type': 'cafe', 'created_at': '2024-01-01T09:00:00'},
+    '3': {'title': 'CAFÉ DE FLORE', 'meta_description': 'Parisian café culture', 'keywords': ['Café', 'Paris'],
+          'business_type': 'cafe', 'created_at': '2024-01-02T09:00:00'},
+    '4': {'title': 'Кофейня на углу', 'meta_description': 'Лучший КОФЕ', 'keywords': ['кофе'],
+          'business_type': 'cafe', 'created_at': '2024-01-02T09:00:00'},
+    '7': {'title': 'Straße Bakery', 'meta_description': '100% rye_bread', 'keywords': ['seo', 'tips'],
+          'business_type': 'shop', 'created_at': '2024-01-05T12:00:00'},
+    '12': {'title': 'Gym Deals', 'meta_description': 'Open (24h) gym', 'keywords': ['fitness', 'GYM'],
+           'business_type': 'gym'},
+    '13': {'title': '咖啡馆', 'meta_description': '精品咖啡', 'keywords': ['咖啡', 'SEO'],
+           'business_type': 'cafe', 'created_at': '2024-01-09T00:00:00'},
+}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps({'contents': LEGACY_DOCUMENTS}, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'db.sqlite3')
+
+
+@pytest.fixture
+def databases(json_path, sqlite_path):
+    """同一份旧数据分别由TinyDB和导入后的SQLite提供"""
+    return Database(json_path), SQLiteDatabase(sqlite_path, migrate_from=json_path)
+
+
+def _search(database, query_text, search_fields=None):
+    return [(content['id'], content['relevance']) for content in database.search_contents(query_text, search_fields)]
+
+
+@pytest.mark.parametrize('query_text', [
+    'coffee', 'COFFEE', 'café', 'CAFÉ', 'кофе', 'КОФЕЙНЯ', '咖啡', 'seo', 'seo tips', '100%', 'rye_bread', '%', '_',
+    '(24h)', 'missing',
+])
+@pytest.mark.parametrize('search_fields', [None, ['title'], ['keywords'], ['meta_description', 'business_type']])
+def test_search_matches_tinydb(databases, query_text, search_fields):
+    tinydb, sqlite = databases
+    assert _search(sqlite, query_text, search_fields) == _search(tinydb, query_text, search_fields)
+
+
+def test_search_is_case_insensitive_beyond_ascii(databases):
+    _, sqlite = databases
+    assert [content_id for content_id, _ in _search(sqlite, 'café', ['title'])] == [3]
+    assert [content_id for content_id, _ in _search(sqlite, 'КОФЕ', ['keywords'])] == [4]
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    (None, None),
+    ('2024-01-02', None),
+    (None, '2024-01-02T09:00:00'),
+    ('2024-01-02T09:00:00', '2024-01-05T12:00:00'),
+    ('2025-01-01', None),
+])
+def test_analytics_matches_tinydb(databases, start_date, end_date):
+    tinydb, sqlite = databases
+    expected = tinydb.get_analytics(start_date, end_date)
+    assert sqlite.get_analytics(start_date, end_date) == expected
+    assert all(content.get('created_at') for content in expected)
+
+
+def test_migration_preserves_ids(databases):
+    _, sqlite = databases
+    assert sqlite.get_contents_count() == len(LEGACY_DOCUMENTS)
+    for content_id, document in LEGACY_DOCUMENTS.items():
+        content = sqlite.get_content(content_id)
+        assert content['title'] == document['title']
+        assert content['keywords'] == document['keywords']
+        assert content.get('created_at') == document.get('created_at')
+
+    # 新内容的ID接在导入的最大ID之后
+    assert sqlite.save_content({'title': 'new', 'meta_description': 'd', 'keywords': ['k'], 'business_type': 'shop'}) == 14
+
+
+def test_migration_runs_only_once(json_path, sqlite_path):
+    sqlite = SQLiteDatabase(sqlite_path, migrate_from=json_path)
+    for content_id in LEGACY_DOCUMENTS:
+        sqlite.delete_content(content_id)
+
+    # meta表记录了导入，库被清空后重新打开也不会再次导入
+    reopened = SQLiteDatabase(sqlite_path, migrate_from=json_path)
+    assert reopened.get_contents_count() == 0
+    assert reopened.migrate_from_tinydb(json_path) == 0
+    row = reopened._connect().execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+    assert json.loads(row['value'])['count'] == len(LEGACY_DOCUMENTS)
+
+
+def test_migration_skips_non_empty_database(json_path, sqlite_path):
+    sqlite = SQLiteDatabase(sqlite_path, migrate_from='')
+    sqlite.save_content({'title': 'existing', 'meta_description': 'd', 'keywords': [], 'business_type': 'shop'})
+    assert sqlite.migrate_from_tinydb(json_path) == 0
+    assert sqlite.get_contents_count() == 1
+
+
+def _migrate_in_process(sqlite_path, json_path, barrier, results):
+    sqlite = SQLiteDatabase(sqlite_path, migrate_from='')
+    barrier.wait()
+    try:
+        results.put(sqlite.migrate_from_tinydb(json_path))
+    except Exception as e:
+        results.put(str(e))
+
+
+def test_concurrent_workers_migrate_once(json_path, sqlite_path):
+    # 模拟GUNICORN_PRELOAD=false时多个worker同时打开空库
+    SQLiteDatabase(sqlite_path, migrate_from='')
+    context = multiprocessing.get_context('fork')
+    workers = 8
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_migrate_in_process, args=(sqlite_path, json_path, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join(30)
+
+    assert sorted(outcomes, key=str) == [0] * (workers - 1) + [len(LEGACY_DOCUMENTS)]
+    assert SQLiteDatabase(sqlite_path, migrate_from='').get_contents_count() == len(LEGACY_DOCUMENTS)
+
+
+def _keyword_rows(sqlite, content_id):
+    return [
+        (row['position'], row['keyword'])
+        for row in sqlite._connect().execute(
+            'SELECT position, keyword FROM content_keywords WHERE content_id = ? ORDER BY position', (content_id,)
+        )
+    ]
+
+
+def test_keywords_follow_updates_and_deletes(sqlite_path):
+    sqlite = SQLiteDatabase(sqlite_path, migrate_from='')
+    content_id = sqlite.save_content(
+        {'title': 'Tea House', 'meta_description': 'd', 'keywords': ['tea', 'oolong', 'matcha'], 'business_type': 'cafe'}
+    )
+    assert _keyword_rows(sqlite, content_id) == [(0, 'tea'), (1, 'oolong'), (2, 'matcha')]
+
+    # 不包含keywords的更新不改动关键词
+    sqlite.update_content(content_id, {'title': 'Tea Room'})
+    assert sqlite.get_content(content_id)['keywords'] == ['tea', 'oolong', 'matcha']
+
+    sqlite.update_content(content_id, {'keywords': ['puerh', 'tea']})
+    assert _keyword_rows(sqlite, content_id) == [(0, 'puerh'), (1, 'tea')]
+    assert _search(sqlite, 'oolong', ['keywords']) == []
+    assert [found for found, _ in _search(sqlite, 'PUERH', ['keywords'])] == [content_id]
+
+    sqlite.update_content(content_id, {'keywords': None})
+    assert _keyword_rows(sqlite, content_id) == []
+
+    sqlite.update_content(content_id, {'keywords': ['tea']})
+    sqlite.delete_content(content_id)
+    assert _keyword_rows(sqlite, content_id) == []
+    assert sqlite.get_content(content_id) is None
+    with pytest.raises(Exception):
+        sqlite.delete_content(content_id)
+
+
+def test_unknown_update_field_is_rejected(sqlite_path):
+    sqlite = SQLiteDatabase(sqlite_path, migrate_from='')
+    content_id = sqlite.save_content({'title': 't', 'meta_description': 'd', 'keywords': [], 'business_type': 'shop'})
+    with pytest.raises(Exception):
+        sqlite.update_content(content_id, {'title; DROP TABLE contents': 'x'})
+    assert sqlite.get_content(content_id)['title'] == 't'
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from backend.utils.db import Database, DURABILITY_BUFFERED, DURABILITY_FSYNC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _content(title):
+    return {'title': title, 'meta_description': 'desc', 'keywords': ['k'], 'business_type': 'shop'}
+
+
+def _on_disk(path):
+    """文件中已落盘的内容标题"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    contents = json.loads(text).get('contents', {}) if text else {}
+    return sorted(document['title'] for document in contents.values())
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'db.json')
+
+
+@pytest.fixture
+def open_db(db_path):
+    databases = []
+
+    def _open(**kwargs):
+        database = Database(db_path, write_behind=True, **kwargs)
+        databases.append(database)
+        return database
+
+    yield _open
+    for database in databases:
+        database.close()
+
+
+def test_interval_flush(open_db, db_path):
+    database = open_db(flush_interval_ms=50, flush_max_writes=1000)
+    database.save_content(_content('a'))
+    database.save_content(_content('b'))
+
+    assert _wait_for(lambda: _on_disk(db_path) == ['a', 'b'])
+    stats = database.stats()
+    assert stats['pending_writes'] == 0
+    assert stats['flushes'] >= 1
+    assert stats['flush_errors'] == 0
+
+
+@pytest.mark.parametrize('durability', [DURABILITY_FSYNC, DURABILITY_BUFFERED])
+def test_flush_after_max_writes(open_db, db_path, durability):
+    database = open_db(flush_interval_ms=60000, flush_max_writes=3, durability=durability)
+    database.save_content(_content('a'))
+    database.save_content(_content('b'))
+    assert _on_disk(db_path) == []
+    assert database.stats()['pending_writes'] == 2
+    # 写入在内存中合并，读取能看到尚未落盘的内容
+    assert database.get_contents_count() == 2
+
+    database.save_content(_content('c'))
+    assert _on_disk(db_path) == ['a', 'b', 'c']
+    stats = database.stats()
+    assert (stats['pending_writes'], stats['flushes'], stats['writes_per_flush']) == (0, 1, 3)
+
+
+def test_close_flushes_pending_writes(open_db, db_path):
+    database = open_db(flush_interval_ms=60000, flush_max_writes=1000)
+    database.save_content(_content('a'))
+    assert _on_disk(db_path) == []
+
+    database.close()
+    assert _on_disk(db_path) == ['a']
+    # 重复关闭无操作，落盘线程随关闭退出
+    database.close()
+    assert _wait_for(lambda: not database._flush_thread.is_alive())
+
+
+def test_pending_writes_are_flushed_at_exit(db_path):
+    script = (
+        "import sys\n"
+        "from backend.utils.db import Database\n"
+        "database = Database(sys.argv[1], write_behind=True, flush_interval_ms=60000, flush_max_writes=1000)\n"
+        "database.save_content({'title': 'at-exit', 'meta_description': 'd', 'keywords': [], 'business_type': 'shop'})\n"
+    )
+    env = dict(os.environ, DB_PATH=os.path.join(os.path.dirname(db_path), 'global.json'))
+    subprocess.run([sys.executable, '-c', script, db_path], cwd=ROOT, env=env, check=True, timeout=60)
+    assert _on_disk(db_path) == ['at-exit']
+
+
+def test_pending_writes_are_flushed_before_fork(open_db, db_path):
+    database = open_db(flush_interval_ms=60000, flush_max_writes=1000)
+    database.save_content(_content('parent'))
+    assert _on_disk(db_path) == []
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    # 只由fork前的进程落盘，子进程不会重复写入父进程的缓存
+    assert _on_disk(db_path) == ['parent']
+    assert database.stats()['pending_writes'] == 0
+
+
+def test_flush_thread_is_restarted_after_fork(open_db, db_path):
+    database = open_db(flush_interval_ms=20, flush_max_writes=1000)
+    database.save_content(_content('parent'))
+    assert _wait_for(lambda: _on_disk(db_path) == ['parent'])
+
+    pid = os.fork()
+    if pid == 0:
+        # 子进程：落盘线程没有随fork复制，写入后重新启动并按间隔落盘
+        status = 1
+        try:
+            database.save_content(_content('child'))
+            if _wait_for(lambda: _on_disk(db_path) == ['child', 'parent']):
+                status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert _on_disk(db_path) == ['child', 'parent']
+
+
+def test_flush_errors_are_counted_and_retried(open_db, db_path, monkeypatch, caplog):
+    database = open_db(flush_interval_ms=20, flush_max_writes=1000)
+    storage = database.db.storage.storage
+
+    def failing_write(data):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(storage, 'write', failing_write)
+    with caplog.at_level(logging.ERROR, logger='backend.utils.db'):
+        database.save_content(_content('a'))
+        # 落盘线程在失败后继续运行，修改保留在缓存中
+        assert _wait_for(lambda: database.stats()['flush_errors'] >= 2)
+    stats = database.stats()
+    assert stats['pending_writes'] == 1
+    assert 'disk full' in stats['last_flush_error']
+    assert any('数据库落盘失败' in record.getMessage() for record in caplog.records)
+
+    monkeypatch.undo()
+    assert _wait_for(lambda: _on_disk(db_path) == ['a'])
+    errors = database.stats()['flush_errors']
+    assert database.stats()['pending_writes'] == 0
+    # 失败计数不会因之后的成功落盘而清零
+    assert errors >= 2 and database.stats()['last_flush_error'] is not None
@@ -0,0 +1,8 @@
+import logging
+from backend.app import create_app
+
+# 生产环境入口：gunicorn -c gunicorn.conf.py wsgi:app
+# gunicorn.conf.py开启了preload_app，模型在master进程中同步加载并预热，
+# fork出的worker以写时复制方式共享同一份权重
+logging.basicConfig(level=logging.INFO)
+app = create_app(load_model=True)